@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Benchmarks import the application packages the same way the tests do
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
@@ -0,0 +1,96 @@
+"""
+Cold-path benchmark for precompiled constraint artifacts: what a fresh worker pays to get a
+SolverConfig for a program it has never seen, encoding in Python versus loading the stored artifact.
+
+    python -m benchmarks.artifact_bench
+    python -m benchmarks.artifact_bench --sizes 100 500 --repeats 5 --output artifacts.json
+
+Both paths start from the program document (``Program.from_dict`` and ``ProgramIndex`` included);
+the artifact path reads from a new DiskArtifactStore each time so nothing is served from memory.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.generator import generate_profile, generate_program
+from benchmarks.solver_bench import git_commit
+
+DEFAULT_SIZES = [10, 50, 100, 250, 500]
+
+
+def bench_size(courses: int, seed: int, repeats: int, directory: str) -> Dict[str, Any]:
+    from classes.constrain.program import Program
+    from classes.constrain.program_index import ProgramIndex
+    from classes.solver_config import SolverConfig
+    from services.artifact_store import DiskArtifactStore
+
+    generated = generate_program(courses, seed=seed)
+    document = generated.to_dict()
+    profile = generate_profile(generated)
+
+    start = time.perf_counter()
+    seed_config = SolverConfig(generated, profile)
+    store = DiskArtifactStore(directory)
+    key = store.key(generated)
+    store.put(key, seed_config.to_artifact())
+    build_ms = (time.perf_counter() - start) * 1000
+    results = {"encode": [], "artifact": []}
+    outcomes = set()
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        program = Program.from_dict(document)
+        config = SolverConfig(program, profile, ProgramIndex(program))
+        results["encode"].append((time.perf_counter() - start) * 1000)
+        outcomes.add(str(config.check_solvable()))
+        config.close()
+
+        start = time.perf_counter()
+        program = Program.from_dict(document)
+        config = DiskArtifactStore(directory).config_for(program, profile, ProgramIndex(program))
+        results["artifact"].append((time.perf_counter() - start) * 1000)
+        outcomes.add(str(config.check_solvable()))
+        config.close()
+
+    medians = {path: statistics.median(values) for path, values in results.items()}
+    return {
+        "courses": courses,
+        "seed": seed,
+        "artifact_bytes": os.path.getsize(store.path(key)),
+        "build_ms": build_ms,
+        "median_ms": medians,
+        "speedup": medians["encode"] / medians["artifact"],
+        "results": sorted(outcomes),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"commit": git_commit(), "results": []}
+    entries: List[Dict[str, Any]] = report["results"]
+    with tempfile.TemporaryDirectory() as directory:
+        for courses in args.sizes:
+            entry = bench_size(courses, args.seed, args.repeats, directory)
+            entries.append(entry)
+            print(f"{courses:>5} courses  encode={entry['median_ms']['encode']:8.1f}ms  "
+                  f"artifact={entry['median_ms']['artifact']:8.1f}ms  x{entry['speedup']:.1f}  "
+                  f"({entry['artifact_bytes'] / 1024:.1f} KiB)", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local load-test comparison of the Flask (controller.py) and ASGI (asgi.py) front-ends.
+
+By default both apps are started in-process on ephemeral ports against mongomock stores; pass
+--flask-url / --asgi-url to drive real servers instead (e.g. gunicorn and hypercorn pointed at a
+local MongoDB). Both are seeded through their own POST endpoints and then receive the same
+closed-loop solve load.
+
+    python -m benchmarks.frontend_compare --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+
+PROGRAM_ID = "BENCH"
+PROFILE_ID = "BENCH_STUDENT"
+QUARTERS = ["FRESH_FALL", "FRESH_WINTER", "FRESH_SPRING", "SOPH_FALL", "SOPH_WINTER", "SOPH_SPRING",
+            "JUNIOR_FALL", "JUNIOR_WINTER", "JUNIOR_SPRING", "SENIOR_FALL", "SENIOR_WINTER", "SENIOR_SPRING"]
+
+
+def bench_program(courses: int) -> Dict[str, Any]:
+    """A chain-structured program that is always feasible at 20 units per quarter"""
+    return {
+        "id": PROGRAM_ID,
+        "required_courses": [
+            {
+                "code": f"B{i}",
+                "title": f"Bench {i}",
+                "units": 4,
+                "offered_quarters": QUARTERS[i % 3::3] + QUARTERS[(i + 1) % 3::3],
+                "prereqs": [f"B{i - 3}"] if i >= 3 else []
+            }
+            for i in range(courses)
+        ],
+        "pools": []
+    }
+
+
+def _request(method: str, url: str, body: Optional[Dict[str, Any]] = None, timeout: float = 60) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_load(base_url: str, requests: int, concurrency: int, courses: int) -> Dict[str, Any]:
+    _request("POST", f"{base_url}/post-program", bench_program(courses))
+    _request("POST", f"{base_url}/post-profile", {"id": PROFILE_ID, "max_quarter_units": 20, "min_quarter_units": 0})
+    url = f"{base_url}/solve-user-schedule?program={PROGRAM_ID}&profile={PROFILE_ID}"
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        status = _request("GET", url)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += status != 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": requests / wall,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "error_rate": errors / requests,
+    }
+
+
+def uri_client_factory(connection_string: str) -> Any:
+    """
+    MongoClient that takes TLS from the connection string (``mongodb+srv://`` or ``?tls=true``),
+    unlike the app's default factory, which always uses TLS, so a plain local ``mongod`` works
+    """
+    from pymongo import MongoClient
+    return MongoClient(connection_string)
+
+
+@contextmanager
+def local_flask_server(overrides: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """The Flask app on an ephemeral port, against mongomock unless ``overrides`` set a connection string"""
+    import logging
+    import mongomock
+    from werkzeug.serving import make_server
+    from controller import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    mongo_client = mongomock.MongoClient()
+    config = {"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}
+    if overrides and overrides.get("MONGO_CONNECTION_STRING"):
+        config["MONGO_CLIENT_FACTORY"] = uri_client_factory
+    config.update(overrides or {})
+    app = create_app(config)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+
+
+@contextmanager
+def local_asgi_server(solver_processes: int) -> Iterator[str]:
+    import socket
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+    from mongomock_motor import AsyncMongoMockClient
+    from asgi import create_asgi_app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    mongo_client = AsyncMongoMockClient()
+    app = create_asgi_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "SOLVER_PROCESSES": solver_processes
+    })
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.accesslog = None
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(app, config, shutdown_trigger=stop.wait),), daemon=True)
+    thread.start()
+    try:
+        for _ in range(100):
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        loop.call_soon_threadsafe(stop.set)
+        thread.join(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--courses", type=int, default=24)
+    parser.add_argument("--solver-processes", type=int, default=None, help="ASGI process pool size (default: CPU count)")
+    parser.add_argument("--flask-url", help="Drive a running Flask server instead of an in-process one")
+    parser.add_argument("--asgi-url", help="Drive a running ASGI server instead of an in-process one")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    import os
+    processes = args.solver_processes if args.solver_processes is not None else (os.cpu_count() or 1)
+    report: Dict[str, Any] = {}
+    for name, url, local in (
+        ("flask", args.flask_url, local_flask_server),
+        ("asgi", args.asgi_url, lambda: local_asgi_server(processes)),
+    ):
+        if url:
+            report[name] = run_load(url, args.requests, args.concurrency, args.courses)
+        else:
+            with local() as local_url:
+                report[name] = run_load(local_url, args.requests, args.concurrency, args.courses)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Seeded generator of synthetic, realistic-looking degree programs for benchmarks and load tests.
+
+Courses are arranged in ``depth`` levels; a course only takes prerequisites from lower levels and is
+offered mostly inside its level's window of quarters, so generated programs are feasible with the
+profile from ``generate_profile`` while still giving the solver real choices.
+"""
+import math
+import random
+from typing import Dict, List, Optional, Sequence
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+
+from classes.components.course import Course
+from classes.components.enums import GER, Quarter
+from classes.components.pool import Pool
+from classes.components.prereq import Prereq
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+
+SUBJECTS = ["CS", "MATH", "PHYS", "CHEM", "ECON", "STATS", "EE", "BIO", "PHIL", "HIST", "ENGLISH", "PSYCH"]
+WORDS = [
+    "introduction", "advanced", "systems", "theory", "analysis", "design", "data", "networks", "probability",
+    "algorithms", "linear", "algebra", "computation", "programming", "machine", "learning", "logic", "signals",
+    "history", "modern", "ethics", "writing", "research", "methods", "quantum", "organic", "statistics",
+    "economics", "policy", "language", "culture", "seminar", "laboratory", "practicum", "topics", "foundations",
+]
+DEFAULT_UNITS = {3: 0.3, 4: 0.4, 5: 0.3}
+ACADEMIC_QUARTERS = [quarter for quarter in Quarter if not quarter.name.endswith("SUMMER")]
+
+
+def _level_window(level: int, depth: int) -> List[Quarter]:
+    """The contiguous run of academic quarters where courses of ``level`` are primarily offered"""
+    size = len(ACADEMIC_QUARTERS)
+    start = (level * size) // depth
+    end = max(start + 1, ((level + 1) * size) // depth)
+    return ACADEMIC_QUARTERS[start:end]
+
+
+def generate_course(
+    rng: random.Random,
+    code: str,
+    units: Dict[int, float] = DEFAULT_UNITS,
+    offered: Optional[Sequence[Quarter]] = None,
+    prereqs: Optional[List[str]] = None,
+    ger_rate: float = 0.3
+) -> Course:
+    """One course with a plausible title, description, unit count and GER tags"""
+    title_words = rng.sample(WORDS, rng.randint(2, 4))
+    description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30)))
+    gers = rng.sample(list(GER), rng.randint(1, 2)) if rng.random() < ger_rate else []
+    return Course(
+        code=code,
+        title=" ".join(title_words).title(),
+        units=rng.choices(list(units), weights=list(units.values()))[0],
+        description=description,
+        prereqs=prereqs or [],
+        offered_quarters=list(offered if offered is not None else rng.sample(ACADEMIC_QUARTERS, rng.randint(1, 6))),
+        ug_reqs=gers
+    )
+
+
+def generate_program(
+    courses: int = 50,
+    depth: int = 4,
+    density: float = 0.3,
+    offering_sparsity: float = 0.5,
+    units: Dict[int, float] = DEFAULT_UNITS,
+    pools: int = 0,
+    pool_nesting: int = 1,
+    seed: int = 0,
+    program_id: Optional[str] = None,
+    disjunction_rate: float = 0.0
+) -> Program:
+    """
+    Args:
+        courses: Number of required courses.
+        depth: Number of prerequisite levels (longest possible prerequisite chain).
+        density: Probability that a course in a lower level is a prerequisite (capped at 3 per course).
+        offering_sparsity: 0 offers every quarter of the level window, values near 1 offer one quarter.
+        units: Unit count to sampling weight.
+        pools: Number of elective pools over the program's courses.
+        pool_nesting: 1 for pools of courses, 2+ for pools of pools.
+        seed: Random seed; the same arguments always produce the same program.
+        disjunction_rate: Probability that a prerequisite gets an alternative from the lower levels
+            ("CS106B or CS106X"); alternatives may share deeper prerequisites, as real ones do.
+    """
+    rng = random.Random(seed)
+    depth = max(1, min(depth, len(ACADEMIC_QUARTERS)))
+    levels: List[List[str]] = [[] for _ in range(depth)]
+    generated: List[Course] = []
+    subject_width = max(1, math.ceil(courses / len(SUBJECTS)))
+
+    for i in range(courses):
+        level = min(depth - 1, (i * depth) // courses)
+        code = f"{SUBJECTS[i // subject_width % len(SUBJECTS)]}{100 + i}"
+
+        window = _level_window(level, depth)
+        offered = [quarter for quarter in window if rng.random() >= offering_sparsity] or [rng.choice(window)]
+        # Occasionally also offered later (e.g. in a summer) to give the solver slack
+        later = [quarter for quarter in Quarter if quarter.value > window[-1].value]
+        if later and rng.random() < 0.3 * (1 - offering_sparsity):
+            offered.append(rng.choice(later))
+
+        candidates = [code for lower in levels[:level] for code in lower]
+        prereqs = [candidate for candidate in candidates if rng.random() < density / max(1, len(candidates) ** 0.5)][:3]
+        if disjunction_rate > 0:
+            prereqs = [
+                Prereq("Or", [prereq, rng.choice([other for other in candidates if other != prereq])])
+                if len(candidates) > 1 and rng.random() < disjunction_rate else prereq
+                for prereq in prereqs
+            ]
+
+        generated.append(generate_course(rng, code, units, sorted(set(offered), key=lambda q: q.value), prereqs))
+        levels[level].append(code)
+
+    program_pools = [_generate_pool(rng, [course.code for course in generated], pool_nesting) for _ in range(pools)]
+    return Program(id=program_id or f"SYNTH-{courses}-{seed}", required_courses=generated, pools=program_pools)
+
+
+def _generate_pool(rng: random.Random, codes: List[str], nesting: int) -> Pool:
+    if nesting <= 1 or len(codes) < 4:
+        members = rng.sample(codes, min(len(codes), rng.randint(3, 6)))
+        return Pool(type="Course", objects=members, num_required=rng.randint(1, len(members) - 1 or 1))
+    children = [_generate_pool(rng, codes, nesting - 1) for _ in range(rng.randint(2, 3))]
+    return Pool(type="Pool", objects=children, num_required=rng.randint(1, len(children)))
+
+
+def generate_catalog(courses: int, seed: int = 0, ger_rate: float = 0.4) -> List[Course]:
+    """A flat catalog of independent courses (no prerequisites) for search and GER benchmarks"""
+    rng = random.Random(seed)
+    return [generate_course(rng, f"{rng.choice(SUBJECTS)}{i:05d}", ger_rate=ger_rate) for i in range(courses)]
+
+
+def generate_profile(program: Program, slack: float = 1.25, profile_id: str = "SYNTH") -> Profile:
+    """A profile whose unit cap leaves ``slack`` headroom over the program's average academic-quarter load"""
+    total_units = sum(course.units for course in program.required_courses)
+    average = total_units / len(ACADEMIC_QUARTERS)
+    largest = max((course.units for course in program.required_courses), default=0)
+    return Profile(id=profile_id, max_quarter_units=max(largest, math.ceil(average * slack), 12), min_quarter_units=0)
@@ -0,0 +1,83 @@
+"""
+GER coverage benchmark: encoding and check time of a program plus GER minimums as the elective
+catalog grows, with the number of catalog courses that survive pruning.
+
+    python -m benchmarks.ger_bench
+    python -m benchmarks.ger_bench --catalog-sizes 500 2000 --minimum 8 --output ger.json
+
+By default the minimums are Stanford's (Ways, Writing 2, Language); ``--minimum N`` asks for N
+courses of every GER instead, which leaves far more candidates for the cardinality constraints.
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, Optional
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.generator import generate_catalog, generate_profile, generate_program
+from benchmarks.solver_bench import git_commit
+
+DEFAULT_CATALOG_SIZES = [100, 500, 1000, 2000]
+STANFORD_MINIMUMS = {
+    "WAY_A_II": 2, "WAY_AQR": 1, "WAY_CE": 1, "WAY_EDP": 1, "WAY_ER": 1, "WAY_FR": 1, "WAY_SI": 2, "WAY_SMA": 2,
+    "WRITING_2": 1, "LANGUAGE": 3,
+}
+
+
+def bench_size(courses: int, catalog_size: int, seed: int, minimum: Optional[int] = None, headroom: int = 8) -> Dict[str, Any]:
+    from classes.components.enums import GER
+    from classes.constrain.profile import Profile
+    from classes.solver_config import SolverConfig
+
+    program = generate_program(courses, seed=seed)
+    catalog = generate_catalog(catalog_size, seed=seed)
+    minimums = {ger: minimum for ger in GER} if minimum is not None else {GER[name]: count for name, count in STANFORD_MINIMUMS.items()}
+    # Electives need room on top of the program's own load
+    profile = Profile(id="GER", max_quarter_units=generate_profile(program).max_quarter_units + headroom, ger_minimums=minimums)
+
+    start = time.perf_counter()
+    config = SolverConfig(program, profile, catalog=catalog)
+    encode_ms = (time.perf_counter() - start) * 1000
+    with config:
+        start = time.perf_counter()
+        result = config.check_solvable()
+        check_ms = (time.perf_counter() - start) * 1000
+        taken = len(set(config.extract_schedule()) & set(config.electives)) if str(result) == "sat" else 0
+        candidates = len(config.electives)
+
+    return {
+        "courses": courses,
+        "catalog": catalog_size,
+        "seed": seed,
+        "candidates": candidates,
+        "electives_taken": taken,
+        "result": str(result),
+        "encode_ms": encode_ms,
+        "check_ms": check_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=100, help="Required courses in the program")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=DEFAULT_CATALOG_SIZES)
+    parser.add_argument("--minimum", type=int, help="Courses required of every GER (default: Stanford's minimums)")
+    parser.add_argument("--headroom", type=int, default=8, help="Units per quarter above the program's own cap")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"commit": git_commit(), "results": []}
+    for catalog_size in args.catalog_sizes:
+        entry = bench_size(args.courses, catalog_size, args.seed, args.minimum, args.headroom)
+        report["results"].append(entry)
+        print(f"{catalog_size:>6} catalog  candidates={entry['candidates']:<5} taken={entry['electives_taken']:<4} "
+              f"{entry['result']:<6} encode={entry['encode_ms']:8.1f}ms check={entry['check_ms']:8.1f}ms", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
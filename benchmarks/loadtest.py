@@ -0,0 +1,297 @@
+"""
+Load test of the HTTP endpoints: closed-loop workers send a weighted mix of solves, reads, searches
+and writes through the same routes as controller.py, and the report gives throughput, p50/p95/p99
+latency and error rate overall and per operation.
+
+By default the Flask app runs in-process on an ephemeral port against mongomock; --mongo-uri points
+it at a local MongoDB instead and --url drives a running server (e.g. gunicorn). Either way the store
+is first seeded through the POST endpoints with programs, profiles and a catalog from the synthetic
+generator.
+
+    python -m benchmarks.loadtest --requests 500 --concurrency 16 --output load.json
+    python -m benchmarks.loadtest --mix solve=50,profile_write=30,catalog_write=20 --compare load.json
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 64
+
+Against a throwaway local MongoDB (TLS only if the URI asks for it):
+
+    docker run --rm -d -p 27017:27017 mongo:7
+    python -m benchmarks.loadtest --mongo-uri mongodb://127.0.0.1:27017/ --output load-mongo.json
+
+Operations (--mix weights, default solve=70,read=15,search=5,profile_write=5,catalog_write=5):
+    solve          GET /solve-user-schedule for a random program and one of its students
+    read           GET /get-program of a random program
+    search         GET /search-courses with a random title word
+    profile_write  POST /post-profile of a new student
+    catalog_write  POST /post-catalog-course replacing a catalog course (stored schedules are revalidated)
+    program_write  POST /post-program-course adding a 1-unit course; each one grows the program and makes
+                   the next solves of it compile again, so keep its weight low
+
+Any response other than 200 counts as an error; ``statuses`` shows which (503 is admission control
+or the request deadline, 0 a connection failure).
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.frontend_compare import _request, local_flask_server, percentile
+from benchmarks.generator import WORDS, generate_catalog, generate_course, generate_profile, generate_program
+from benchmarks.solver_bench import git_commit
+
+DEFAULT_MIX = {"solve": 70, "read": 15, "search": 5, "profile_write": 5, "catalog_write": 5}
+
+
+class Workload(NamedTuple):
+    """
+    What the seeding step stored, for the operations to pick from.
+
+    Attributes:
+        run_id (str): Prefix of the documents this run creates, so repeated runs do not collide.
+        students (Dict[str, List[str]]): Program id to the ids of profiles sized for it.
+        catalog_codes (List[str]): Codes of the seeded catalog courses.
+    """
+    run_id: str
+    students: Dict[str, List[str]]
+    catalog_codes: List[str]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """``solve=70,read=30`` to {"solve": 70, "read": 30}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"Weight of {name} must be an integer")
+        if mix[name] < 0:
+            raise ValueError(f"Weight of {name} must not be negative")
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return mix
+
+
+def _send(method: str, url: str, body: Optional[Dict[str, Any]] = None, timeout: float = 60) -> int:
+    try:
+        return _request(method, url, body, timeout)
+    except (urllib.error.URLError, OSError):
+        return 0
+
+
+def seed_store(base_url: str, programs: int, courses: int, students: int, catalog: int, seed: int) -> Workload:
+    """Posts ``programs`` generated programs with ``students`` profiles each and a ``catalog``-course catalog"""
+    run_id = f"LOAD{int(time.time()) % 100000}"
+    workload = Workload(run_id=run_id, students={}, catalog_codes=[])
+    for index in range(programs):
+        program = generate_program(courses, seed=seed + index, program_id=f"{run_id}-P{index}")
+        _expect(_send("POST", f"{base_url}/post-program", program.to_dict()), "post-program")
+        base = generate_profile(program)
+        workload.students[program.id] = []
+        for student in range(students):
+            # Different caps give different solve keys, so single flight does not hide the load
+            profile = {"id": f"{program.id}-S{student}", "max_quarter_units": base.max_quarter_units + student, "min_quarter_units": 0}
+            _expect(_send("POST", f"{base_url}/post-profile", profile), "post-profile")
+            workload.students[program.id].append(profile["id"])
+    for course in generate_catalog(catalog, seed=seed):
+        _expect(_send("POST", f"{base_url}/post-catalog-course", course.to_dict()), "post-catalog-course")
+        workload.catalog_codes.append(course.code)
+    return workload
+
+
+def _expect(status: int, what: str) -> None:
+    if status != 200:
+        raise RuntimeError(f"Seeding failed: {what} returned {status}")
+
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def _solve(rng: random.Random, number: int, workload: Workload) -> Request:
+    program_id = rng.choice(sorted(workload.students))
+    query = urllib.parse.urlencode({"program": program_id, "profile": rng.choice(workload.students[program_id])})
+    return "GET", f"/solve-user-schedule?{query}", None
+
+
+def _read(rng: random.Random, number: int, workload: Workload) -> Request:
+    return "GET", f"/get-program?program={rng.choice(sorted(workload.students))}", None
+
+
+def _search(rng: random.Random, number: int, workload: Workload) -> Request:
+    return "GET", f"/search-courses?q={rng.choice(WORDS)}&limit=20", None
+
+
+def _profile_write(rng: random.Random, number: int, workload: Workload) -> Request:
+    profile = {"id": f"{workload.run_id}-W{number}", "max_quarter_units": rng.randint(12, 24), "min_quarter_units": 0}
+    return "POST", "/post-profile", profile
+
+
+def _catalog_write(rng: random.Random, number: int, workload: Workload) -> Request:
+    code = rng.choice(workload.catalog_codes) if workload.catalog_codes else f"{workload.run_id}-C{number}"
+    return "POST", "/post-catalog-course", generate_course(rng, code).to_dict()
+
+
+def _program_write(rng: random.Random, number: int, workload: Workload) -> Request:
+    course = generate_course(rng, f"{workload.run_id}-N{number}", units={1: 1.0})
+    return "POST", "/post-program-course", {"id": rng.choice(sorted(workload.students)), "course": course.to_dict()}
+
+
+OPERATIONS: Dict[str, Callable[[random.Random, int, Workload], Request]] = {
+    "solve": _solve,
+    "read": _read,
+    "search": _search,
+    "profile_write": _profile_write,
+    "catalog_write": _catalog_write,
+    "program_write": _program_write,
+}
+
+
+def plan(requests: int, mix: Dict[str, int], workload: Workload, seed: int) -> List[Tuple[str, Request]]:
+    """The requests to send, built up front from ``seed`` so every run of a build sends the same ones"""
+    rng = random.Random(seed)
+    names = [name for name, weight in mix.items() if weight > 0]
+    kinds = rng.choices(names, weights=[mix[name] for name in names], k=requests)
+    return [(kind, OPERATIONS[kind](rng, number, workload)) for number, kind in enumerate(kinds)]
+
+
+def summarize(latencies: List[float], statuses: List[int], wall: float) -> Dict[str, Any]:
+    """Throughput over ``wall`` seconds, latency percentiles in ms, errors and the count of each status"""
+    counts: Dict[str, int] = {}
+    for status in statuses:
+        counts[str(status)] = counts.get(str(status), 0) + 1
+    errors = sum(status != 200 for status in statuses)
+    return {
+        "requests": len(statuses),
+        "throughput_rps": len(statuses) / wall if wall > 0 else 0.0,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "errors": errors,
+        "error_rate": errors / len(statuses) if statuses else 0.0,
+        "statuses": dict(sorted(counts.items())),
+    }
+
+
+def run_load(
+    base_url: str,
+    workload: Workload,
+    requests: int,
+    concurrency: int,
+    mix: Dict[str, int],
+    seed: int = 0,
+    warmup: bool = True,
+    timeout: float = 60
+) -> Dict[str, Any]:
+    """Sends the planned requests from ``concurrency`` closed-loop workers and summarizes them"""
+    if warmup:
+        # One solve per program, so compiling the program is not what the percentiles measure
+        for program_id, students in workload.students.items():
+            _send("GET", f"{base_url}/solve-user-schedule?program={program_id}&profile={students[0]}", timeout=timeout)
+
+    requests_plan = plan(requests, mix, workload, seed)
+    results: Dict[str, Tuple[List[float], List[int]]] = {kind: ([], []) for kind in mix if mix[kind] > 0}
+    lock = threading.Lock()
+
+    def one(item: Tuple[str, Request]) -> None:
+        kind, (method, path, body) = item
+        start = time.perf_counter()
+        status = _send(method, f"{base_url}{path}", body, timeout)
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[kind][0].append(elapsed)
+            results[kind][1].append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, requests_plan))
+    wall = time.perf_counter() - start
+
+    return {
+        "wall_s": wall,
+        "overall": summarize(
+            [latency for latencies, _ in results.values() for latency in latencies],
+            [status for _, statuses in results.values() for status in statuses],
+            wall
+        ),
+        "operations": {kind: summarize(latencies, statuses, wall) for kind, (latencies, statuses) in results.items() if statuses},
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Throughput, p50 and p99 of every operation next to an earlier report's, with their ratio"""
+    lines = []
+    current = {"overall": report["overall"], **report["operations"]}
+    previous = {"overall": baseline.get("overall", {}), **baseline.get("operations", {})}
+    for kind, entry in current.items():
+        old = previous.get(kind)
+        if not old:
+            continue
+        for metric in ("throughput_rps", "p50_ms", "p99_ms", "error_rate"):
+            before, after = old.get(metric), entry[metric]
+            if before is None:
+                continue
+            ratio = f"x{after / before:.2f}" if before else ""
+            lines.append(f"{kind:<14} {metric:<15} {before:10.2f} -> {after:10.2f}  {ratio}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Drive a running server instead of an in-process one")
+    parser.add_argument("--mongo-uri", help="Run the in-process server against this MongoDB instead of mongomock")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Operation weights, e.g. solve=80,profile_write=20")
+    parser.add_argument("--programs", type=int, default=3, help="Programs to seed")
+    parser.add_argument("--courses", type=int, default=50, help="Required courses per program")
+    parser.add_argument("--students", type=int, default=8, help="Profiles to seed per program")
+    parser.add_argument("--catalog", type=int, default=200, help="Catalog courses to seed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout of each request in seconds")
+    parser.add_argument("--no-warmup", action="store_true", help="Include each program's first (compiling) solve")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    def run(base_url: str) -> Dict[str, Any]:
+        workload = seed_store(base_url, args.programs, args.courses, args.students, args.catalog, args.seed)
+        return run_load(base_url, workload, args.requests, args.concurrency, args.mix, args.seed, not args.no_warmup, args.timeout)
+
+    if args.url:
+        result = run(args.url.rstrip("/"))
+    else:
+        overrides = {"MONGO_CONNECTION_STRING": args.mongo_uri} if args.mongo_uri else None
+        with local_flask_server(overrides) as base_url:
+            result = run(base_url)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "target": args.url or ("in-process (mongodb)" if args.mongo_uri else "in-process (mongomock)"),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "url", "mongo_uri")},
+        **result,
+    }
+    for kind, entry in {"overall": report["overall"], **report["operations"]}.items():
+        print(f"{kind:<14} {entry['requests']:>6} req  {entry['throughput_rps']:8.1f} rps  p50={entry['p50_ms']:8.1f}ms "
+              f"p95={entry['p95_ms']:8.1f}ms p99={entry['p99_ms']:8.1f}ms  errors={entry['error_rate']:.1%}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            print("\n".join(compare(report, json.load(file))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Preference benchmark: core-guided MaxSAT (``SolverConfig.optimize``) on generated programs with
+one TakeBy preference per course plus NoSummer and MaxUnits, i.e. 100+ soft constraints from 100
+courses on. Each size reports the plain feasibility check for reference, the MaxSAT search
+(time, checks, cost, lower bound) and a single Z3 Optimize call over the same soft constraints.
+
+    python -m benchmarks.maxsat_bench
+    python -m benchmarks.maxsat_bench --sizes 100 300 --deadline-ms 500 --output maxsat.json
+
+With a tight ``--deadline-ms`` the search stops early and reports the best schedule found so
+far; ``optimal`` is then False and ``lower_bound`` shows how far from optimal it can be.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.generator import generate_profile, generate_program
+from benchmarks.solver_bench import git_commit
+
+DEFAULT_SIZES = [100, 200, 300]
+
+
+def generate_preferences(program, seed: int, cap: int) -> List[Any]:
+    """NoSummer, MaxUnits a few units under the cap and a TakeBy of random weight per course"""
+    from classes.components.enums import Quarter
+    from classes.components.preference import Preference
+
+    rng = random.Random(seed)
+    preferences = [Preference("NoSummer", weight=5), Preference("MaxUnits", units=max(1, cap - 4), weight=2)]
+    for course in program.required_courses:
+        preferences.append(Preference("TakeBy", course=course.code, quarter=Quarter(rng.randint(0, 12)), weight=rng.randint(1, 5)))
+    return preferences
+
+
+def bench_size(courses: int, seed: int, deadline_ms: int) -> Dict[str, Any]:
+    from classes.constrain.profile import Profile
+    from classes.solver_config import SolverConfig
+    from z3 import Optimize, is_true
+
+    program = generate_program(courses, seed=seed)
+    cap = generate_profile(program).max_quarter_units
+    profile = Profile(id="PREF", max_quarter_units=cap, preferences=generate_preferences(program, seed, cap))
+
+    with SolverConfig(program, profile) as config:
+        start = time.perf_counter()
+        config.check_solvable()
+        check_ms = (time.perf_counter() - start) * 1000
+
+    def soft_constraints(config):
+        return [(constraint, preference.weight) for preference in profile.preferences for constraint in config._preference_constraints(preference)]
+
+    with SolverConfig(program, profile) as config:
+        soft = soft_constraints(config)
+        start = time.perf_counter()
+        result = config.optimize(deadline_ms)
+        maxsat_ms = (time.perf_counter() - start) * 1000
+
+    with SolverConfig(program, profile) as config:
+        # Same constraints, built again in this config's context
+        soft = soft_constraints(config)
+        optimize = Optimize(ctx=config.ctx)
+        optimize.set("timeout", deadline_ms)
+        optimize.add(config.get_assertions())
+        for constraint, weight in soft:
+            optimize.add_soft(constraint, weight)
+        start = time.perf_counter()
+        outcome = optimize.check()
+        optimize_ms = (time.perf_counter() - start) * 1000
+        optimize_cost = None
+        if str(outcome) == "sat":
+            model = optimize.model()
+            optimize_cost = sum(weight for constraint, weight in soft if not is_true(model.eval(constraint, model_completion=True)))
+
+    return {
+        "courses": courses,
+        "seed": seed,
+        "preferences": len(profile.preferences),
+        "soft_constraints": len(soft),
+        "check_ms": check_ms,
+        "maxsat_ms": maxsat_ms,
+        "checks": result.checks,
+        "cost": result.cost,
+        "lower_bound": result.lower_bound,
+        "optimal": result.optimal,
+        "optimize_ms": optimize_ms,
+        "optimize_cost": optimize_cost,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Required courses per program")
+    parser.add_argument("--deadline-ms", type=int, default=10000, help="Time budget of each search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"commit": git_commit(), "deadline_ms": args.deadline_ms, "results": []}
+    for size in args.sizes:
+        entry = bench_size(size, args.seed, args.deadline_ms)
+        report["results"].append(entry)
+        print(f"{size:>5} courses  preferences={entry['preferences']:<4} soft={entry['soft_constraints']:<4} check={entry['check_ms']:8.1f}ms "
+              f"maxsat={entry['maxsat_ms']:8.1f}ms checks={entry['checks']:<3} cost={entry['cost']} "
+              f"(lb {entry['lower_bound']}, {'optimal' if entry['optimal'] else 'deadline'})  "
+              f"optimize={entry['optimize_ms']:8.1f}ms cost={entry['optimize_cost']}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Feasible-quarter range analysis benchmark: solver checks used by SolverConfig.feasibility_matrix
+against the naive one check per (course, quarter) and against the pairs left after propagation.
+
+    python -m benchmarks.range_bench
+    python -m benchmarks.range_bench --sizes 25 100 --sparsity 0.2 --output range.json
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.generator import generate_profile, generate_program
+from benchmarks.solver_bench import git_commit
+
+DEFAULT_SIZES = [10, 25, 50, 100]
+
+
+def bench_size(courses: int, seed: int, sparsity: float) -> Dict[str, Any]:
+    from classes.components.enums import Quarter
+    from classes.solver_config import SolverConfig
+
+    program = generate_program(courses, offering_sparsity=sparsity, seed=seed)
+    profile = generate_profile(program)
+    start = time.perf_counter()
+    with SolverConfig(program, profile) as config:
+        analysis = config.feasibility_matrix()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    naive = courses * len(Quarter)
+    return {
+        "courses": courses,
+        "seed": seed,
+        "naive_checks": naive,
+        "candidates": analysis.candidates,
+        "checks": analysis.checks,
+        "checks_saved": naive - analysis.checks,
+        "feasible_pairs": sum(len(analysis.feasible_quarters(code)) for code in analysis.matrix),
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sparsity", type=float, default=0.5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"commit": git_commit(), "results": []}
+    for courses in args.sizes:
+        entry = bench_size(courses, args.seed, args.sparsity)
+        report["results"].append(entry)
+        print(f"{courses:>5} courses  checks={entry['checks']:<5} candidates={entry['candidates']:<5} "
+              f"naive={entry['naive_checks']:<6} saved={entry['checks_saved']:<6} {entry['elapsed_ms']:9.1f}ms", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Replays slow-solve captures (written by services.slow_capture) offline under different encodings,
+tactics and seeds and compares the check times with the one observed in production.
+
+    python -m benchmarks.replay /tmp/scheduler-slow-solves/20260101T120000-CS-1a2b3c4d.json
+    python -m benchmarks.replay capture.json --encodings smt2 rebuild --tactics default qflia --seeds 0 1 2
+
+Encodings:
+    smt2      the captured SMT-LIB2 assertions, exactly as production built them
+    rebuild   the captured program, profile and catalog documents encoded by the current SolverConfig,
+              to measure encoding changes against the same input
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+
+ENCODINGS = ("smt2", "rebuild")
+
+
+def load_capture(path: str) -> Dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def build_assertions(capture: Dict[str, Any], encoding: str, ctx) -> List[Any]:
+    """The capture's constraints in ``ctx`` under the given encoding"""
+    import z3
+
+    if encoding == "smt2":
+        return list(z3.parse_smt2_string(capture["smt2"], ctx=ctx))
+    if encoding == "rebuild":
+        from classes.components.course import Course
+        from classes.constrain.profile import Profile
+        from classes.constrain.program import Program
+        from classes.solver_config import SolverConfig
+
+        # Captures written before catalog electives existed have no catalog
+        catalog = [Course.from_dict(course_dict) for course_dict in capture.get("catalog", [])]
+        config = SolverConfig(Program.from_dict(capture["program"]), Profile.from_dict(capture["profile"]), catalog=catalog, ctx=ctx)
+        return list(config.get_assertions())
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def make_solver(tactic: str, ctx):
+    """``default`` is z3's general Solver; anything else names a z3 tactic (qflia, smt, ...)"""
+    import z3
+
+    if tactic == "default":
+        return z3.Solver(ctx=ctx)
+    return z3.Tactic(tactic, ctx).solver()
+
+
+def replay(capture: Dict[str, Any], encoding: str, tactic: str, seed: Optional[int], timeout_ms: Optional[int]) -> Dict[str, Any]:
+    import z3
+
+    ctx = z3.Context()
+    start = time.perf_counter()
+    assertions = build_assertions(capture, encoding, ctx)
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    solver = make_solver(tactic, ctx)
+    params = dict(capture.get("params", {}))
+    if timeout_ms is not None:
+        params["timeout"] = timeout_ms
+    if seed is not None:
+        params["random_seed"] = seed
+    for name, value in params.items():
+        solver.set(name, value)
+    solver.add(assertions)
+
+    start = time.perf_counter()
+    result = solver.check()
+    check_ms = (time.perf_counter() - start) * 1000
+    statistics = solver.statistics()
+    return {
+        "encoding": encoding,
+        "tactic": tactic,
+        "seed": seed,
+        "result": str(result),
+        "encode_ms": encode_ms,
+        "check_ms": check_ms,
+        "conflicts": statistics.get_key_value("conflicts") if "conflicts" in statistics.keys() else 0,
+    }
+
+
+def replay_all(
+    capture: Dict[str, Any],
+    encodings: List[str],
+    tactics: List[str],
+    seeds: List[Optional[int]],
+    timeout_ms: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    return [
+        replay(capture, encoding, tactic, seed, timeout_ms)
+        for encoding in encodings
+        for tactic in tactics
+        for seed in seeds
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Capture JSON file")
+    parser.add_argument("--encodings", nargs="+", choices=ENCODINGS, default=["smt2"])
+    parser.add_argument("--tactics", nargs="+", default=["default"])
+    parser.add_argument("--seeds", type=int, nargs="+", default=None, help="Random seeds (default: the captured parameters)")
+    parser.add_argument("--timeout-ms", type=int, help="Override the captured timeout")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    capture = load_capture(args.capture)
+    captured_ms = capture["elapsed_ms"]
+    print(f"captured {capture['captured_at']}: {capture['result']} in {captured_ms:.1f} ms "
+          f"({len(capture['program'].get('required_courses', []))} courses)")
+
+    results = []
+    for entry in replay_all(capture, args.encodings, args.tactics, args.seeds or [None], args.timeout_ms):
+        results.append(entry)
+        total = entry["encode_ms"] + entry["check_ms"]
+        print(f"{entry['encoding']:<8} {entry['tactic']:<10} seed={str(entry['seed']):<5} {entry['result']:<8} "
+              f"encode={entry['encode_ms']:9.1f}ms check={entry['check_ms']:9.1f}ms  x{total / captured_ms:.2f} of captured",
+              flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"capture": args.capture, "captured_ms": captured_ms, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
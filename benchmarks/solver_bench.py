@@ -0,0 +1,156 @@
+"""
+Solver benchmark: times SolverConfig construction, check_solvable, model extraction and the full
+/solve-user-schedule endpoint separately over generated programs of increasing size.
+
+    python -m benchmarks.solver_bench --output bench.json
+    python -m benchmarks.solver_bench --sizes 10 50 --compare bench.json
+
+Results are JSON (tagged with the git commit) so runs can be compared between commits; --compare
+prints the ratio of each median to the same measurement in an earlier report.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import benchmarks  # noqa: F401  (puts src on sys.path)
+from benchmarks.generator import generate_profile, generate_program
+
+DEFAULT_SIZES = [10, 25, 50, 100, 250, 500]
+PHASES = ["construct", "check", "extract", "endpoint"]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _endpoint_client(program, profile):
+    import mongomock
+    from controller import create_app
+
+    mongo_client = mongomock.MongoClient()
+    app = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "REQUEST_TIMEOUT_MS": 600000,
+        "MAX_REQUEST_TIMEOUT_MS": 600000,
+        "SINGLE_FLIGHT": "off",
+        "SLOW_SOLVE_MS": None
+    })
+    client = app.test_client()
+    client.post('/post-program', json=program.to_dict())
+    client.post('/post-profile', json=profile.to_dict())
+    return client
+
+
+def bench_size(
+    courses: int,
+    seed: int,
+    repeats: int,
+    depth: int,
+    density: float,
+    sparsity: float,
+    endpoint: bool,
+    disjunction_rate: float = 0.0
+) -> Dict[str, Any]:
+    from classes.solver_config import SolverConfig
+
+    program = generate_program(courses, depth=depth, density=density, offering_sparsity=sparsity, seed=seed, disjunction_rate=disjunction_rate)
+    profile = generate_profile(program)
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    result = None
+
+    for _ in range(repeats):
+        holder: Dict[str, SolverConfig] = {}
+        samples["construct"].append(_timed(lambda: holder.setdefault("config", SolverConfig(program=program, profile=profile))))
+        config = holder["config"]
+        samples["check"].append(_timed(lambda: holder.setdefault("result", config.check_solvable())))
+        result = str(holder["result"])
+        if result == "sat":
+            samples["extract"].append(_timed(config.extract_schedule))
+        config.close()
+
+    if endpoint:
+        client = _endpoint_client(program, profile)
+        url = f'/solve-user-schedule?program={program.id}&profile={profile.id}'
+        client.get(url)  # first request pays for caching the program
+        for _ in range(repeats):
+            samples["endpoint"].append(_timed(lambda: client.get(url)))
+
+    return {
+        "courses": courses,
+        "seed": seed,
+        "prereq_edges": sum(len(course.prereq_codes) for course in program.required_courses),
+        "max_quarter_units": profile.max_quarter_units,
+        "result": result,
+        "median_ms": {phase: statistics.median(values) for phase, values in samples.items() if values},
+        "samples_ms": samples,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """One line per (size, phase) with the current median as a multiple of the baseline's"""
+    previous = {(entry["courses"], entry["seed"]): entry for entry in baseline.get("results", [])}
+    lines = []
+    for entry in report["results"]:
+        old = previous.get((entry["courses"], entry["seed"]))
+        if old is None:
+            continue
+        for phase, value in entry["median_ms"].items():
+            before = old["median_ms"].get(phase)
+            if before:
+                lines.append(f"{entry['courses']:>5} {phase:<10} {before:10.2f} -> {value:10.2f} ms  x{value / before:.2f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--sparsity", type=float, default=0.5)
+    parser.add_argument("--disjunction-rate", type=float, default=0.0, help="Share of prerequisites with an Or alternative")
+    parser.add_argument("--no-endpoint", action="store_true", help="Skip the full endpoint timing")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare medians against")
+    args = parser.parse_args()
+
+    import z3
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "z3": z3.get_version_string(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": [],
+    }
+    for courses in args.sizes:
+        entry = bench_size(courses, args.seed, args.repeats, args.depth, args.density, args.sparsity, not args.no_endpoint, args.disjunction_rate)
+        report["results"].append(entry)
+        medians = "  ".join(f"{phase}={value:.1f}ms" for phase, value in entry["median_ms"].items())
+        print(f"{courses:>5} courses  {entry['result']:<7} {medians}", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            print("\n".join(compare(report, json.load(file))))
+
+
+if __name__ == "__main__":
+    main()
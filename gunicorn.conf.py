@@ -0,0 +1,26 @@
+# Production server configuration, picked up automatically by running `gunicorn` from the repo root.
+import multiprocessing
+import os
+
+pythonpath = "src"
+wsgi_app = "wsgi:app"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Load the app (and preload programs) in the master so workers share it copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from controller import after_fork
+    after_fork(app)
+
+
+def post_worker_init(worker):
+    # Each worker warms its own z3 state and Mongo client before accepting traffic
+    from wsgi import app
+    from controller import warm_up
+    state = app.extensions["scheduler"]
+    timings = warm_up(app, app.config["WARMUP_PROGRAMS"] or state.preloaded)
+    worker.log.info("Warmed %d programs in %.3fs", len(timings), sum(timings.values()))
@@ -0,0 +1,321 @@
+import sys
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+# Add 'src' to the Python search path regardless of the working directory
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from quart import Quart, current_app, jsonify, request
+from quart_cors import cors
+from classes.components.course import Course
+from classes.constrain.program import Program, ProgramConflict
+from classes.constrain.profile import Profile
+from services.database import MongoProvider, default_async_client_factory
+from services.impact import AsyncRepairQueue, Change, validate_schedule
+from services.preload import AsyncProgramUsage
+from services.schedule_service import (
+    CATALOG_COLLECTION, SCHEDULE_COLLECTION, catalog_query, invalid_offered_quarter, schedule_from_names, solve_documents
+)
+from services.settings import resolve_config
+from typing import Any, Dict, List, Optional
+
+# ASGI front-end for the solve and write routes of controller.py, with the same payloads: Mongo I/O
+# is awaited on Motor and Z3 solves run in a bounded process pool, so one process can hold thousands
+# of open connections. Solves take one program, have no deadline and are not stored; every other
+# route is served by the Flask app only (see the README).
+# Run with e.g. `hypercorn --chdir src asgi:app` or `uvicorn --app-dir src asgi:app`.
+
+
+class AsyncSchedulerState:
+    """
+    Per-app resources for the ASGI front-end, stored in ``app.extensions["scheduler"]``.
+
+    Attributes:
+        mongo (MongoProvider): Lazily connected Motor client.
+        solver_processes (int): Size of the solver process pool; 0 solves on the loop's default thread pool.
+        max_pending (int): Solves submitted to the pool at once; further requests wait without holding a worker.
+        repair_queue (AsyncRepairQueue): Stored schedules a program or catalog edit broke.
+        program_usage (AsyncProgramUsage): Solves per program, flushed to Mongo by a task on the loop.
+    """
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.mongo = MongoProvider(
+            connection_string=config["MONGO_CONNECTION_STRING"],
+            database_name=config["MONGO_DATABASE"],
+            client_factory=config.get("MONGO_CLIENT_FACTORY") or default_async_client_factory
+        )
+        self.solver_processes = config["SOLVER_PROCESSES"]
+        self.max_pending = max(1, self.solver_processes) * config["SOLVER_PENDING_PER_PROCESS"]
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._repair_queue: Optional[AsyncRepairQueue] = None
+        self.program_usage = AsyncProgramUsage(lambda: self.mongo.db, config["USAGE_FLUSH_S"])
+        self._usage_flusher: Optional[asyncio.Task] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        if self._executor is None and self.solver_processes > 0:
+            # spawn: forking a process that runs an event loop and Motor threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.solver_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @property
+    def repair_queue(self) -> AsyncRepairQueue:
+        if self._repair_queue is None:
+            self._repair_queue = AsyncRepairQueue(self.mongo.collection(SCHEDULE_COLLECTION))
+        return self._repair_queue
+
+    async def solve(
+        self,
+        program_dict: Dict[str, Any],
+        profile_dict: Dict[str, Any],
+        catalog_dicts: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, solve_documents, program_dict, profile_dict, catalog_dicts)
+
+    def start(self) -> None:
+        self._usage_flusher = asyncio.get_running_loop().create_task(self.program_usage.run())
+
+    async def shutdown(self) -> None:
+        if self._usage_flusher is not None:
+            self._usage_flusher.cancel()
+            self._usage_flusher = None
+        # Solves counted since the last flush
+        await self.program_usage.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.mongo.close()
+
+
+def create_asgi_app(config: Optional[Dict[str, Any]] = None) -> Quart:
+    """Builds the Quart app; like ``create_app`` nothing connects until the first request"""
+    app = Quart(__name__)
+    app.config.update(resolve_config(config))
+    app = cors(app)
+
+    state = AsyncSchedulerState(app.config)
+    app.extensions["scheduler"] = state
+
+    @app.before_serving
+    async def _start() -> None:
+        state.start()
+
+    @app.after_serving
+    async def _shutdown() -> None:
+        await state.shutdown()
+
+    _register_routes(app)
+    return app
+
+
+def get_state() -> AsyncSchedulerState:
+    return current_app.extensions["scheduler"]
+
+
+def _without_object_id(document: Dict[str, Any]) -> Dict[str, Any]:
+    document.pop("_id", None)
+    return document
+
+
+async def _load_program(program_ids: List[str]) -> Optional[Program]:
+    """The program, or the merged program for several ids; None when one is missing"""
+    program_dicts = await get_state().mongo.collection("Programs").find({"id": {"$in": program_ids}}).to_list(length=None)
+    by_id = {program_dict["id"]: program_dict for program_dict in program_dicts}
+    if not program_ids or any(program_id not in by_id for program_id in program_ids):
+        return None
+    programs = [Program.from_dict(_without_object_id(by_id[program_id])) for program_id in program_ids]
+    return programs[0] if len(programs) == 1 else Program.merge(programs)
+
+
+async def _revalidate(change: Change, catalog: List[Course] = ()) -> int:
+    """Same as ``controller._revalidate``: queues the stored schedules ``change`` broke, returns how many"""
+    state = get_state()
+    documents = await state.repair_queue.affected(change)
+    profile_ids = list({document["profile"] for document in documents})
+    profile_dicts = await state.mongo.collection("Profiles").find({"id": {"$in": profile_ids}}).to_list(length=None)
+    profiles = {profile_dict["id"]: profile_dict for profile_dict in profile_dicts}
+
+    programs = {}
+    queued = 0
+    for document in documents:
+        if document["program"] not in programs:
+            try:
+                programs[document["program"]] = await _load_program(document.get("programs") or document["program"].split("+"))
+            except ProgramConflict as conflict:
+                programs[document["program"]] = conflict
+        program = programs[document["program"]]
+        if isinstance(program, ProgramConflict):
+            # The combined programs no longer agree on a course, so no stored plan can hold
+            await state.repair_queue.enqueue(document["_id"], [str(program)])
+            queued += 1
+            continue
+        profile_dict = profiles.get(document["profile"])
+        if program is None or profile_dict is None:
+            continue
+        profile_obj = Profile.from_dict(_without_object_id(profile_dict))
+        violations = validate_schedule(
+            schedule_from_names(document["schedule"]), program,
+            profile_obj.completed_courses, profile_obj.max_quarter_units, catalog
+        )
+        if violations:
+            await state.repair_queue.enqueue(document["_id"], violations)
+            queued += 1
+    return queued
+
+
+def _register_routes(app: Quart) -> None:
+
+    @app.get('/solve-user-schedule')
+    async def solve_user_schedule():
+
+        # Extracting URL parameters
+        program_id = request.args.get("program")
+        profile_id = request.args.get("profile")
+
+        # Pulling documents concurrently
+        db = get_state().mongo.db
+        program_dict, profile_dict = await asyncio.gather(
+            db["Programs"].find_one({"id": program_id}),
+            db["Profiles"].find_one({"id": profile_id})
+        )
+        if program_dict is None:
+            return jsonify({"error": f"No program found with ID {program_id}"}), 404
+        if profile_dict is None:
+            return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+
+        get_state().program_usage.record(program_id)
+
+        # GER electives come from the catalog; only profiles with GER minimums need any
+        catalog_dicts = []
+        query = catalog_query(Profile.from_dict(profile_dict))
+        if query is not None:
+            catalog_dicts = await db[CATALOG_COLLECTION].find(query, {"_id": 0}).to_list(length=None)
+
+        # Deserializing and solving both happen in the solver process
+        payload = await get_state().solve(_without_object_id(program_dict), _without_object_id(profile_dict), catalog_dicts)
+        return jsonify(payload), 200
+
+
+    # Insert a program document into DB
+    @app.post('/post-program')
+    async def post_program():
+        collection = get_state().mongo.collection("Programs")
+
+        # Pseudo validation (Add real validation)
+        request_json = await request.get_json()
+        program_insert = Program.from_dict(request_json).to_dict()
+        program_insert["version"] = 1
+
+        inserted_id = (await collection.insert_one(program_insert)).inserted_id
+        return jsonify({"result": f"Inserted ID: {inserted_id}"}), 200
+
+
+    @app.post('/post-program-course')
+    async def post_program_course():
+        collection = get_state().mongo.collection("Programs")
+
+        # Accessing request information
+        request_json = await request.get_json()
+        course = request_json['course']
+        program_id = request_json['id']
+
+        # Validating for valid (offered quarters) string
+        quarter_string = invalid_offered_quarter(course)
+        if quarter_string is not None:
+            return jsonify({"error": f"Invalid quarter offered string: {quarter_string}"}), 400
+
+        result = await collection.update_one(
+            {"id": program_id},
+            {"$push": {"required_courses": course}, "$inc": {"version": 1}}
+        )
+        if result.matched_count == 0:
+            return jsonify({"error": f"No program found with ID {program_id}"}), 404
+        invalidated = await _revalidate(Change("course_added", course["code"], program_id))
+
+        return jsonify({
+            "result": f"Course {course['code']}: {course['title']} added to program {program_id}",
+            "invalidated": invalidated
+        }), 200
+
+
+    @app.post('/post-prereq-course')
+    async def post_prereq_course():
+        collection = get_state().mongo.collection("Programs")
+
+        # Accessing request information
+        request_json = await request.get_json()
+        program_id = request_json['id']
+        course_code = request_json['course']
+        prereq_course = request_json['prereq_course']
+
+        result = await collection.update_one(
+            {"id": program_id, "required_courses": {"$elemMatch": {"code": course_code}}},
+            {"$push": {"required_courses.$.prereqs": prereq_course}, "$inc": {"version": 1}}
+        )
+        if result.matched_count == 0:
+            return jsonify({"error": f"No program found with ID {program_id} or course with code {course_code}"}), 404
+        if result.modified_count == 0:
+            return jsonify({"error": f"Course {course_code} not found in program {program_id}"}), 404
+        invalidated = await _revalidate(Change("prereq_added", course_code, program_id))
+
+        return jsonify({
+            "result": f"Prereq course {prereq_course} added to course {course_code} in program {program_id}",
+            "invalidated": invalidated
+        }), 200
+
+
+    @app.post('/post-catalog-course')
+    async def post_catalog_course():
+        collection = get_state().mongo.collection(CATALOG_COLLECTION)
+
+        course = await request.get_json()
+        quarter_string = invalid_offered_quarter(course)
+        if quarter_string is not None:
+            return jsonify({"error": f"Invalid quarter offered string: {quarter_string}"}), 400
+        try:
+            course_insert = Course.from_dict(course).to_dict()
+        except KeyError as error:
+            return jsonify({"error": f"Invalid GER or grade name: {error.args[0]}"}), 400
+
+        await collection.replace_one({"code": course_insert["code"]}, course_insert, upsert=True)
+        catalog_course = Course.from_dict(course_insert)
+        invalidated = await _revalidate(Change("offering_changed", catalog_course.code), [catalog_course])
+
+        return jsonify({
+            "result": f"Course {course_insert['code']}: {course_insert['title']} added to the catalog",
+            "invalidated": invalidated
+        }), 200
+
+
+    @app.post('/post-profile')
+    async def post_profile():
+        collection = get_state().mongo.collection("Profiles")
+
+        # Pseudo validation (Add real validation)
+        request_json = await request.get_json()
+        try:
+            profile_insert = Profile.from_dict(request_json).to_dict()
+        except KeyError as error:
+            return jsonify({"error": f"Invalid quarter or GER name: {error.args[0]}"}), 400
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        # Versioned like programs, for the ETags of /get-profile
+        profile_insert["version"] = 1
+
+        inserted_id = (await collection.insert_one(profile_insert)).inserted_id
+        return jsonify({"result": f"Inserted ID: {inserted_id}"}), 200
+
+
+# Module-level app for ASGI servers; building it does not connect to Mongo or start solver processes
+app = create_asgi_app()
@@ -1,5 +1,6 @@
 from typing import List, Optional, Union, Dict, Any
 from classes.components.enums import Quarter, GER, Grade, Grading
+from classes.components.prereq import Prereq, item_from_dict, item_to_dict, prereq_codes
 
 class Course:
     """
@@ -10,7 +11,8 @@ class Course:
         title (str): The course title.
         units (int or tuple[int, int]): Course units.
         description (str): Course description.
-        prereqs (List[Course]): List of prerequisite courses.
+        prereqs (List[Union[str, Prereq]]): Prerequisite course codes, all required; an item may be
+            a nested Prereq such as "CS106B or CS106X".
         coreqs (List[Course]): List of corequisite courses.
         offered_quarters (List[Quarter]): Quarters the course is offered.
         instructors (List[List[str]]): List of instructors per quarter.
@@ -26,7 +28,7 @@ class Course:
         title: str = None,
         units: Union[int, tuple[int, int]] = None,
         description: str = None,
-        prereqs: Optional[List[str]] = [],
+        prereqs: Optional[List[Union[str, Prereq]]] = [],
         coreqs: Optional[List['Course']] = [],
         offered_quarters: Optional[List[Quarter]] = [],
         instructors: Optional[List[str]] = [],
@@ -64,7 +66,7 @@ class Course:
             title=dict.get("title"),
             units=dict.get("units"),
             description=dict.get("description"),
-            prereqs=[code for code in dict.get("prereqs")] if dict.get("prereqs") != None else [],
+            prereqs=[item_from_dict(item) for item in dict.get("prereqs")] if dict.get("prereqs") != None else [],
             coreqs=[cls.from_dict(course_dict) for course_dict in dict.get("coreqs")] if dict.get("coreqs") != None else [],
             offered_quarters=[Quarter[quarter_name] for quarter_name in dict.get("offered_quarters")] if dict.get("offered_quarters") != None else [], 
             instructors=dict.get("instructors"),
@@ -77,10 +79,10 @@ class Course:
     
     
     
-    def add_prereq(self, prereq: str) -> None:
-        """Add a prerequisite to the course."""
-        if not isinstance(prereq, str):
-            raise TypeError(f"Prerequisite must be a string, but got {type(prereq).__name__}")
+    def add_prereq(self, prereq: Union[str, Prereq]) -> None:
+        """Add a prerequisite (a course code or a nested Prereq) to the course."""
+        if not isinstance(prereq, (str, Prereq)):
+            raise TypeError(f"Prerequisite must be a string or Prereq, but got {type(prereq).__name__}")
         self._prereqs.append(prereq)
     
     def add_coreq(self, coreq: 'Course') -> None:
@@ -96,7 +98,7 @@ class Course:
             "title": self._title,
             "units": self._units,
             "description": self._description,
-            "prereqs": [code for code in self._prereqs],
+            "prereqs": [item_to_dict(item) for item in self._prereqs],
             "coreqs": [course.to_dict() for course in self._coreqs],
             "offered_quarters": [quarter.name for quarter in self._offered_quarters],
             "instructors": self._instructors,
@@ -124,10 +126,14 @@ class Course:
     def description(self) -> str:
         return self._description
     @property
-    def prereqs(self) -> List['Course']:
-        """Return the list of prerequisite courses."""
+    def prereqs(self) -> List[Union[str, Prereq]]:
+        """Return the list of prerequisites (course codes and nested Prereq requirements)."""
         return self._prereqs
     @property
+    def prereq_codes(self) -> List[str]:
+        """Return every course code the prerequisites mention, alternatives included."""
+        return prereq_codes(self._prereqs)
+    @property
     def coreqs(self) -> List['Course']:
         """Return the list of corequisite courses."""
         return self._coreqs
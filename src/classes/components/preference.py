@@ -0,0 +1,78 @@
+from typing import Any, Dict
+from classes.components.enums import Quarter
+
+PREFERENCE_TYPES = ("NoSummer", "QuarterOff", "TakeBy", "MaxUnits")
+
+class Preference:
+    """
+    A weighted soft constraint of a profile such as "no classes in summer" or "take CS107 early".
+    The solver honours as many preferences as it can; when they conflict with each other, the
+    schedule leaves out the ones with the least total weight.
+
+    Attributes:
+        type (str): "NoSummer" (no courses in any summer quarter), "QuarterOff" (no courses in
+            ``quarter``), "TakeBy" (``course`` in ``quarter`` or earlier) or "MaxUnits" (at most
+            ``units`` units in a quarter). NoSummer and MaxUnits are weighed per quarter, so a
+            schedule with one heavy quarter beats one with three
+        weight (int): Cost of not honouring the preference, at least 1
+        course (str): Course code for TakeBy
+        quarter (Quarter): Quarter for QuarterOff and TakeBy
+        units (int): Unit limit for MaxUnits
+    """
+    def __init__(self, type: str, weight: int = 1, course: str = None, quarter: Quarter = None, units: int = None):
+        if type not in PREFERENCE_TYPES:
+            raise ValueError(f"Preference type must be one of {', '.join(PREFERENCE_TYPES)}, but got {type}")
+        if not isinstance(weight, int) or weight < 1:
+            raise ValueError(f"Preference weight must be a positive integer, but got {weight}")
+        if type in ("QuarterOff", "TakeBy") and quarter is None:
+            raise ValueError(f"{type} preference needs a quarter")
+        if type == "TakeBy" and course is None:
+            raise ValueError("TakeBy preference needs a course")
+        if type == "MaxUnits" and units is None:
+            raise ValueError("MaxUnits preference needs units")
+        self._type = type
+        self._weight = weight
+        self._course = course
+        self._quarter = quarter
+        self._units = units
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self._type,
+            "weight": self._weight,
+            "course": self._course,
+            "quarter": self._quarter.name if self._quarter != None else None,
+            "units": self._units
+        }
+
+    @classmethod
+    def from_dict(cls, dict) -> 'Preference':
+        return cls(
+            type=dict.get("type"),
+            weight=dict.get("weight") if dict.get("weight") != None else 1,
+            course=dict.get("course"),
+            quarter=Quarter[dict.get("quarter")] if dict.get("quarter") != None else None,
+            units=dict.get("units")
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Preference) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Preference({self.to_dict()})"
+
+    @property
+    def type(self) -> str:
+        return self._type
+    @property
+    def weight(self) -> int:
+        return self._weight
+    @property
+    def course(self) -> str:
+        return self._course
+    @property
+    def quarter(self) -> Quarter:
+        return self._quarter
+    @property
+    def units(self) -> int:
+        return self._units
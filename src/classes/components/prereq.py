@@ -0,0 +1,82 @@
+from typing import Any, Dict, FrozenSet, List, Union
+
+class Prereq:
+    """
+    A nested prerequisite requirement such as "CS106B or CS106X". A course's prerequisite list
+    holds course codes and Prereq objects and means that every item is required, so a flat list
+    of codes keeps its old meaning.
+
+    Attributes:
+        type (str): "And" when every object is required, "Or" when one of them is enough
+        objects (List[Union[str, Prereq]]): Course codes and nested requirements
+    """
+    def __init__(self, type: str, objects: List[Union[str, 'Prereq']]):
+        if type not in ("And", "Or"):
+            raise ValueError(f"Prerequisite type must be And or Or, but got {type}")
+        self._type = type
+        self._objects = objects
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self._type,
+            "objects": [item_to_dict(obj) for obj in self._objects]
+        }
+
+    @classmethod
+    def from_dict(cls, dict) -> 'Prereq':
+        return cls(
+            type=dict.get("type"),
+            objects=[item_from_dict(obj) for obj in dict.get("objects")] if dict.get("objects") != None else []
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Prereq) and self._type == other._type and self._objects == other._objects
+
+    def __hash__(self) -> int:
+        return hash((self._type, tuple(self._objects)))
+
+    def __repr__(self) -> str:
+        return f"{self._type}({', '.join(map(repr, self._objects))})"
+
+    @property
+    def type(self) -> str:
+        return self._type
+    @property
+    def objects(self) -> List[Union[str, 'Prereq']]:
+        return self._objects
+
+
+def item_to_dict(item: Union[str, Prereq]) -> Union[str, Dict[str, Any]]:
+    return item.to_dict() if isinstance(item, Prereq) else item
+
+def item_from_dict(item: Union[str, Dict[str, Any]]) -> Union[str, Prereq]:
+    return Prereq.from_dict(item) if isinstance(item, dict) else item
+
+
+def prereq_codes(items: List[Union[str, Prereq]]) -> List[str]:
+    """Every course code a prerequisite list mentions, in order and without repeats"""
+    codes: Dict[str, None] = {}
+    pending = list(reversed(items))
+    while pending:
+        item = pending.pop()
+        if isinstance(item, Prereq):
+            pending.extend(reversed(item.objects))
+        else:
+            codes.setdefault(item)
+    return list(codes)
+
+def necessary_codes(items: List[Union[str, Prereq]], known: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Codes among ``known`` that every way of satisfying the list needs. Codes outside ``known``
+    count as satisfied, so an Or branch made only of them needs nothing
+    """
+    def necessary(item) -> FrozenSet[str]:
+        if not isinstance(item, Prereq):
+            return frozenset([item]) if item in known else frozenset()
+        branches = [necessary(obj) for obj in item.objects]
+        if not branches:
+            return frozenset()
+        if item.type == "And":
+            return frozenset().union(*branches)
+        return frozenset.intersection(*branches)
+    return frozenset().union(*(necessary(item) for item in items)) if items else frozenset()
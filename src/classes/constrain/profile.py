@@ -1,17 +1,39 @@
-from typing import Dict, Any
+from classes.components.enums import GER, Quarter
+from classes.components.preference import Preference
+from typing import Dict, Any, List
 
 class Profile:
     
-    """User-set constraints for the solver"""
+    """
+    User-set constraints for the solver
+
+    Attributes:
+        id (str): Profile id
+        max_quarter_units (int): Most units per quarter
+        min_quarter_units (int): Fewest units per quarter
+        completed_courses (List[str]): Codes of courses already taken (transcript); they are not scheduled
+        current_quarter (Quarter): First quarter still to plan, None to plan from FRESH_FALL
+        ger_minimums (Dict[GER, int]): Fewest courses to count toward each GER (e.g. 2 for WAY_SMA);
+            program, transcript and catalog electives all count, a course toward every GER it carries
+        preferences (List[Preference]): Weighted soft constraints the solver honours when it can
+    """
     def __init__(
         self, 
         id: str,
         max_quarter_units: int = 20,
         min_quarter_units: int = 12,
+        completed_courses: List[str] = None,
+        current_quarter: Quarter = None,
+        ger_minimums: Dict[GER, int] = None,
+        preferences: List[Preference] = None,
     ):
         self._id = id
         self._max_quarter_units = max_quarter_units
         self._min_quarter_units = min_quarter_units
+        self._completed_courses = completed_courses if completed_courses is not None else []
+        self._current_quarter = current_quarter
+        self._ger_minimums = ger_minimums if ger_minimums is not None else {}
+        self._preferences = preferences if preferences is not None else []
         
     
     
@@ -26,7 +48,11 @@ class Profile:
         return cls(
             id=dict.get("id"),
             max_quarter_units=dict.get("max_quarter_units"),
-            min_quarter_units=dict.get("min_quarter_units")
+            min_quarter_units=dict.get("min_quarter_units"),
+            completed_courses=dict.get("completed_courses") if dict.get("completed_courses") != None else [],
+            current_quarter=Quarter[dict.get("current_quarter")] if dict.get("current_quarter") != None else None,
+            ger_minimums={GER[ger_name]: count for ger_name, count in dict.get("ger_minimums").items()} if dict.get("ger_minimums") != None else {},
+            preferences=[Preference.from_dict(preference) for preference in dict.get("preferences")] if dict.get("preferences") != None else []
         )
     
     
@@ -38,7 +64,11 @@ class Profile:
         return {
             "id": self._id,
             "max_quarter_units": self._max_quarter_units,
-            "min_quarter_units": self._min_quarter_units
+            "min_quarter_units": self._min_quarter_units,
+            "completed_courses": self._completed_courses,
+            "current_quarter": self._current_quarter.name if self._current_quarter != None else None,
+            "ger_minimums": {ger.name: count for ger, count in self._ger_minimums.items()},
+            "preferences": [preference.to_dict() for preference in self._preferences]
         }
     
     
@@ -53,6 +83,22 @@ class Profile:
     @property
     def min_quarter_units(self) -> int:
         return self._min_quarter_units
+    @property
+    def completed_courses(self) -> List[str]:
+        return self._completed_courses
+    @property
+    def current_quarter(self) -> Quarter:
+        return self._current_quarter
+    @property
+    def ger_minimums(self) -> Dict[GER, int]:
+        return self._ger_minimums
+    @property
+    def preferences(self) -> List[Preference]:
+        return self._preferences
+    @property
+    def has_transcript(self) -> bool:
+        """True when the student is partway through, i.e. the solver model can be shrunk"""
+        return bool(self._completed_courses) or (self._current_quarter != None and self._current_quarter.value > 0)
     
     """Setters"""
     @max_quarter_units.setter
@@ -2,6 +2,11 @@ from classes.components.course import Course
 from classes.components.pool import Pool
 from typing import List, Dict, Any
 
+
+class ProgramConflict(ValueError):
+    """Raised when programs merged into one disagree on a shared course so that no plan can honour both"""
+
+
 class Program:
     
     """
@@ -36,6 +41,55 @@ class Program:
     
     
     
+    """_summary_
+    Combines several programs (e.g. a major and a minor) into one program over the union of
+    their distinct courses. A course listed by several programs appears once: offered quarters
+    are intersected, prerequisites are unioned and the largest unit count wins. Every program's
+    pools are kept, over the shared courses. Raises ProgramConflict when two listings of a
+    course share no offered quarter.
+    """
+    @classmethod
+    def merge(cls, programs: List['Program']) -> 'Program':
+        if len(programs) == 1:
+            return programs[0]
+        merged: Dict[str, Course] = {}
+        for program in programs:
+            for course in program.required_courses:
+                existing = merged.get(course.code)
+                if existing is None:
+                    merged[course.code] = course
+                    continue
+                # A quarter counts only if every listing offers the course then
+                offered = [quarter for quarter in existing.offered_quarters if quarter in course.offered_quarters]
+                if not offered and existing.offered_quarters and course.offered_quarters:
+                    listed = [", ".join(quarter.name for quarter in listing.offered_quarters) for listing in (existing, course)]
+                    raise ProgramConflict(
+                        f"Programs {'+'.join(program.id for program in programs)} offer {course.code} in different quarters "
+                        f"({listed[0]} vs {listed[1]})"
+                    )
+                merged[course.code] = Course(
+                    code=existing.code,
+                    title=existing.title,
+                    units=max(existing.units or 0, course.units or 0),
+                    description=existing.description,
+                    prereqs=existing.prereqs + [prereq for prereq in course.prereqs if prereq not in existing.prereqs],
+                    coreqs=existing.coreqs,
+                    offered_quarters=offered,
+                    instructors=existing.instructors,
+                    median_hrs=existing.median_hrs,
+                    median_grade=existing.median_grade,
+                    percent_A_A_plus=existing.percent_A_A_plus,
+                    ug_reqs=(existing.ug_reqs or []) + [ger for ger in course.ug_reqs or [] if ger not in (existing.ug_reqs or [])],
+                    grading=existing.grading
+                )
+        return cls(
+            id="+".join(program.id for program in programs),
+            required_courses=list(merged.values()),
+            pools=[pool for program in programs for pool in program.pools or []]
+        )
+    
+    
+    
     """_summary_
     Converts the current Program object into a dictionary representation
     """
@@ -0,0 +1,183 @@
+from classes.constrain.program import Program
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.components.prereq import Prereq, necessary_codes
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+class ProgramIndex:
+
+    """
+    Read-only, profile-independent metadata derived from a Program.
+
+    Built once per program version and shared between solves (and, under gunicorn preload,
+    between forked workers), so nothing here may be mutated after construction.
+
+    Attributes:
+        codes (Tuple[str, ...]): Course codes in program order.
+        courses (Dict[str, Course]): Course code to course object.
+        prereq_graph (Dict[str, FrozenSet[str]]): Course code to prerequisite codes inside the program,
+            alternatives of an Or included.
+        necessary (Dict[str, FrozenSet[str]]): Course code to the prerequisites inside the program that
+            every way of satisfying its prerequisites needs (all of them for a flat list).
+        dependents (Dict[str, FrozenSet[str]]): Course code to codes of courses whose prerequisites mention it.
+        topological_order (Optional[Tuple[str, ...]]): Prerequisites-first order, or None if the graph has a cycle.
+        earliest (Dict[str, Optional[int]]): Earliest feasible quarter value after propagating prerequisites.
+        latest (Dict[str, Optional[int]]): Latest feasible quarter value after propagating dependents.
+        start_quarter (int): Quarter value before which nothing can be scheduled (a student's current quarter).
+    """
+    def __init__(self, program: Program, start_quarter: int = 0) -> None:
+        self._start_quarter = start_quarter
+        self._codes: Tuple[str, ...] = tuple(course.code for course in program.required_courses)
+        self._courses: Dict[str, Course] = {course.code: course for course in program.required_courses}
+
+        prereq_graph: Dict[str, set] = defaultdict(set)
+        dependents: Dict[str, set] = defaultdict(set)
+        for course in program.required_courses:
+            for prereq in course.prereq_codes:
+                # Prerequisites outside the program are assumed to be satisfied elsewhere
+                if prereq in self._courses:
+                    prereq_graph[course.code].add(prereq)
+                    dependents[prereq].add(course.code)
+        self._prereq_graph: Dict[str, FrozenSet[str]] = {code: frozenset(prereqs) for code, prereqs in prereq_graph.items()}
+        self._dependents: Dict[str, FrozenSet[str]] = {code: frozenset(codes) for code, codes in dependents.items()}
+        known = frozenset(self._courses)
+        self._necessary: Dict[str, FrozenSet[str]] = {
+            code: necessary_codes(course.prereqs, known) for code, course in self._courses.items() if code in self._prereq_graph
+        }
+
+        self._topological_order = self._topological_sort()
+        self._earliest, self._latest = self._propagate_bounds()
+
+
+
+    def _topological_sort(self) -> Optional[Tuple[str, ...]]:
+        """Kahn's algorithm; returns None when the prerequisite graph is cyclic"""
+        remaining = {code: len(self._prereq_graph.get(code, ())) for code in self._codes}
+        ready = [code for code in self._codes if remaining[code] == 0]
+        order: List[str] = []
+        while ready:
+            code = ready.pop()
+            order.append(code)
+            for dependent in self._dependents.get(code, ()):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return tuple(order) if len(order) == len(self._codes) else None
+
+    def _propagate_bounds(self) -> Tuple[Dict[str, Optional[int]], Dict[str, Optional[int]]]:
+        """
+        Forward pass: a course cannot be earlier than one past its latest-starting prerequisite
+        (the earliest-starting alternative of an Or).
+        Backward pass: a course cannot be later than one before its earliest-finishing dependent,
+        counting only dependents that need it whichever alternative they take.
+        A bound of None means no offered quarter survives, i.e. the program is infeasible.
+        """
+        offered = {code: sorted(q.value for q in course.offered_quarters if q.value >= self._start_quarter) for code, course in self._courses.items()}
+        if self._topological_order is None:
+            return (
+                {code: (values[0] if values else None) for code, values in offered.items()},
+                {code: (values[-1] if values else None) for code, values in offered.items()}
+            )
+
+        earliest: Dict[str, Optional[int]] = {}
+        for code in self._topological_order:
+            floor = self._ready(self._courses[code].prereqs, earliest) if code in self._prereq_graph else self._start_quarter
+            earliest[code] = None if floor is None else next((q for q in offered[code] if q >= floor), None)
+
+        latest: Dict[str, Optional[int]] = {}
+        for code in reversed(self._topological_order):
+            ceiling = len(Quarter) - 1
+            for dependent in self._dependents.get(code, ()):
+                if code not in self._necessary[dependent]:
+                    continue
+                if latest[dependent] is None:
+                    ceiling = None
+                    break
+                ceiling = min(ceiling, latest[dependent] - 1)
+            latest[code] = None if ceiling is None else next((q for q in reversed(offered[code]) if q <= ceiling), None)
+
+        return earliest, latest
+
+
+
+    def _ready(self, items: List, earliest: Dict[str, Optional[int]], conjunction: bool = True) -> Optional[int]:
+        """
+        Earliest quarter value in which a course needing ``items`` (all of them, or one when not
+        ``conjunction``) can be taken; None when no alternative can ever be satisfied
+        """
+        floors = []
+        for item in items:
+            if isinstance(item, Prereq):
+                floor = self._ready(item.objects, earliest, item.type == "And")
+            elif item in self._courses:
+                floor = None if earliest[item] is None else earliest[item] + 1
+            else:
+                # Prerequisites outside the program are assumed to be satisfied elsewhere
+                floor = self._start_quarter
+            floors.append(floor)
+        if not floors:
+            return self._start_quarter
+        if conjunction:
+            return None if None in floors else max(floors)
+        reachable = [floor for floor in floors if floor is not None]
+        return min(reachable) if reachable else None
+
+    def domain(self, code: str) -> List[Quarter]:
+        """Offered quarters of a course that survive bound propagation"""
+        low, high = self._earliest[code], self._latest[code]
+        if low is None or high is None:
+            return []
+        return [quarter for quarter in self._courses[code].offered_quarters if low <= quarter.value <= high]
+
+    @classmethod
+    def for_transcript(cls, program: Program, completed_courses: List[str], current_quarter: Optional[Quarter]) -> Tuple[Program, 'ProgramIndex']:
+        """
+        The program left for a student partway through: completed courses are removed (so their
+        prerequisite edges count as satisfied) and quarters before ``current_quarter`` are dropped
+        """
+        completed = set(completed_courses)
+        remaining = Program(
+            id=program.id,
+            required_courses=[course for course in program.required_courses if course.code not in completed],
+            pools=program.pools
+        )
+        return remaining, cls(remaining, current_quarter.value if current_quarter is not None else 0)
+
+    @property
+    def feasible(self) -> bool:
+        """False when propagation alone proves that some course cannot be scheduled"""
+        return all(self._earliest[code] is not None and self._latest[code] is not None
+                   and self._earliest[code] <= self._latest[code] for code in self._codes)
+
+
+
+    """Accessors"""
+    @property
+    def start_quarter(self) -> int:
+        return self._start_quarter
+    @property
+    def codes(self) -> Tuple[str, ...]:
+        return self._codes
+    @property
+    def courses(self) -> Dict[str, Course]:
+        return self._courses
+    @property
+    def prereq_graph(self) -> Dict[str, FrozenSet[str]]:
+        return self._prereq_graph
+    @property
+    def necessary(self) -> Dict[str, FrozenSet[str]]:
+        return self._necessary
+    @property
+    def dependents(self) -> Dict[str, FrozenSet[str]]:
+        return self._dependents
+    @property
+    def topological_order(self) -> Optional[Tuple[str, ...]]:
+        return self._topological_order
+    @property
+    def earliest(self) -> Dict[str, Optional[int]]:
+        return self._earliest
+    @property
+    def latest(self) -> Dict[str, Optional[int]]:
+        return self._latest
@@ -0,0 +1,156 @@
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from z3 import (
+    Ast, AtMost, BoolRef, CheckSatResult, FreshBool, Implies, ModelRef, Not, Solver, Z3_solver_check_assumptions,
+    is_false, is_true, sat, unknown, unsat
+)
+
+
+class MaxSatResult(NamedTuple):
+    """
+    Best model found for a set of weighted soft constraints.
+
+    Attributes:
+        model (Optional[ModelRef]): Model of the hard constraints with the lowest cost found, None
+            when they are unsatisfiable (or no check finished in time).
+        cost (Optional[int]): Total weight of the soft constraints ``model`` violates.
+        violated (List[int]): Indices of those soft constraints.
+        lower_bound (int): No model costs less; equal to ``cost`` when optimal.
+        optimal (bool): False when time ran out before the bounds met.
+        checks (int): Solver checks used.
+    """
+    model: Optional[ModelRef]
+    cost: Optional[int]
+    violated: List[int]
+    lower_bound: int
+    optimal: bool
+    checks: int
+
+
+class _Sum(NamedTuple):
+    # A guard literal meaning "at most ``bound`` of ``relaxed`` hold", built from one core
+    relaxed: List[BoolRef]
+    bound: int
+
+
+def solve_maxsat(
+    solver: Solver,
+    soft: Sequence[Tuple[BoolRef, int]],
+    deadline: Optional[float] = None,
+    assumptions: Sequence[BoolRef] = ()
+) -> MaxSatResult:
+    """
+    Minimizes the total weight of the violated ``soft`` (constraint, weight) pairs on top of the
+    constraints already asserted on ``solver``, with the OLL core-guided algorithm over
+    assumption literals:
+
+    - Every soft constraint is guarded by a fresh literal, and the literals are assumed true.
+    - An unsat core raises the lower bound by the smallest weight in it. That weight is taken
+      off every literal of the core, and a new soft literal "at most one of the core is
+      violated" with that weight takes its place. When such a sum literal is itself in a
+      core, the next bound of the same sum becomes soft instead. Sums are Z3 cardinality
+      constraints, so no totalizer has to be encoded.
+    - Literals are assumed by decreasing weight (stratification). Every stratum that is sat
+      yields a model, and models only ever replace the best one when they cost less, so the
+      search is anytime.
+
+    The search stops when the lower bound meets the cost of the best model, or at ``deadline``
+    (``time.monotonic()`` seconds). ``assumptions`` are passed to every check, e.g. the pending
+    literals of a what-if session. Guard literals and sums stay asserted on ``solver`` but are
+    never assumed again, so they cost nothing afterwards.
+    """
+    ctx = solver.ctx
+    checks = 0
+    literals: Dict[int, BoolRef] = {}
+    weights: Dict[int, int] = {}
+    sums: Dict[int, _Sum] = {}
+
+    def check(active: List[BoolRef]) -> CheckSatResult:
+        nonlocal checks
+        if deadline is not None:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                return unknown
+            solver.set("timeout", remaining_ms)
+        checks += 1
+        # Solver.check casts every assumption in Python, which costs as much as the check itself
+        # once there are a few hundred literals
+        assumed = list(assumptions) + active
+        array = (Ast * len(assumed))(*[literal.as_ast() for literal in assumed])
+        return CheckSatResult(Z3_solver_check_assumptions(ctx.ref(), solver.solver, len(assumed), array))
+
+    def add_soft(literal: BoolRef, weight: int) -> None:
+        key = literal.get_id()
+        literals[key] = literal
+        weights[key] = weights.get(key, 0) + weight
+
+    def add_sum(relaxed: List[BoolRef], bound: int, weight: int) -> None:
+        literal = FreshBool("oll", ctx)
+        solver.add(Implies(literal, AtMost(*relaxed, bound)))
+        sums[literal.get_id()] = _Sum(relaxed, bound)
+        add_soft(literal, weight)
+
+    # Constant constraints (decided by bound propagation) need no literal
+    lower = 0
+    for constraint, weight in soft:
+        if is_true(constraint):
+            continue
+        if is_false(constraint):
+            lower += weight
+            continue
+        literal = FreshBool("soft", ctx)
+        solver.add(Implies(literal, constraint))
+        add_soft(literal, weight)
+
+    best: Optional[ModelRef] = None
+    best_cost: Optional[int] = None
+    violated: List[int] = []
+
+    def improve(model: ModelRef) -> None:
+        nonlocal best, best_cost, violated
+        missed = [i for i, (constraint, _) in enumerate(soft) if not is_true(model.eval(constraint, model_completion=True))]
+        cost = sum(soft[i][1] for i in missed)
+        if best_cost is None or cost < best_cost:
+            best, best_cost, violated = model, cost, missed
+
+    result = check([])
+    if result != sat:
+        return MaxSatResult(None, None, [], 0, result == unsat, checks)
+    improve(solver.model())
+
+    threshold = max(weights.values(), default=0)
+    while best_cost > lower:
+        # Literals heavier than the gap to the best model are in every better model: assume them early
+        active = [literals[key] for key, weight in weights.items() if weight >= threshold or weight > best_cost - lower]
+        result = check(active)
+        if result == unknown:
+            break
+        if result == sat:
+            improve(solver.model())
+            lighter = [weight for weight in weights.values() if weight < threshold]
+            if not lighter:
+                # Every literal left was assumed, so nothing cheaper exists
+                lower = best_cost
+                break
+            threshold = max(lighter)
+            continue
+
+        core = [literal for literal in solver.unsat_core() if literal.get_id() in weights]
+        if not core:
+            # Only the extra assumptions conflict, which the first check ruled out
+            break
+        minimum = min(weights[literal.get_id()] for literal in core)
+        lower += minimum
+        for literal in core:
+            key = literal.get_id()
+            weights[key] -= minimum
+            if weights[key] == 0:
+                del weights[key]
+            total = sums.get(key)
+            if total is not None and total.bound + 1 < len(total.relaxed):
+                add_sum(total.relaxed, total.bound + 1, minimum)
+        if len(core) > 1:
+            add_sum([Not(literal) for literal in core], 1, minimum)
+
+    return MaxSatResult(best, best_cost, violated, min(lower, best_cost), best_cost <= lower, checks)
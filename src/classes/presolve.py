@@ -0,0 +1,123 @@
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, NamedTuple, Optional
+
+from classes.components.enums import Quarter
+from classes.components.prereq import Prereq
+from classes.constrain.program_index import ProgramIndex
+
+
+class PresolveResult(NamedTuple):
+    """
+    What presolve proved about a program before anything reaches Z3.
+
+    Attributes:
+        fixed (Dict[str, Quarter]): Courses left with a single possible quarter.
+        domains (Dict[str, List[Quarter]]): Quarters left for every course, fixed ones included.
+        fixed_units (Dict[Quarter, int]): Units the fixed courses put in each quarter.
+        rounds (int): Passes made until nothing changed.
+        feasible (bool): False when a course has no quarter left or the fixed courses alone
+            exceed the unit cap.
+    """
+    fixed: Dict[str, Quarter]
+    domains: Dict[str, List[Quarter]]
+    fixed_units: Dict[Quarter, int]
+    rounds: int
+    feasible: bool = True
+
+
+def presolve(index: ProgramIndex, max_quarter_units: Optional[int] = None) -> PresolveResult:
+    """
+    Narrows every course's quarters, starting from the propagated domains of ``index``, and
+    repeats until a pass changes nothing:
+
+    1. Courses with one quarter left are fixed there, and their units are taken off that
+       quarter's remaining capacity.
+    2. With a unit cap, a course loses the quarters whose remaining capacity is smaller than
+       its units.
+    3. Prerequisite bounds are propagated again over the narrowed domains. A course cannot be
+       earlier than one past its prerequisites (the earliest alternative of an Or), and a
+       prerequisite every alternative needs cannot be later than one before its dependent.
+
+    Steps 2 and 3 can leave more courses with a single quarter, which the next pass fixes.
+    Without a cap, the propagated domains are already tight, so this is a single pass that
+    finds the forced courses.
+    """
+    units = {code: course.units or 0 for code, course in index.courses.items()}
+    domains: Dict[str, List[int]] = {code: sorted(quarter.value for quarter in index.domain(code)) for code in index.codes}
+    rounds = 0
+    feasible = True
+
+    while feasible:
+        rounds += 1
+        changed = False
+
+        loads: DefaultDict[int, int] = defaultdict(int)
+        for code, values in domains.items():
+            if len(values) == 1:
+                loads[values[0]] += units[code]
+
+        if max_quarter_units is not None:
+            if any(load > max_quarter_units for load in loads.values()):
+                feasible = False
+                break
+            for code, values in domains.items():
+                if len(values) > 1:
+                    kept = [value for value in values if loads[value] + units[code] <= max_quarter_units]
+                    if len(kept) < len(values):
+                        domains[code] = kept
+                        changed = True
+
+        if index.topological_order is not None:
+            for code in index.topological_order:
+                if code not in index.prereq_graph:
+                    continue
+                floor = _ready(index.courses[code].prereqs, domains, index.start_quarter)
+                kept = [] if floor is None else [value for value in domains[code] if value >= floor]
+                if len(kept) < len(domains[code]):
+                    domains[code] = kept
+                    changed = True
+            for code in reversed(index.topological_order):
+                dependents = [dependent for dependent in index.dependents.get(code, ()) if code in index.necessary[dependent]]
+                if not dependents:
+                    continue
+                ceiling = min((max(domains[dependent]) - 1 if domains[dependent] else -1) for dependent in dependents)
+                kept = [value for value in domains[code] if value <= ceiling]
+                if len(kept) < len(domains[code]):
+                    domains[code] = kept
+                    changed = True
+
+        if any(not values for values in domains.values()):
+            feasible = False
+        if not changed:
+            break
+
+    fixed = {code: Quarter(values[0]) for code, values in domains.items() if len(values) == 1}
+    fixed_units: DefaultDict[Quarter, int] = defaultdict(int)
+    for code, quarter in fixed.items():
+        fixed_units[quarter] += units[code]
+    return PresolveResult(
+        fixed=fixed,
+        domains={code: [Quarter(value) for value in values] for code, values in domains.items()},
+        fixed_units=dict(fixed_units),
+        rounds=rounds,
+        feasible=feasible
+    )
+
+
+def _ready(items: List, domains: Dict[str, List[int]], start: int, conjunction: bool = True) -> Optional[int]:
+    # Same rule as ProgramIndex._ready, over the current domains instead of the offered quarters
+    floors = []
+    for item in items:
+        if isinstance(item, Prereq):
+            floor = _ready(item.objects, domains, start, item.type == "And")
+        elif item in domains:
+            floor = domains[item][0] + 1 if domains[item] else None
+        else:
+            floor = start
+        floors.append(floor)
+    if not floors:
+        return start
+    if conjunction:
+        return None if None in floors else max(floors)
+    reachable = [floor for floor in floors if floor is not None]
+    return min(reachable) if reachable else None
@@ -1,12 +1,138 @@
 from z3 import *
 
+import functools
+import time
+
 from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
 from classes.constrain.profile import Profile
 from classes.components.course import Course
-from classes.components.enums import Quarter
+from classes.components.pool import Pool
+from classes.components.prereq import Prereq
+from classes.components.preference import Preference
+from classes.components.enums import GER, Quarter
+from classes.maxsat import solve_maxsat
+from classes.presolve import PresolveResult, presolve
 
 from collections import defaultdict
-from typing import Dict, Set, List, DefaultDict
+from typing import Dict, Set, List, DefaultDict, NamedTuple, Optional, Tuple
+
+# Bumped whenever the program encoding changes so stale artifacts are rebuilt
+ARTIFACT_FORMAT = 3
+# Prefix of the per-quarter load variables; cannot clash with a course code
+LOAD_PREFIX = "load!"
+# Value of a course that is assumed completed (what-if sessions) or a catalog elective that is
+# not taken, before FRESH_FALL
+COMPLETED_QUARTER = -1
+# Z3's timeout parameter when none is set (UINT_MAX milliseconds)
+Z3_NO_TIMEOUT = 4294967295
+
+class Elective(NamedTuple):
+    """
+    A catalog course the solver may add to the plan.
+
+    Attributes:
+        course (Course): The catalog course.
+        var (Int): Its quarter, COMPLETED_QUARTER when not taken.
+        take (Bool): Whether it is taken; what pools and GER minimums count.
+        domain (List[Quarter]): Quarters it may be taken in.
+        units (int): Units it adds to its quarter (the minimum for variable-unit courses).
+    """
+    course: Course
+    var: ArithRef
+    take: BoolRef
+    domain: List[Quarter]
+    units: int
+
+class FeasibilityMatrix(NamedTuple):
+    """
+    Which quarters each course can take while the whole plan stays feasible.
+
+    Attributes:
+        matrix (Dict[str, Dict[Quarter, Optional[bool]]]): Course code to quarter to feasible
+            (None when a check timed out before deciding).
+        checks (int): Solver checks used.
+        candidates (int): (course, quarter) pairs left after bound propagation.
+    """
+    matrix: Dict[str, Dict[Quarter, Optional[bool]]]
+    checks: int
+    candidates: int
+
+    def feasible_quarters(self, course_code: str) -> List[Quarter]:
+        return [quarter for quarter, feasible in self.matrix[course_code].items() if feasible]
+
+class UnitCapResult(NamedTuple):
+    """
+    Smallest max_quarter_units that keeps the program feasible.
+
+    Attributes:
+        cap (Optional[int]): The minimum cap, None when no cap makes the program feasible.
+        schedule (Optional[Dict[str, Quarter]]): A schedule that respects ``cap``.
+        checks (int): Solver checks used.
+        optimal (bool): False when a check timed out and ``cap`` is only the best cap found.
+    """
+    cap: Optional[int]
+    schedule: Optional[Dict[str, Quarter]]
+    checks: int
+    optimal: bool = True
+
+class RepairResult(NamedTuple):
+    """
+    A schedule kept as close as possible to a previous one.
+
+    Attributes:
+        schedule (Optional[Dict[str, Quarter]]): The repaired schedule, None when no schedule is
+            feasible (or no check finished in time).
+        kept (Set[str]): Courses left in their previous quarter.
+        moved (Set[str]): Courses of the previous schedule that are not in their previous quarter,
+            because they no longer can be or because keeping them would conflict.
+        checks (int): Solver checks used.
+        complete (bool): False when time ran out before every released course was retried, so
+            more of them might have stayed.
+    """
+    schedule: Optional[Dict[str, Quarter]]
+    kept: Set[str]
+    moved: Set[str]
+    checks: int
+    complete: bool = True
+
+class PreferenceResult(NamedTuple):
+    """
+    A schedule that honours the profile's preferences as well as possible.
+
+    Attributes:
+        schedule (Optional[Dict[str, Quarter]]): The best schedule found, None when no schedule is
+            feasible (or no check finished in time).
+        cost (Optional[int]): Total weight of the preferences it does not honour (a NoSummer or
+            MaxUnits preference costs its weight once per quarter it is broken in).
+        unmet (List[int]): Indices into ``profile.preferences`` of those preferences.
+        lower_bound (int): No schedule costs less.
+        checks (int): Solver checks used.
+        optimal (bool): False when time ran out and ``schedule`` is only the best one found.
+    """
+    schedule: Optional[Dict[str, Quarter]]
+    cost: Optional[int]
+    unmet: List[int]
+    lower_bound: int
+    checks: int
+    optimal: bool = True
+
+def _restores_timeout(method):
+    """Puts the config's timeout back after ``method``, which shortens it for its own checks"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        timeout_ms, param = self._timeout_ms, self._params.get("timeout")
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._timeout_ms = timeout_ms
+            if param is None:
+                self._params.pop("timeout", None)
+                self._solver.set("timeout", Z3_NO_TIMEOUT)
+            else:
+                self.set_param("timeout", param)
+    return wrapper
+
 
 class SolverConfig:
     
@@ -15,41 +141,111 @@ class SolverConfig:
 
     Attributes:
         solver (Solver): Z3 solver.
-        program(Program): Degree program.
+        ctx (Context): Z3 context every expression is created in. Owned (and released by ``close``)
+            unless one is passed in, so concurrent solves never share Z3 state.
+        program(Program): Degree program (programs given as a list are merged with ``Program.merge``),
+            without the profile's completed courses.
         profile(Profile): Student profile.
-        course_dict(Dict[Int, Course]): Dictionary of course codes to course objects.
+        index(ProgramIndex): Shared, profile-independent program metadata (built if not given).
+        course_dict(Dict[Int, Course]): Dictionary of course variables to course objects. Variables of
+            ``fixed`` courses never reach the solver.
+        fixed(Dict[str, Quarter]): Courses presolve proved have a single possible quarter (see
+            ``classes.presolve``). They are constants in every constraint, their units are folded
+            into the quarter loads, and ``extract_schedule`` puts them back.
         prereq_graph(Dict[Int, Set[Int]]): Dictionary of course codes to prerequisite course codes.
         constraints(Dict[str, List[BoolExpr]]): Dictionary of constraint types to constraints.
         modifiers(Dict[str, Callable[[List[BoolExpr]], None]]): Dictionary of constraint types to modifier functions.
+            Program modifiers only depend on the program and can be precompiled (see ``to_artifact``);
+            profile modifiers are applied on top for every solve.
+        load_vars(Dict[Quarter, Int]): Units taken in each quarter.
+        params(Dict[str, object]): Z3 solver parameters set on this config (timeout, random_seed, ...).
+        assume_pending(bool): Incremental mode for what-if sessions. Every course gets a pending
+            literal guarding its constraints, and questions are asked through ``check_assumptions``
+            without touching the base constraints (see ``pin_literal`` and friends).
+        electives(Dict[str, Elective]): Catalog courses that can cover the profile's GER minimums
+            or the program's pools, after dropping those that cannot help (see ``_select_electives``).
     """
     def __init__(
         self, 
-        program: Program,
+        program: Program | List[Program],
         profile: Profile = None,
+        index: ProgramIndex = None,
+        ctx: Context = None,
+        compiled: str = None,
+        assume_pending: bool = False,
+        catalog: List[Course] = None,
     ) -> None:
         
-        self._solver = Solver()
+        # Several programs (double major, major + minor) are solved as one over their distinct courses
+        if isinstance(program, list):
+            program = Program.merge(program)
+            index = None
+
+        # GER tags of every course that may count, including transcript courses dropped below
+        self._ger_tags: Dict[str, List[GER]] = {course.code: course.ug_reqs or [] for course in catalog or []}
+        self._ger_tags.update({course.code: course.ug_reqs or [] for course in program.required_courses})
+
+        # A student partway through only needs the rest of the program, from the current quarter on
+        if profile is not None and profile.has_transcript:
+            program, index = ProgramIndex.for_transcript(program, profile.completed_courses, profile.current_quarter)
+
+        self._ctx = ctx or Context()
+        self._solver = Solver(ctx=self._ctx)
         self._program = program
         self._profile = profile
+        self._index = index or ProgramIndex(program)
+        self._timeout_ms: int = None
+        self._params: Dict[str, object] = {}
+        self._last_result: CheckSatResult = None
+        self._assume_pending = assume_pending
+        self._assumption_literals: Dict[str, BoolRef] = {}
+
+        # Presolve runs on the program alone, so artifacts stay valid for every profile; the unit
+        # cap only narrows the domains of the remaining courses (see _presolved_domains). What-if
+        # sessions skip it, since any course may turn out completed there
+        self._presolved: PresolveResult = None
+        self._capped: PresolveResult = None
+        if not assume_pending:
+            self._presolved = presolve(self._index)
+            if profile is not None and profile.max_quarter_units is not None:
+                self._capped = presolve(self._index, profile.max_quarter_units)
+        self._fixed: Dict[str, Quarter] = dict(self._presolved.fixed) if self._presolved is not None else {}
 
         self._course_dict: Dict[Int, Course] = {}
-        self._z3_course_dict: Dict[str, Int] = {}
+        self._z3_course_dict: Dict[str, ArithRef] = {}
         for course in self._program.required_courses:
-            z3Var = Int(course.code)
+            z3Var = Int(course.code, self._ctx)
             self._course_dict[z3Var] = course
-            self._z3_course_dict[course.code] = z3Var
+            fixed = self._fixed.get(course.code)
+            self._z3_course_dict[course.code] = z3Var if fixed is None else IntVal(fixed.value, self._ctx)
+            
+        self._load_vars: Dict[Quarter, Int] = {quarter: Int(f"{LOAD_PREFIX}{quarter.name}", self._ctx) for quarter in Quarter}
+        self._pending_literals: Dict[str, BoolRef] = {}
+        if assume_pending:
+            self._pending_literals = {code: Bool(f"pending!{code}", self._ctx) for code in self._z3_course_dict}
             
         self._prereq_graph: DefaultDict[str, Set[str]] = defaultdict(set)
-        for course in self._program.required_courses:
-            for prereq in course.prereqs:
-                if self._z3_course_dict[prereq] in self._course_dict:
-                    self._prereq_graph[course.code].add(prereq)
+        for course_code, prereqs in self._index.prereq_graph.items():
+            self._prereq_graph[course_code].update(prereqs)
 
-        self._modifiers = {
-            "max_quarter_units": self._max_quarter_units,
-            "prerequisites": self._prerequisites,
+        self._electives: Dict[str, Elective] = self._select_electives(catalog or [])
+
+        # SMT-LIB2 of the program constraints, when loaded from an artifact instead of encoded
+        self._compiled = compiled
+        self._program_assertions: List[BoolRef] = []
+
+        self._program_modifiers = {
             "required_courses": self._required_courses,
-            "required_pools": self._required_pools
+            "prerequisites": self._prerequisites,
+            "quarter_loads": self._quarter_loads
+        }
+        # Pools count transcript courses and electives, so they are encoded per profile
+        self._profile_modifiers = {
+            "presolved_domains": self._presolved_domains,
+            "elective_courses": self._elective_courses,
+            "required_pools": self._required_pools,
+            "ger_minimums": self._ger_minimums,
+            "max_quarter_units": self._max_quarter_units
         }
 
         self.update()
@@ -67,24 +263,80 @@ class SolverConfig:
     Checks if a schedule is solvable
     """
     def check_solvable(self) -> CheckSatResult:
-        return self._solver.check()
+        self._last_result = self._solver.check()
+        return self._last_result
+
+    """_summary_
+    Z3 statistics of the last check (conflicts, decisions, memory, ...)
+    """
+    def statistics(self) -> Dict[str, float]:
+        stats = self._solver.statistics()
+        return {key: stats.get_key_value(key) for key in stats.keys()}
+
+    """_summary_
+    Limits every check to timeout_ms milliseconds; a check that runs out returns unknown
+    """
+    def set_timeout(self, timeout_ms: int) -> None:
+        self._timeout_ms = max(1, int(timeout_ms))
+        self.set_param("timeout", self._timeout_ms)
+
+    """_summary_
+    Sets a Z3 solver parameter (e.g. random_seed); parameters survive update()
+    """
+    def set_param(self, name: str, value: object) -> None:
+        self._params[name] = value
+        self._solver.set(name, value)
+
+    """_summary_
+    The current assertions as SMT-LIB2, e.g. for capturing a slow solve
+    """
+    def to_smt2(self) -> str:
+        return self._solver.sexpr()
 
     """_summary_
     Updates the constraints
     """
     def update(self) -> None:
         self._solver.reset()
-        for func in self._modifiers.values():
+        self._assumption_literals = {}
+        for name, value in self._params.items():
+            self._solver.set(name, value)
+        if self._compiled is not None:
+            self._solver.add(parse_smt2_string(self._compiled, ctx=self._ctx))
+        else:
+            for func in self._program_modifiers.values():
+                func()
+        self._program_assertions = list(self._solver.assertions())
+        for func in self._profile_modifiers.values():
             func()
     
+    """_summary_
+    Defines each quarter's load variable as the units of the courses that can be taken in it;
+    fixed courses add a constant
+    """
+    def _quarter_loads(self) -> None:
+        candidates: DefaultDict[int, List[Int]] = defaultdict(list)
+        for courseVar, course in self._course_dict.items():
+            if course.code in self._fixed:
+                continue
+            # Courses whose domain excludes the quarter can never add to its load
+            for quarter in self._program_domain(course.code):
+                candidates[quarter.value].append(If(courseVar == quarter.value, course.units, 0))
+        fixed_units = self._presolved.fixed_units if self._presolved is not None else {}
+        for quarter, load_var in self._load_vars.items():
+            terms = candidates.get(quarter.value, [])
+            if fixed_units.get(quarter):
+                terms = [IntVal(fixed_units[quarter], self._ctx)] + terms
+            self._solver.add(load_var == (Sum(terms) if terms else IntVal(0, self._ctx)))
+
     """_summary_
     Adds max quarter units constraints to solver
     """
     def _max_quarter_units(self) -> None:
-        for quarter in Quarter:
-            load = sum([If(courseVar == quarter.value, course.units, 0) for courseVar, course in self._course_dict.items()])
-            constraint = load <= self._profile.max_quarter_units
-            self._solver.add(constraint)
+        if self._profile is None or self._profile.max_quarter_units is None:
+            return
+        for quarter in self._load_vars:
+            self._solver.add(self.quarter_load(quarter) <= self._profile.max_quarter_units)
 
     """_summary_
     Adds min quarter units constraints to solver
@@ -96,42 +348,712 @@ class SolverConfig:
     #         self._solver.add(constraint)
 
     """_summary_
-    Adds prerequisite constraints to solver
+    Adds prerequisite constraints to solver: each course comes after the completion of every
+    item of its prerequisite list (see ``_completion``)
     """
     def _prerequisites(self) -> None:
-        for course_code, prereqs in self._prereq_graph.items():
+        completions: Dict[Prereq, Optional[ArithRef]] = {}
+        for course_code in self._prereq_graph:
             course_var = self._z3_course_dict[course_code]
-            for prereq_code in prereqs:
-                prereq_var = self._z3_course_dict[prereq_code]
-                self._solver.add(course_var > prereq_var)
+            for item in self._index.courses[course_code].prereqs:
+                completion = self._completion(item, completions)
+                if completion is None:
+                    continue
+                constraint = course_var > completion
+                if is_int_value(course_var) and is_int_value(completion):
+                    # Both ends fixed by presolve, which already checked the order
+                    if is_true(simplify(constraint)):
+                        continue
+                if self._assume_pending:
+                    # A completed prerequisite sits at COMPLETED_QUARTER, before every quarter
+                    constraint = Implies(self._pending_literals[course_code], constraint)
+                self._solver.add(constraint)
+
+    """_summary_
+    The quarter by which a prerequisite item is satisfied, None when it always is (courses outside
+    the program, or an Or with such an alternative). A course code is its own variable; a nested
+    requirement gets an auxiliary variable that all (And) or one (Or) of its parts are no later
+    than. Identical nested requirements share their auxiliary variable across courses, so the
+    encoding grows linearly with the distinct expressions and never expands alternatives
+    """
+    def _completion(self, item: str | Prereq, completions: Dict[Prereq, Optional[ArithRef]]) -> Optional[ArithRef]:
+        if not isinstance(item, Prereq):
+            return self._z3_course_dict.get(item)
+        if item in completions:
+            return completions[item]
+        parts = [self._completion(obj, completions) for obj in item.objects]
+        if not parts or (item.type == "Or" and None in parts):
+            completion = None
+        else:
+            parts = [part for part in parts if part is not None]
+            if not parts:
+                completion = None
+            elif len(parts) == 1:
+                completion = parts[0]
+            elif all(is_int_value(part) for part in parts):
+                # Every part fixed: the completion is known without an auxiliary variable
+                values = [part.as_long() for part in parts]
+                completion = IntVal(max(values) if item.type == "And" else min(values), self._ctx)
+            else:
+                completion = Int(f"prereq!{len(completions)}", self._ctx)
+                bounds = [completion >= part for part in parts]
+                self._solver.add(And(bounds) if item.type == "And" else Or(bounds))
+        completions[item] = completion
+        return completion
 
     """_summary_
     Adds required courses constraint to solver
     """
     def _required_courses(self) -> None:
         for courseVar, course in self._course_dict.items():
-            constraint = Or([courseVar == quarter.value for quarter in course.offered_quarters])
-            self._solver.add(constraint)
+            if course.code in self._fixed:
+                continue
+            domain = self._program_domain(course.code)
+            constraint = Or([courseVar == quarter.value for quarter in domain]) if domain else BoolVal(False, self._ctx)
+            if self._assume_pending:
+                pending = self._pending_literals[course.code]
+                self._solver.add(Implies(pending, constraint))
+                self._solver.add(Implies(Not(pending), courseVar == COMPLETED_QUARTER))
+            else:
+                self._solver.add(constraint)
+
+    """_summary_
+    Quarters a course may be scheduled in, narrowed by the profile's unit cap
+    """
+    def _domain(self, course_code: str) -> List[Quarter]:
+        if self._capped is not None:
+            return self._capped.domains[course_code]
+        return self._program_domain(course_code)
+
+    """_summary_
+    Quarters a course may be scheduled in whatever the profile, which the program constraints use
+    """
+    def _program_domain(self, course_code: str) -> List[Quarter]:
+        if self._assume_pending:
+            # Bounds propagation assumes every prerequisite is still to be taken, which a
+            # what-if about completed courses may break
+            offered = {quarter for quarter in self._index.courses[course_code].offered_quarters if quarter.value >= self._index.start_quarter}
+            return sorted(offered, key=lambda quarter: quarter.value)
+        # Offered quarters already narrowed by prerequisite bound propagation and presolve
+        return self._presolved.domains[course_code]
+
+    """_summary_
+    Restricts the remaining courses to the quarters presolve leaves them under the unit cap
+    """
+    def _presolved_domains(self) -> None:
+        if self._capped is None:
+            return
+        if not self._capped.feasible:
+            # The fixed courses alone overload a quarter, or some course lost every quarter
+            self._solver.add(BoolVal(False, self._ctx))
+            return
+        for code, domain in self._capped.domains.items():
+            var = self._z3_course_dict[code]
+            if is_int_value(var) or len(domain) == len(self._program_domain(code)):
+                continue
+            self._solver.add(Or([var == quarter.value for quarter in domain]))
             
     def _required_pools(self) -> None:
-        pass
+        for pool in self._program.pools or []:
+            self._solver.add(self._pool_satisfied(pool))
+
+    """_summary_
+    Whether a course counts as taken: scheduled courses and the transcript do, electives when
+    the solver takes them; courses the model knows nothing about cannot be taken
+    """
+    def _taken(self, course_code: str) -> BoolRef:
+        if course_code in self._electives:
+            return self._electives[course_code].take
+        completed = self._profile.completed_courses if self._profile is not None else []
+        return BoolVal(course_code in self._z3_course_dict or course_code in completed, self._ctx)
+
+    """_summary_
+    Courses each GER minimum still needs once the program and the transcript are counted
+    """
+    def _ger_deficits(self) -> Dict[GER, int]:
+        if self._profile is None:
+            return {}
+        counted = set(self._z3_course_dict) | set(self._profile.completed_courses)
+        return {
+            ger: minimum - sum(1 for code in counted if ger in self._ger_tags.get(code, []))
+            for ger, minimum in self._profile.ger_minimums.items()
+        }
+
+    """_summary_
+    Picks the catalog courses worth a variable: not already planned or taken, carrying a GER that
+    is still short (or named by a pool), offered in a quarter still to plan, and with every
+    prerequisite planned, taken or itself a kept elective. Everything else could never be chosen
+    usefully, so leaving it out keeps the cardinality constraints small
+    """
+    def _select_electives(self, catalog: List[Course]) -> Dict[str, Elective]:
+        short = {ger for ger, deficit in self._ger_deficits().items() if deficit > 0}
+        pooled = self._pool_codes()
+        completed = set(self._profile.completed_courses) if self._profile is not None else set()
+
+        kept: Dict[str, Course] = {}
+        for course in catalog:
+            if course.code in self._z3_course_dict or course.code in completed:
+                continue
+            if course.code in pooled or short & set(course.ug_reqs or []):
+                kept[course.code] = course
+        # Dropping a course may strand electives that needed it, so repeat until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for code, course in list(kept.items()):
+                domain = [quarter for quarter in course.offered_quarters if quarter.value >= self._index.start_quarter]
+                reachable = self._reachable(course.prereqs, set(self._z3_course_dict) | completed | set(kept))
+                if not domain or not reachable:
+                    del kept[code]
+                    changed = True
+
+        kept = self._drop_dominated(kept, {ger: deficit for ger, deficit in self._ger_deficits().items() if deficit > 0}, pooled)
+
+        electives = {}
+        for code, course in kept.items():
+            units = course.units[0] if isinstance(course.units, tuple) else course.units or 0
+            electives[code] = Elective(
+                course=course,
+                var=Int(code, self._ctx),
+                take=Bool(f"take!{code}", self._ctx),
+                domain=sorted({quarter for quarter in course.offered_quarters if quarter.value >= self._index.start_quarter}, key=lambda quarter: quarter.value),
+                units=units
+            )
+        return electives
+
+    """_summary_
+    Whether a prerequisite list (all items, or one when not ``conjunction``) can be met by the
+    ``available`` courses
+    """
+    def _reachable(self, items: List[str | Prereq], available: Set[str], conjunction: bool = True) -> bool:
+        met = [self._reachable(item.objects, available, item.type == "And") if isinstance(item, Prereq) else item in available for item in items]
+        return all(met) if conjunction or not met else any(met)
+
+    """_summary_
+    Drops electives that a plan never needs: B is dominated by A when A carries every short GER
+    B carries, has no more units and is offered in every quarter B is. Once B has as many
+    dominators as the largest deficit among its GERs, any plan taking B can swap it for an unused
+    dominator or, if all are taken, simply drop it. Courses with prerequisites, prerequisites of
+    other electives and pool members are always kept since they are not interchangeable
+    """
+    def _drop_dominated(self, kept: Dict[str, Course], deficits: Dict[GER, int], pooled: Set[str]) -> Dict[str, Course]:
+        required_by = {prereq for course in kept.values() for prereq in course.prereq_codes}
+        rows = []
+        for code, course in kept.items():
+            if course.prereqs or code in required_by or code in pooled:
+                continue
+            short = frozenset(ger for ger in course.ug_reqs or [] if ger in deficits)
+            units = course.units[0] if isinstance(course.units, tuple) else course.units or 0
+            domain = sum(1 << quarter.value for quarter in course.offered_quarters if quarter.value >= self._index.start_quarter)
+            rows.append((code, short, units, domain))
+        # Dominators sort first, so counting only the ones already kept is enough
+        rows.sort(key=lambda row: (-len(row[1]), row[2], -bin(row[3]).count("1"), row[0]))
+        survivors = []
+        for code, short, units, domain in rows:
+            needed = max(deficits[ger] for ger in short)
+            dominators = 0
+            for _, other_short, other_units, other_domain in survivors:
+                if other_units <= units and other_domain & domain == domain and short <= other_short:
+                    dominators += 1
+                    if dominators >= needed:
+                        break
+            if dominators >= needed:
+                del kept[code]
+            else:
+                survivors.append((code, short, units, domain))
+        return kept
+
+    """_summary_
+    An elective is in one of its quarters when taken and at COMPLETED_QUARTER otherwise, so its
+    load terms need no extra guard; its prerequisites bind only when it is taken
+    """
+    def _elective_courses(self) -> None:
+        for code, elective in self._electives.items():
+            self._solver.add(Implies(elective.take, Or([elective.var == quarter.value for quarter in elective.domain])))
+            self._solver.add(Implies(Not(elective.take), elective.var == COMPLETED_QUARTER))
+            if elective.course.prereqs:
+                self._solver.add(Implies(elective.take, self._elective_prereqs(elective, elective.course.prereqs)))
+
+    """_summary_
+    An elective's prerequisite list as one formula: planned courses come before it, transcript
+    courses are met, other electives must be taken before it and anything else cannot be met.
+    Electives are few after pruning, so alternatives are encoded directly
+    """
+    def _elective_prereqs(self, elective: Elective, items: List[str | Prereq], conjunction: bool = True) -> BoolRef:
+        completed = self._profile.completed_courses if self._profile is not None else []
+        parts = []
+        for item in items:
+            if isinstance(item, Prereq):
+                parts.append(self._elective_prereqs(elective, item.objects, item.type == "And"))
+            elif item in self._z3_course_dict:
+                parts.append(elective.var > self._z3_course_dict[item])
+            elif item in self._electives:
+                prereq = self._electives[item]
+                parts.append(And(prereq.take, elective.var > prereq.var))
+            else:
+                parts.append(BoolVal(item in completed, self._ctx))
+        if not parts:
+            return BoolVal(True, self._ctx)
+        return And(parts) if conjunction else Or(parts)
+
+    """_summary_
+    One cardinality constraint per GER that is still short, over the take literals of the
+    electives carrying it. A course carrying several GERs shares its literal between them.
+    A plan never needs more electives than the deficits add up to, plus the ones pools name or
+    other electives require, so that bound is asserted too: it is implied for some plan and cuts
+    the unit-cap search down to plans without spare electives
+    """
+    def _ger_minimums(self) -> None:
+        short = 0
+        for ger, deficit in self._ger_deficits().items():
+            if deficit <= 0:
+                continue
+            short += deficit
+            takes = [elective.take for elective in self._electives.values() if ger in (elective.course.ug_reqs or [])]
+            self._solver.add(AtLeast(*takes, deficit) if len(takes) >= deficit else BoolVal(False, self._ctx))
+        if short == 0:
+            return
+        pooled = self._pool_codes() & set(self._electives)
+        required_by = {prereq for elective in self._electives.values() for prereq in elective.course.prereq_codes if prereq in self._electives}
+        bound = short + len(pooled | required_by)
+        if bound < len(self._electives):
+            self._solver.add(AtMost(*[elective.take for elective in self._electives.values()], bound))
+
+    """_summary_
+    Course codes named anywhere in the program's pools, nested pools included
+    """
+    def _pool_codes(self) -> Set[str]:
+        codes = set()
+        pending_pools = list(self._program.pools or [])
+        while pending_pools:
+            pool = pending_pools.pop()
+            if pool.type == "Pool":
+                pending_pools.extend(pool.objects)
+            else:
+                codes.update(pool.objects)
+        return codes
+
+    """_summary_
+    Units taken in a quarter: the program's load variable plus any electives placed in it
+    """
+    def quarter_load(self, quarter: Quarter) -> ArithRef:
+        terms = [If(elective.var == quarter.value, elective.units, 0) for elective in self._electives.values() if quarter in elective.domain]
+        return self._load_vars[quarter] + Sum(terms) if terms else self._load_vars[quarter]
+
+    """_summary_
+    At least num_required of the pool's courses (or nested pools) are satisfied. Constant members
+    are counted in Python so only undecided ones reach the cardinality constraint
+    """
+    def _pool_satisfied(self, pool: Pool) -> BoolRef:
+        members = [self._pool_satisfied(child) for child in pool.objects] if pool.type == "Pool" else [self._taken(code) for code in pool.objects]
+        required = pool.num_required or 0
+        undecided = []
+        for member in members:
+            if is_true(member):
+                required -= 1
+            elif not is_false(member):
+                undecided.append(member)
+        if required <= 0:
+            return BoolVal(True, self._ctx)
+        if len(undecided) < required:
+            return BoolVal(False, self._ctx)
+        return AtLeast(*undecided, required)
     
+    """_summary_
+    Checks under assumption literals, leaving the asserted constraints untouched. In
+    ``assume_pending`` mode every course not listed in ``completed`` is assumed pending
+    """
+    def check_assumptions(self, assumptions: List[BoolRef] = (), completed: Set[str] = frozenset()) -> CheckSatResult:
+        literals = list(assumptions)
+        for code, pending in self._pending_literals.items():
+            literals.append(Not(pending) if code in completed else pending)
+        self._last_result = self._solver.check(*literals)
+        return self._last_result
+
+    """_summary_
+    Assumptions of the last unsat check_assumptions that cannot hold together
+    """
+    def unsat_core(self) -> List[BoolRef]:
+        return list(self._solver.unsat_core())
+
+    """_summary_
+    Literal that, when assumed, makes ``constraint`` hold; the implication is asserted once
+    """
+    def assumption_literal(self, name: str, constraint: BoolRef) -> BoolRef:
+        literal = self._assumption_literals.get(name)
+        if literal is None:
+            literal = self._assumption_literals[name] = Bool(name, self._ctx)
+            self._solver.add(Implies(literal, constraint))
+        return literal
+
+    def pin_literal(self, course_code: str, quarter: Quarter) -> BoolRef:
+        return self.assumption_literal(f"pin!{course_code}!{quarter.name}", self._z3_course_dict[course_code] == quarter.value)
+
+    def exclude_literal(self, course_code: str, quarter: Quarter) -> BoolRef:
+        return self.assumption_literal(f"exclude!{course_code}!{quarter.name}", self._z3_course_dict[course_code] != quarter.value)
+
+    def quarter_off_literal(self, quarter: Quarter) -> BoolRef:
+        return self.assumption_literal(f"off!{quarter.name}", self.quarter_load(quarter) == 0)
+
+    """_summary_
+    Computes for every course which quarters it can be scheduled in with the rest of the plan
+    still feasible. Quarters outside the propagation bounds are infeasible without a check; the
+    rest are decided with assumption checks ("this course in one of its undecided quarters"), and
+    every model found marks the quarter of every course in it as feasible at once. An unsat
+    answer rules out all of that course's undecided quarters in one check. ``timeout_ms`` bounds
+    the whole analysis; pairs still undecided when it runs out are None.
+    """
+    @_restores_timeout
+    def feasibility_matrix(self, timeout_ms: int = None) -> FeasibilityMatrix:
+        deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+        matrix: Dict[str, Dict[Quarter, Optional[bool]]] = {
+            code: {quarter: False for quarter in Quarter} for code in self._z3_course_dict
+        }
+        undecided: Dict[str, Set[Quarter]] = {code: set(self._domain(code)) for code in self._z3_course_dict}
+        candidates = sum(len(quarters) for quarters in undecided.values())
+        for code, quarters in undecided.items():
+            for quarter in quarters:
+                matrix[code][quarter] = None
+
+        def mark(model) -> None:
+            for code, var in self._z3_course_dict.items():
+                value = model.eval(var, model_completion=True).as_long()
+                if value == COMPLETED_QUARTER:
+                    continue
+                quarter = Quarter(value)
+                matrix[code][quarter] = True
+                undecided[code].discard(quarter)
+
+        def check(assumptions: List[BoolRef]) -> CheckSatResult:
+            if deadline is not None:
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    return unknown
+                self.set_timeout(remaining_ms)
+            return self.check_assumptions(assumptions)
+
+        checks = 1
+        result = check([])
+        if result == sat:
+            mark(self._solver.model())
+        else:
+            # Infeasible (or undecided) as a whole: nothing more to learn per course
+            for code, quarters in undecided.items():
+                for quarter in quarters:
+                    matrix[code][quarter] = False if result == unsat else None
+            return FeasibilityMatrix(matrix, checks, candidates)
+
+        for code, var in self._z3_course_dict.items():
+            while undecided[code]:
+                quarters = sorted(undecided[code], key=lambda quarter: quarter.value)
+                literal = self.assumption_literal(
+                    f"range!{code}!{checks}", Or([var == quarter.value for quarter in quarters])
+                )
+                checks += 1
+                result = check([literal])
+                if result == sat:
+                    mark(self._solver.model())
+                    continue
+                for quarter in quarters:
+                    matrix[code][quarter] = False if result == unsat else None
+                undecided[code].clear()
+        return FeasibilityMatrix(matrix, checks, candidates)
+
+    """_summary_
+    Finds the smallest per-quarter unit cap with a feasible schedule on this one solver. Each
+    candidate cap is a guarded assumption literal, so no constraint is ever retracted. The search
+    is a binary search between a lower bound (the largest course, and total units spread over
+    the usable quarters) and the heaviest quarter of the best witness found so far.
+    """
+    @_restores_timeout
+    def minimum_unit_cap(self, timeout_ms: int = None) -> UnitCapResult:
+        if timeout_ms is not None:
+            self.set_timeout(timeout_ms)
+        courses = list(self._program.required_courses)
+        if not courses:
+            return UnitCapResult(0, {}, 0)
+
+        def cap_literal(cap: int) -> BoolRef:
+            return self.assumption_literal(f"cap!{cap}", And([self.quarter_load(quarter) <= cap for quarter in self._load_vars]))
+
+        def heaviest_quarter(model) -> int:
+            return max(model.eval(self.quarter_load(quarter), model_completion=True).as_long() for quarter in self._load_vars)
+
+        usable = {quarter for course in courses for quarter in self._domain(course.code)}
+        total = sum(course.units for course in courses)
+        low = max(max(course.units for course in courses), -(-total // max(1, len(usable))))
+
+        # Without any cap: if this fails, no cap can help
+        checks = 1
+        result = self.check_assumptions()
+        if result != sat:
+            return UnitCapResult(None, None, checks, result == unsat)
+        high = heaviest_quarter(self._solver.model())
+        schedule = self.extract_schedule()
+
+        while low < high:
+            middle = (low + high) // 2
+            checks += 1
+            result = self.check_assumptions([cap_literal(middle)])
+            if result == sat:
+                # The witness may be lighter than the cap tried, which tightens the bound further
+                high = heaviest_quarter(self._solver.model())
+                schedule = self.extract_schedule()
+            elif result == unsat:
+                low = middle + 1
+            else:
+                return UnitCapResult(high, schedule, checks, False)
+        return UnitCapResult(high, schedule, checks)
+
+    """_summary_
+    Re-plans with as few changes to ``previous`` as possible (large neighborhood search). Every
+    previous placement that can still hold is pinned with an assumption literal. While the pins
+    conflict, the unsat core names the culprits, and they are released together with their
+    neighborhood: prerequisites, dependents and the courses sharing their quarter. Once the rest
+    is feasible, released courses are put back together, leaving out one course of each
+    conflict the solver reports until the rest fit.
+    Courses new to the program are placed freely. ``timeout_ms`` bounds the whole search
+    """
+    @_restores_timeout
+    def repair(self, previous: Dict[str, Quarter], timeout_ms: int = None) -> RepairResult:
+        deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+        checks = 0
+
+        def check(literals: List[BoolRef]) -> CheckSatResult:
+            nonlocal checks
+            if deadline is not None:
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    return unknown
+                self.set_timeout(remaining_ms)
+            checks += 1
+            return self.check_assumptions(literals)
+
+        pins: Dict[str, BoolRef] = {}
+        for code, quarter in previous.items():
+            literal = self._keep_literal(code, quarter)
+            if literal is not None:
+                pins[code] = literal
+        released: Set[str] = set()
+        neighbors = self._neighbors()
+
+        while True:
+            result = check(list(pins.values()))
+            if result == sat:
+                break
+            if result == unknown:
+                return RepairResult(None, set(), set(previous), checks, False)
+            core = {literal.get_id() for literal in self.unsat_core()}
+            conflict = {code for code, literal in pins.items() if literal.get_id() in core}
+            if not conflict:
+                # Infeasible whatever the previous schedule was
+                return RepairResult(None, set(), set(previous), checks)
+            for code in conflict:
+                quarter = previous[code]
+                freed = {code} | neighbors.get(code, set()) | {other for other in pins if previous[other] == quarter}
+                for other in freed & pins.keys():
+                    released.add(other)
+                    del pins[other]
+        schedule = self.extract_schedule()
+
+        # Putting released courses back: all of them at once, dropping one member of each new core
+        retry = {code: self._keep_literal(code, previous[code]) for code in sorted(released)}
+        complete = True
+        while retry:
+            result = check(list(pins.values()) + list(retry.values()))
+            if result == sat:
+                pins.update(retry)
+                schedule = self.extract_schedule()
+                break
+            if result == unknown:
+                complete = False
+                break
+            core = {literal.get_id() for literal in self.unsat_core()}
+            culprit = next((code for code, literal in retry.items() if literal.get_id() in core), None)
+            if culprit is None:
+                break
+            del retry[culprit]
+        # Pins only grow after a sat check, so the last model found still honours all of them
+        kept = {code for code in previous if schedule.get(code) == previous[code]}
+        return RepairResult(schedule, kept, set(previous) - kept, checks, complete)
+
+    """_summary_
+    Solves for the schedule that leaves out the least total weight of the profile's preferences
+    (see ``classes.maxsat``). The search is anytime: when ``timeout_ms`` runs out, the best
+    schedule found so far is returned with ``optimal`` False
+    """
+    @_restores_timeout
+    def optimize(self, timeout_ms: int = None) -> PreferenceResult:
+        deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+        owners: List[int] = []
+        soft: List[Tuple[BoolRef, int]] = []
+        for position, preference in enumerate(self._profile.preferences if self._profile is not None else []):
+            for constraint in self._preference_constraints(preference):
+                owners.append(position)
+                soft.append((constraint, preference.weight))
+
+        # solve_maxsat sets its own timeout per check; the decorator puts back the config's
+        result = solve_maxsat(self._solver, soft, deadline, list(self._pending_literals.values()))
+        self._last_result = sat if result.model is not None else (unsat if result.optimal else unknown)
+        if result.model is None:
+            return PreferenceResult(None, None, [], result.lower_bound, result.checks, result.optimal)
+        unmet = sorted({owners[i] for i in result.violated})
+        return PreferenceResult(self.extract_schedule(result.model), result.cost, unmet, result.lower_bound, result.checks, result.optimal)
+
+    """_summary_
+    Soft constraints of one preference: one per quarter for NoSummer and MaxUnits, none when it
+    cannot be broken (a TakeBy course already completed or not in the plan)
+    """
+    def _preference_constraints(self, preference: Preference) -> List[BoolRef]:
+        if preference.type == "NoSummer":
+            return [self.quarter_load(quarter) == 0 for quarter in self._load_vars if quarter.name.endswith("_SUMMER")]
+        if preference.type == "QuarterOff":
+            return [self.quarter_load(preference.quarter) == 0]
+        if preference.type == "MaxUnits":
+            return [self.quarter_load(quarter) <= preference.units for quarter in self._load_vars]
+        var = self._z3_course_dict.get(preference.course)
+        if var is not None:
+            # Decided by the propagated domain when it lies entirely on one side of the quarter
+            domain = self._domain(preference.course)
+            if all(quarter.value <= preference.quarter.value for quarter in domain):
+                return []
+            if all(quarter.value > preference.quarter.value for quarter in domain):
+                return [BoolVal(False, self._ctx)]
+            return [var <= preference.quarter.value]
+        elective = self._electives.get(preference.course)
+        if elective is not None:
+            return [Implies(elective.take, elective.var <= preference.quarter.value)]
+        return []
+
+    """_summary_
+    Literal that keeps a course (or a catalog elective, taken) in ``quarter``, None when the
+    course is no longer planned there or the quarter is no longer possible
+    """
+    def _keep_literal(self, course_code: str, quarter: Quarter) -> Optional[BoolRef]:
+        if course_code in self._z3_course_dict:
+            return self.pin_literal(course_code, quarter) if quarter in self._domain(course_code) else None
+        elective = self._electives.get(course_code)
+        if elective is not None and quarter in elective.domain:
+            return self.assumption_literal(f"pin!{course_code}!{quarter.name}", And(elective.take, elective.var == quarter.value))
+        return None
+
+    """_summary_
+    Prerequisites and dependents of every scheduled course and elective
+    """
+    def _neighbors(self) -> Dict[str, Set[str]]:
+        neighbors: DefaultDict[str, Set[str]] = defaultdict(set)
+        edges = [(code, prereqs) for code, prereqs in self._prereq_graph.items()]
+        edges += [(code, elective.course.prereq_codes) for code, elective in self._electives.items()]
+        for code, prereqs in edges:
+            for prereq in prereqs:
+                neighbors[code].add(prereq)
+                neighbors[prereq].add(code)
+        return neighbors
+
+    """_summary_
+    Serializes the profile-independent constraints to a compact artifact (SMT-LIB2 plus the
+    variable names) that ``from_artifact`` loads much faster than encoding the program again
+    """
+    def to_artifact(self) -> Dict[str, object]:
+        compiled = Solver(ctx=self._ctx)
+        compiled.add(self._program_assertions)
+        return {
+            "format": ARTIFACT_FORMAT,
+            "smt2": compiled.sexpr(),
+            "variables": {
+                "courses": {code: str(var) for code, var in self._z3_course_dict.items() if code not in self._fixed},
+                "fixed": {code: quarter.name for code, quarter in self._fixed.items()},
+                "loads": {quarter.name: str(var) for quarter, var in self._load_vars.items()},
+            },
+        }
+
+    """_summary_
+    Builds a config from an artifact of the same program, skipping the program encoding
+    """
+    @classmethod
+    def from_artifact(
+        cls,
+        program: Program,
+        artifact: Dict[str, object],
+        profile: Profile = None,
+        index: ProgramIndex = None,
+        ctx: Context = None,
+        catalog: List[Course] = None
+    ) -> 'SolverConfig':
+        if artifact.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported artifact format {artifact.get('format')}, expected {ARTIFACT_FORMAT}")
+        expected = {course.code for course in program.required_courses}
+        if set(artifact["variables"]["courses"]) | set(artifact["variables"].get("fixed", {})) != expected:
+            raise ValueError(f"Artifact does not match the courses of program {program.id}")
+        return cls.from_string(program, artifact["smt2"], profile, index, ctx, catalog)
+
+    """_summary_
+    Builds a config whose program constraints are parsed from SMT-LIB2 (see ``to_artifact``)
+    """
+    @classmethod
+    def from_string(
+        cls,
+        program: Program,
+        smt2: str,
+        profile: Profile = None,
+        index: ProgramIndex = None,
+        ctx: Context = None,
+        catalog: List[Course] = None
+    ) -> 'SolverConfig':
+        return cls(program=program, profile=profile, index=index, ctx=ctx, compiled=smt2, catalog=catalog)
+
     """_summary_
     Solves using all constraints and returns a viable schedule or None if none is possible
     """
     def solve(self) -> Dict[str, Quarter] | None:
         if self.check_solvable() == sat:
-            model = self._solver.model()
-            schedule = {}
-            for course in self._program.required_courses:
-                course_var = Int(course.code)
-                quarter_val = model[course_var].as_long()
-                quarter = Quarter(quarter_val)
-                schedule[course.code] = quarter
-            return schedule
+            return self.extract_schedule()
         else:
             return None
 
+    """_summary_
+    Reads the schedule out of ``model``, by default the model of the last (sat) check
+    """
+    def extract_schedule(self, model: ModelRef = None) -> Dict[str, Quarter]:
+        model = model if model is not None else self._solver.model()
+        schedule = {}
+        for course in self._program.required_courses:
+            # Reconstruction: presolve already decided the fixed courses
+            if course.code in self._fixed:
+                schedule[course.code] = self._fixed[course.code]
+                continue
+            course_var = self._z3_course_dict[course.code]
+            quarter_val = model[course_var].as_long()
+            if quarter_val == COMPLETED_QUARTER:
+                continue
+            quarter = Quarter(quarter_val)
+            schedule[course.code] = quarter
+        for code, elective in self._electives.items():
+            if is_true(model.eval(elective.take, model_completion=True)):
+                schedule[code] = Quarter(model.eval(elective.var, model_completion=True).as_long())
+        return schedule
+
+    """_summary_
+    Drops every reference to the solver and its expressions so the owned Z3 context
+    (and its whole AST table) is freed; the config cannot be used afterwards
+    """
+    def close(self) -> None:
+        self._solver = None
+        self._course_dict = {}
+        self._z3_course_dict = {}
+        self._fixed = {}
+        self._load_vars = {}
+        self._electives = {}
+        self._pending_literals = {}
+        self._assumption_literals = {}
+        self._program_assertions = []
+        self._ctx = None
+
+    def __enter__(self) -> 'SolverConfig':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
     """Accessors"""
@@ -139,9 +1061,34 @@ class SolverConfig:
     def course_dict(self) -> Dict[Int, Course]:
         return self._course_dict
     @property
+    def fixed(self) -> Dict[str, Quarter]:
+        return self._fixed
+    @property
     def prereq_graph(self) -> Dict[str, Set[str]]:
         return self._prereq_graph
     @property
+    def index(self) -> ProgramIndex:
+        return self._index
+    @property
+    def pending_literals(self) -> Dict[str, BoolRef]:
+        return self._pending_literals
+    @property
+    def load_vars(self) -> Dict[Quarter, Int]:
+        return self._load_vars
+    @property
+    def electives(self) -> Dict[str, Elective]:
+        return self._electives
+    @property
+    def ctx(self) -> Context:
+        return self._ctx
+    @property
+    def params(self) -> Dict[str, object]:
+        return dict(self._params)
+    @property
+    def last_result(self) -> CheckSatResult:
+        """Result of the most recent check (sat, unsat or unknown), None before the first check"""
+        return self._last_result
+    @property
     def constraints(self) -> Dict[str, List[ExprRef]]:
         return self._constraints
     
@@ -1,188 +1,1119 @@
 import sys
 import os
+import time
+import uuid
 
-# Add 'src' to the Python search path
-sys.path.append(os.path.abspath('src'))
-print("appending")
+# Add 'src' to the Python search path regardless of the working directory
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-from flask import Flask, jsonify, request
-from classes.constrain.program import Program
-from classes.constrain.profile import Profile
-from classes.solver_config import SolverConfig
-from pymongo import MongoClient
+from flask import Blueprint, Flask, current_app, g, jsonify, request
+from flask_cors import CORS
 from classes.components.course import Course
-from classes.components.enums import Quarter
-import json
+from classes.components.enums import GER, Quarter
+from classes.constrain.program import Program, ProgramConflict
+from classes.constrain.profile import Profile
+from services.artifact_store import DiskArtifactStore, MongoArtifactStore
+from services.catalog_index import CatalogIndex, RefreshingCatalogIndex, normalize_code
+from services.admission import AdmissionController, AdmissionRejected
+from services.database import MongoProvider
+from services.impact import Change, RepairQueue, validate_schedule
+from services.metrics import MetricsRegistry
+from services.preload import ProgramUsage, freeze_shared_state, preload_programs
+from services.read_api import (
+    COURSE_FIELDS, PROFILE_FIELDS, PROGRAM_FIELDS, EncodedBodyCache, accepts_gzip, decode_cursor, encode_body,
+    encode_cursor, entity_tag, etag_matches, mongo_projection, parse_fields, project
+)
+from services.profiling import (
+    PROFILE_HEADER, PROFILE_MODE_HEADER, PROFILE_MODE_PARAM, PROFILE_OUTPUT_HEADER, PROFILE_PARAM, RequestProfiler
+)
+from services.program_cache import ProgramCache, program_version
+from services.schedule_service import (
+    CATALOG_COLLECTION, SCHEDULE_COLLECTION, catalog_query, format_schedule, invalid_offered_quarter, schedule_diff,
+    schedule_document, schedule_from_names, schedule_to_names
+)
+from services.slow_capture import SlowSolveCapture
+from services.single_flight import MongoLeaseSingleFlight, SingleFlight, SingleFlightTimeout, solve_key
+from services.solver_pool import SolveTimeout, SolverPool, solve_schedule
+from services.settings import resolve_config
+from services.timing import RequestMetrics, RequestTimer, timed
+from services.whatif import SessionClosed, WhatIfQuestion, WhatIfSession, WhatIfStore
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-# certifi included to explicitly point the backend to a trusted CA certificate
-import certifi
-from flask_cors import CORS
+# NOTE: z3 (via classes.solver_config) is imported lazily inside the solve path so that
+# importing this module and creating the app stay cheap.
+
+api = Blueprint("api", __name__)
+
+# Most results one /search-courses page returns
+SEARCH_MAX_LIMIT = 100
+# Queued schedules one /process-repair-queue call repairs by default
+REPAIR_BATCH = 20
+# Most documents (or program courses) one page of the read endpoints returns
+READ_MAX_LIMIT = 100
+
+
+class _LazyCollection:
+    """Forwards attribute access to a Mongo collection that is only looked up on first use"""
+    def __init__(self, mongo: MongoProvider, name: str) -> None:
+        self._mongo = mongo
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._mongo.collection(self._name), attribute)
+
+
+def _searchable_courses(mongo: MongoProvider) -> List[Course]:
+    """Catalog courses, then program courses the catalog does not list (the catalog copy wins)"""
+    courses: Dict[str, Course] = {}
+    for course_dict in mongo.collection(CATALOG_COLLECTION).find({}, {"_id": 0}):
+        courses.setdefault(normalize_code(course_dict.get("code")), Course.from_dict(course_dict))
+    for program_dict in mongo.collection("Programs").find({}, {"required_courses": 1, "_id": 0}):
+        for course_dict in program_dict.get("required_courses", []):
+            if normalize_code(course_dict.get("code")) not in courses:
+                courses[normalize_code(course_dict.get("code"))] = Course.from_dict(course_dict)
+    return list(courses.values())
+
+
+class SchedulerState:
+    """
+    Per-app resources, created by ``create_app`` and stored in ``app.extensions["scheduler"]``.
+
+    Attributes:
+        mongo (MongoProvider): Lazily connected Mongo client.
+        program_cache (ProgramCache): Deserialized programs keyed by id and version.
+        preloaded (List[str]): Program ids loaded by ``preload`` before the workers forked.
+        program_usage (ProgramUsage): Solves per program, flushed to Mongo in the background.
+        solver_pool (SolverPool): Where solves run (inline or on a bounded thread pool).
+        metrics (MetricsRegistry): Prometheus-style metrics served on /metrics.
+        request_metrics (RequestMetrics): Request phase, solve outcome and Z3 statistics histograms.
+        admission (AdmissionController): Concurrency limiter and wait queue in front of the solver.
+        single_flight (SingleFlight | MongoLeaseSingleFlight | None): Coalesces identical in-flight solves.
+        slow_capture (SlowSolveCapture): Dumps slow solves to disk for offline replay.
+        artifacts (ArtifactStore | None): Precompiled program constraints, None when disabled.
+        what_if (WhatIfStore): Warm what-if solver sessions.
+        catalog_index (RefreshingCatalogIndex): Course search index, built on the first search.
+        repair_queue (RepairQueue): Stored schedules a program or catalog edit broke.
+        read_cache (EncodedBodyCache): Encoded bodies of the read endpoints, keyed by ETag.
+        profiler (RequestProfiler): Profiles the requests that ask for it with the profile token.
+    """
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.mongo = MongoProvider(
+            connection_string=config["MONGO_CONNECTION_STRING"],
+            database_name=config["MONGO_DATABASE"],
+            client_factory=config.get("MONGO_CLIENT_FACTORY")
+        )
+        self.program_cache = ProgramCache()
+        self.program_usage = ProgramUsage(lambda: self.mongo.db, config["USAGE_FLUSH_S"])
+        self.preloaded: List[str] = []
+        self.solver_pool = SolverPool(config["SOLVER_MODE"], config["SOLVER_THREADS"])
+        self.metrics = MetricsRegistry()
+        self.request_metrics = RequestMetrics(self.metrics)
+        self.admission = AdmissionController(config["ADMISSION_MAX_CONCURRENT"], config["ADMISSION_MAX_QUEUE"], self.metrics)
+        self.slow_capture = SlowSolveCapture(config["SLOW_SOLVE_DIR"], config["SLOW_SOLVE_MS"], config["SLOW_SOLVE_MAX_BYTES"])
+        self.what_if = WhatIfStore(config["WHAT_IF_MAX_SESSIONS"], config["WHAT_IF_SESSION_TTL_S"])
+        self.repair_queue = RepairQueue(_LazyCollection(self.mongo, SCHEDULE_COLLECTION))
+        self.read_cache = EncodedBodyCache()
+        self.profiler = RequestProfiler(
+            config["PROFILE_DIR"], config["PROFILE_TOKEN"], config["PROFILE_MAX_BYTES"], config["PROFILE_SAMPLE_INTERVAL_MS"]
+        )
+        self.catalog_index = RefreshingCatalogIndex(lambda: _searchable_courses(self.mongo), config["CATALOG_INDEX_REFRESH_S"])
+        self.artifacts = None
+        if config["ARTIFACT_STORE"] == "disk":
+            self.artifacts = DiskArtifactStore(config["ARTIFACT_DIR"])
+        elif config["ARTIFACT_STORE"] == "mongo":
+            self.artifacts = MongoArtifactStore(_LazyCollection(self.mongo, "SolverArtifacts"))
+        self.single_flight = None
+        if config["SINGLE_FLIGHT"] == "local":
+            self.single_flight = SingleFlight(self.metrics)
+        elif config["SINGLE_FLIGHT"] == "mongo":
+            # The collection handle is resolved lazily so no connection is opened here
+            self.single_flight = MongoLeaseSingleFlight(
+                _LazyCollection(self.mongo, "SolveLeases"),
+                encode=schedule_to_names,
+                decode=schedule_from_names,
+                registry=self.metrics
+            )
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """
+    Builds the Flask app without touching Mongo or z3.
+
+    Config is read from ``config`` overrides, then environment variables, then appsettings.json
+    (see ``services.settings``). When ``WARMUP_ON_START`` is set the warm-up hook runs before
+    the app is returned, i.e. before the worker accepts traffic.
+    """
+    app = Flask(__name__)
+    app.config.update(resolve_config(config))
+    CORS(app)
+
+    app.extensions["scheduler"] = SchedulerState(app.config)
+    app.register_blueprint(api)
+
+    if app.config["WARMUP_ON_START"]:
+        warm_up(app)
+
+    return app
+
+
+def get_state() -> SchedulerState:
+    return current_app.extensions["scheduler"]
+
+
+def warm_up(app: Flask, program_ids: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Pre-compiles hot programs so the first real solves do not pay for z3 import,
+    program deserialization or constraint encoding.
+
+    Returns the seconds spent on each program id.
+    """
+    program_ids = app.config["WARMUP_PROGRAMS"] if program_ids is None else program_ids
+    timings: Dict[str, float] = {}
+    with app.app_context():
+        for program_id in program_ids:
+            start = time.perf_counter()
+            cached = _load_program(program_id)
+            if cached is not None:
+                solve_schedule(cached.program, Profile(id="warmup"), cached.index, artifacts=get_state().artifacts)
+            timings[program_id] = time.perf_counter() - start
+    return timings
+
+
+def preload(app: Flask) -> List[str]:
+    """
+    Runs in the gunicorn master (``preload_app``): builds deserialized programs and their
+    ProgramIndex for the configured and most used programs so forked workers share them
+    copy-on-write. The master's Mongo client is closed again because it must not cross fork.
+    """
+    state = app.extensions["scheduler"]
+    if app.config["PRELOAD_PROGRAMS"] or app.config["PRELOAD_TOP_N"]:
+        state.program_usage.flush()
+        state.preloaded = preload_programs(
+            state.mongo.db,
+            state.program_cache,
+            app.config["PRELOAD_PROGRAMS"],
+            app.config["PRELOAD_TOP_N"]
+        )
+        state.mongo.close()
+    freeze_shared_state()
+    return state.preloaded
+
+
+def after_fork(app: Flask) -> None:
+    """Runs in each worker right after fork; the worker lazily opens its own Mongo client"""
+    app.extensions["scheduler"].mongo.reset_after_fork()
+    app.extensions["scheduler"].program_usage.reset_after_fork()
+
+
+def _load_program(program_id: str):
+    """Returns the cached program at its current version, fetching the document only when stale"""
+    state = get_state()
+    collection = state.mongo.collection("Programs")
+    timer = _timer()
+
+    # Cheap version probe so the full document is only transferred on a cache miss
+    with timed(timer, "mongo"):
+        version_doc = collection.find_one({"id": program_id}, {"version": 1})
+    if version_doc is None:
+        return None
+    version = program_version(version_doc)
+    cached = state.program_cache.get(program_id, version)
+    if cached is not None:
+        return cached
+    with timed(timer, "mongo"):
+        program_dict = collection.find_one({"id": program_id})
+    if program_dict is None:
+        return None
+    with timed(timer, "from_dict"):
+        return state.program_cache.put(program_id, program_dict)
+
+
+def _load_programs(program_ids: List[str]):
+    """
+    The cached program for one id, or the merged program for several (double major, major + minor),
+    cached under the joined ids and versions. Returns ``(entry, None)`` or ``(None, missing_id)``.
+    """
+    state = get_state()
+    if not program_ids:
+        return None, None
+    entries = []
+    for program_id in program_ids:
+        cached = _load_program(program_id)
+        if cached is None:
+            return None, program_id
+        entries.append(cached)
+    if len(entries) == 1:
+        return entries[0], None
+
+    merged_id = "+".join(program_ids)
+    version = "+".join(str(entry.version) for entry in entries)
+    cached = state.program_cache.get(merged_id, version)
+    if cached is None:
+        with timed(_timer(), "from_dict"):
+            cached = state.program_cache.put_program(merged_id, Program.merge([entry.program for entry in entries]), version)
+    return cached, None
+
+
+def _load_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    with timed(_timer(), "mongo"):
+        return get_state().mongo.collection("Profiles").find_one({"id": profile_id})
+
+
+def _load_catalog(profile: Profile) -> List[Course]:
+    """Catalog courses that can cover the profile's GER minimums (none for most profiles)"""
+    query = catalog_query(profile)
+    if query is None:
+        return []
+    with timed(_timer(), "mongo"):
+        course_dicts = list(get_state().mongo.collection(CATALOG_COLLECTION).find(query, {"_id": 0}))
+    with timed(_timer(), "from_dict"):
+        return [Course.from_dict(course_dict) for course_dict in course_dicts]
+
+
+def _save_schedule(profile_id: str, program_ids: List[str], version: Any, schedule: Dict[str, Quarter]) -> None:
+    """Keeps the latest schedule of a profile and program, which repairs start from"""
+    with timed(_timer(), "mongo"):
+        get_state().mongo.collection(SCHEDULE_COLLECTION).replace_one(
+            {"profile": profile_id, "program": "+".join(program_ids)},
+            schedule_document(profile_id, program_ids, version, schedule),
+            upsert=True
+        )
+
+
+def _run_repair(cached_program, profile_obj: Profile, catalog: List[Course], previous: Dict[str, Quarter], deadline: float):
+    """SolverConfig.repair on the solver pool, once admission control grants a slot"""
+    timer = g.timer
+    state = get_state()
+
+    def repair():
+        from classes.solver_config import SolverConfig
+
+        with timed(timer, "encode"):
+            config = SolverConfig(cached_program.program, profile_obj, None if profile_obj.has_transcript else cached_program.index, catalog=catalog)
+        with config:
+            with timed(timer, "check"):
+                return config.repair(previous, max(1, int((deadline - time.monotonic()) * 1000)))
+
+    with state.admission.admit(deadline) as waited:
+        timer.record("queue", waited)
+        return state.solver_pool.run(repair)
+
+
+def _revalidate(change: Change, catalog: List[Course] = ()) -> int:
+    """
+    Checks the stored schedules ``change`` can affect against the programs as they are now,
+    without the solver, and queues the broken ones for repair. Returns how many were queued.
+    """
+    state = get_state()
+    with timed(_timer(), "mongo"):
+        documents = state.repair_queue.affected(change)
+        profile_ids = list({document["profile"] for document in documents})
+        profiles = {profile_dict["id"]: profile_dict for profile_dict in state.mongo.collection("Profiles").find({"id": {"$in": profile_ids}})}
+
+    programs = {}
+    queued = 0
+    for document in documents:
+        if document["program"] not in programs:
+            try:
+                programs[document["program"]] = _load_programs(document.get("programs") or document["program"].split("+"))[0]
+            except ProgramConflict as conflict:
+                programs[document["program"]] = conflict
+        cached_program = programs[document["program"]]
+        if isinstance(cached_program, ProgramConflict):
+            # The combined programs no longer agree on a course, so no stored plan can hold
+            with timed(_timer(), "mongo"):
+                state.repair_queue.enqueue(document["_id"], [str(cached_program)])
+            queued += 1
+            continue
+        profile_dict = profiles.get(document["profile"])
+        if cached_program is None or profile_dict is None:
+            continue
+        profile_obj = Profile.from_dict(profile_dict)
+        violations = validate_schedule(
+            schedule_from_names(document["schedule"]), cached_program.program,
+            profile_obj.completed_courses, profile_obj.max_quarter_units, catalog
+        )
+        if violations:
+            with timed(_timer(), "mongo"):
+                state.repair_queue.enqueue(document["_id"], violations)
+            queued += 1
+    return queued
+
+
+def _index_program_courses(index: CatalogIndex, courses: List[Course]) -> None:
+    """Program courses only fill gaps in the search index; the catalog copy of a course wins"""
+    for course in courses:
+        if course.code not in index:
+            index.add(course)
 
 
-def load_app_settings(file_path='appsettings.json'):
-    with open(file_path, 'r') as file:
-        app_settings = json.load(file)
-        return app_settings
-    
-# Database testing
-app_settings = load_app_settings()
-connection_string = app_settings["DatabaseConnection"]["ConnectionString"]
+def _timer() -> Optional[RequestTimer]:
+    """The current request's timer, or None outside a request (e.g. warm-up)"""
+    return g.get("timer") if g else None
 
-# certifi included to explicitly point the backend to a trusted CA certificate
-client = MongoClient(connection_string, tls=True, tlsCAFile=certifi.where())
 
+@api.before_request
+def _start_timer():
+    g.timer = RequestTimer()
 
-app = Flask(__name__)
-CORS(app)
 
-@app.get('/solve-user-schedule')
+@api.after_request
+def _finish_timer(response):
+    # Every endpoint reports its phases (mongo, from_dict, encode, check, extract, json, ...)
+    timer = g.pop("timer", None)
+    if timer is not None and request.endpoint != "api.metrics":
+        response.headers["Server-Timing"] = timer.header()
+        get_state().request_metrics.observe_request(request.endpoint, request.method, response.status_code, timer)
+    return response
+
+
+@api.before_request
+def _start_profile():
+    # Off unless a profile token is configured; then only requests presenting it are profiled
+    profiler = get_state().profiler
+    if not profiler.enabled or not profiler.requested(request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_PARAM)):
+        return None
+    try:
+        g.profile = profiler.start(request.headers.get(PROFILE_MODE_HEADER) or request.args.get(PROFILE_MODE_PARAM) or "sample")
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return None
+
+
+@api.after_request
+def _finish_profile(response):
+    session = g.pop("profile", None)
+    if session is not None:
+        response.headers[PROFILE_OUTPUT_HEADER] = _write_profile(session, response.status_code)
+    return response
+
+
+@api.teardown_request
+def _abandon_profile(error):
+    # after_request does not run when the view raised
+    session = g.pop("profile", None)
+    if session is not None:
+        _write_profile(session, 500)
+
+
+def _write_profile(session, status: int) -> str:
+    timer = g.get("timer")
+    return get_state().profiler.finish(session, request.endpoint.replace("api.", "") if request.endpoint else "unknown", {
+        "method": request.method,
+        "path": request.path,
+        "args": {key: value for key, value in request.args.items() if key != PROFILE_PARAM},
+        "status": status,
+        "spans_ms": {name: seconds * 1000 for name, seconds in timer.spans.items()} if timer is not None else {},
+    })
+
+
+@api.errorhandler(ProgramConflict)
+def _program_conflict(error):
+    # Any endpoint combining several programs (?program=A&program=B)
+    return jsonify({"error": str(error)}), 409
+
+
+def _request_deadline() -> float:
+    """
+    Monotonic deadline for this request, from the X-Request-Timeout-Ms header or the timeout_ms
+    query parameter, capped at MAX_REQUEST_TIMEOUT_MS and defaulting to REQUEST_TIMEOUT_MS
+    """
+    config = current_app.config
+    requested = request.headers.get("X-Request-Timeout-Ms") or request.args.get("timeout_ms")
+    try:
+        timeout_ms = int(requested) if requested is not None else config["REQUEST_TIMEOUT_MS"]
+    except ValueError:
+        timeout_ms = config["REQUEST_TIMEOUT_MS"]
+    timeout_ms = min(max(timeout_ms, 0), config["MAX_REQUEST_TIMEOUT_MS"])
+    return time.monotonic() + timeout_ms / 1000
+
+
+def _read_limit() -> int:
+    limit = int(request.args.get("limit", 20))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, READ_MAX_LIMIT)
+
+
+def _read_response(
+    kind: str,
+    document_id: Optional[str],
+    version: Any,
+    variant: List[Any],
+    build: Callable[[], Tuple[Any, Any]]
+):
+    """
+    JSON response of a read endpoint, gzipped when the client accepts it. With a ``version``
+    (from a cheap version probe) the response carries a strong ETag. A matching If-None-Match
+    gets a 304 before the document is read or serialized, and other hits are served from the
+    cache of encoded bodies. ``build`` reads the document and returns the payload with the version
+    it was read at, which names the body in case a write landed after the probe.
+    """
+    state = get_state()
+    gzipped = accepts_gzip(request.headers.get("Accept-Encoding"))
+    coding = "gzip" if gzipped else "identity"
+    etag = entity_tag(kind, document_id, version, *variant, coding) if version is not None else None
+
+    cached = None
+    if etag is not None:
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            response = current_app.response_class(status=304)
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        cached = state.read_cache.get(etag)
+    if cached is not None:
+        body, encoding = cached
+    else:
+        payload, read_version = build()
+        with g.timer.span("json"):
+            body, encoding = encode_body(current_app.json.dumps(payload).encode(), gzipped)
+        if etag is not None:
+            etag = entity_tag(kind, document_id, read_version, *variant, coding)
+            state.read_cache.put(etag, body, encoding)
+
+    response = current_app.response_class(body, status=200, mimetype="application/json")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    if etag is not None:
+        response.headers["ETag"] = etag
+        # Clients may keep the body but revalidate it on every use
+        response.headers["Cache-Control"] = "no-cache"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def _read_page(collection_name: str, key: str, allowed_fields: Tuple[str, ...]):
+    """One page of a collection in ``id`` order, resuming after the id in the cursor"""
+    try:
+        fields = parse_fields(request.args.get("fields"), allowed_fields)
+        limit = _read_limit()
+        after = decode_cursor(request.args.get("cursor")).get("after")
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    def build():
+        query = {"id": {"$gt": after}} if after is not None else {}
+        with g.timer.span("mongo"):
+            documents = list(
+                get_state().mongo.collection(collection_name).find(query, mongo_projection(fields)).sort("id", 1).limit(limit + 1)
+            )
+        page = [project(document, fields) for document in documents[:limit]]
+        next_cursor = encode_cursor({"after": documents[limit - 1]["id"]}) if len(documents) > limit else None
+        return {key: page, "next_cursor": next_cursor}, None
+
+    # A page has no single version to validate against, so it is not tagged
+    return _read_response(key, None, None, [], build)
+
+
+def _service_unavailable(message: str, retry_after: int):
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+@api.get('/metrics')
+def metrics():
+    return get_state().metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@api.get('/solve-user-schedule')
 def solve_user_schedule():
-    
-    # Extracting URL parameters
-    program_id = request.args.get("program")
+    deadline = _request_deadline()
+    # Extracting URL parameters; repeating program (?program=CS&program=MATH) solves one combined plan
+    program_ids = request.args.getlist("program")
+    program_id = "+".join(program_ids)
     profile_id = request.args.get("profile")
-    
-    # Accessing collections
-    db = client["SchedulerDB"]
-    program_collection = db["Programs"]
-    profile_collection = db["Profiles"]
-    
-    # TODO: Add null checking
+
+    timer = g.timer
+
     # Pulling documents
-    program_dict = program_collection.find_one({"id": program_id})
-    profile_dict = profile_collection.find_one({"id": profile_id})
-    
+    cached_program, missing_id = _load_programs(program_ids)
+    if cached_program is None:
+        return jsonify({"error": f"No program found with ID {missing_id}"}), 404
+    profile_dict = _load_profile(profile_id)
+    if profile_dict is None:
+        return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+
+    # Counted in memory; a background thread writes the counts behind the top-N preload
+    for usage_id in program_ids:
+        get_state().program_usage.record(usage_id)
+
     # Converting to objects
-    program_obj = Program.from_dict(program_dict)
-    profile_obj = Profile.from_dict(profile_dict)
-    
+    program_obj = cached_program.program
+    with timer.span("from_dict"):
+        profile_obj = Profile.from_dict(profile_dict)
+    catalog = _load_catalog(profile_obj)
+
     # TODO: Add validation to objects (most immediately course) to make sure they have necessary fields
-    # Configuring solver
-    scheduleSolver = SolverConfig(program=program_obj, profile=profile_obj)
-    
-    # Solving
-    schedule = scheduleSolver.solve()
-    
-    # Master schedule dictionary
-    schedule_dict = {Quarter.FRESH_FALL: [], Quarter.FRESH_WINTER: [], Quarter.FRESH_SPRING: [], 
-                     Quarter.SOPH_FALL: [], Quarter.SOPH_WINTER: [], Quarter.SOPH_SPRING: [], 
-                     Quarter.JUNIOR_FALL: [], Quarter.JUNIOR_WINTER: [], Quarter.JUNIOR_SPRING: [], 
-                     Quarter.SENIOR_FALL: [], Quarter.SENIOR_WINTER: [], Quarter.SENIOR_SPRING: []}
-    
+    # Configuring solver and solving in its own Z3 context, once admission control grants a slot;
+    # whatever is left of the deadline bounds the solve itself
+    state = get_state()
+
+    def observe(config, seconds):
+        state.request_metrics.observe_solve(config, seconds)
+        if state.slow_capture.should_capture(seconds):
+            state.slow_capture.capture(config, program_obj.to_dict(), profile_dict, seconds, [course.to_dict() for course in catalog])
+
+    def run_solve():
+        with state.admission.admit(deadline) as waited:
+            timer.record("queue", waited)
+            remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+            return state.solver_pool.run(
+                solve_schedule, program_obj, profile_obj, cached_program.index, remaining_ms,
+                timer, observe, state.artifacts, catalog
+            )
+
+    try:
+        if state.single_flight is None:
+            schedule = run_solve()
+        else:
+            # Identical concurrent requests (same program version and profile) share one solve;
+            # followers only report the time they waited for it
+            key = solve_key(program_id, cached_program.version, profile_dict)
+            with timer.span("solve"):
+                schedule = state.single_flight.do(key, run_solve, timeout=max(0.0, deadline - time.monotonic()))
+    except AdmissionRejected as rejected:
+        return _service_unavailable(f"Solver busy ({rejected.reason}), retry later", rejected.retry_after)
+    except (SolveTimeout, SingleFlightTimeout):
+        return _service_unavailable("Solve did not finish before the request deadline", 1)
     if schedule:
-        for course_code, quarter in schedule.items():
-            course_name = [course for course in program_obj.required_courses if course.code == course_code][0].title
-            schedule_string = f"{course_code}: {course_name}"
-            schedule_dict[quarter].append(schedule_string)
-    else:
-        return jsonify({"schedule": "No schedule found"}), 200
-    
-    # Converting schedule to JSON serializable format
-    schedule_dict = {quarter.name: courses for quarter, courses in schedule_dict.items()}
-    
-    return jsonify({"schedule": schedule_dict}), 200
+        _save_schedule(profile_id, program_ids, cached_program.version, schedule)
+
+    with timer.span("json"):
+        response = jsonify(format_schedule(schedule, program_obj, catalog))
+    return response, 200
+
+
+@api.post('/what-if')
+def what_if():
+    deadline = _request_deadline()
+    timer = g.timer
+    state = get_state()
+
+    # Accessing request information
+    request_json = request.json
+    program_ids = request_json.get("program")
+    program_ids = program_ids if isinstance(program_ids, list) else [program_ids]
+    program_id = "+".join(map(str, program_ids))
+    profile_id = request_json.get("profile")
+    session_id = request_json.get("session") or uuid.uuid4().hex
+    try:
+        question = WhatIfQuestion.from_dict(request_json)
+    except (KeyError, TypeError, AttributeError) as error:
+        return jsonify({"error": f"Invalid what-if question: {error}"}), 400
+
+    # Pulling documents
+    cached_program, missing_id = _load_programs(program_ids)
+    if cached_program is None:
+        return jsonify({"error": f"No program found with ID {missing_id}"}), 404
+    profile_dict = _load_profile(profile_id)
+    if profile_dict is None:
+        return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+
+    profile_obj = Profile.from_dict(profile_dict)
+    catalog = _load_catalog(profile_obj)
+
+    # The session is rebuilt whenever the program version or the profile changes
+    key = solve_key(program_id, cached_program.version, profile_dict)
+
+    def new_session():
+        with timer.span("encode"):
+            return WhatIfSession(cached_program.program, profile_obj, cached_program.index, catalog)
+
+    def run_question():
+        with state.admission.admit(deadline) as waited:
+            timer.record("queue", waited)
+            session = state.what_if.session(session_id, key, new_session)
+            remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+            return state.solver_pool.run(session.ask, question, remaining_ms, timer)
+
+    try:
+        answer = run_question()
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    except AdmissionRejected as rejected:
+        return _service_unavailable(f"Solver busy ({rejected.reason}), retry later", rejected.retry_after)
+    except SolveTimeout:
+        return _service_unavailable("What-if did not finish before the request deadline", 1)
+    except SessionClosed:
+        return _service_unavailable("What-if session was replaced, retry", 0)
+
+    with timer.span("json"):
+        schedule = format_schedule(answer["schedule"], cached_program.program, catalog)["schedule"] if answer["feasible"] else None
+        response = jsonify({"session": session_id, "feasible": answer["feasible"], "schedule": schedule, "conflicts": answer["conflicts"]})
+    return response, 200
+
+
+@api.get('/course-quarter-range')
+def course_quarter_range():
+    deadline = _request_deadline()
+    timer = g.timer
+    state = get_state()
+    # Extracting URL parameters
+    program_ids = request.args.getlist("program")
+    profile_id = request.args.get("profile")
+
+    # Pulling documents
+    cached_program, missing_id = _load_programs(program_ids)
+    if cached_program is None:
+        return jsonify({"error": f"No program found with ID {missing_id}"}), 404
+    profile_dict = _load_profile(profile_id)
+    if profile_dict is None:
+        return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+    profile_obj = Profile.from_dict(profile_dict)
+    catalog = _load_catalog(profile_obj)
+
+    def analyze():
+        from classes.solver_config import SolverConfig
+
+        with timed(timer, "encode"):
+            config = SolverConfig(cached_program.program, profile_obj, None if profile_obj.has_transcript else cached_program.index, catalog=catalog)
+        with config:
+            with timed(timer, "check"):
+                return config.feasibility_matrix(max(1, int((deadline - time.monotonic()) * 1000)))
+
+    try:
+        with state.admission.admit(deadline) as waited:
+            timer.record("queue", waited)
+            analysis = state.solver_pool.run(analyze)
+    except AdmissionRejected as rejected:
+        return _service_unavailable(f"Solver busy ({rejected.reason}), retry later", rejected.retry_after)
+
+    with timer.span("json"):
+        courses = {
+            code: {
+                "feasible": [quarter.name for quarter, feasible in quarters.items() if feasible],
+                # Only present when a check ran out of time before deciding
+                "undecided": [quarter.name for quarter, feasible in quarters.items() if feasible is None]
+            }
+            for code, quarters in analysis.matrix.items()
+        }
+        response = jsonify({"courses": courses, "checks": analysis.checks, "candidates": analysis.candidates})
+    return response, 200
+
+
+@api.get('/min-quarter-units')
+def min_quarter_units():
+    deadline = _request_deadline()
+    timer = g.timer
+    state = get_state()
+    # Extracting URL parameters; the profile is optional and only contributes its transcript
+    program_ids = request.args.getlist("program")
+    profile_id = request.args.get("profile")
+
+    # Pulling documents
+    cached_program, missing_id = _load_programs(program_ids)
+    if cached_program is None:
+        return jsonify({"error": f"No program found with ID {missing_id}"}), 404
+    profile_obj = Profile(id="min-quarter-units")
+    if profile_id is not None:
+        profile_dict = _load_profile(profile_id)
+        if profile_dict is None:
+            return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+        profile_obj = Profile.from_dict(profile_dict)
+    # The cap is what is being searched for
+    profile_obj.max_quarter_units = None
+    catalog = _load_catalog(profile_obj)
+
+    def search():
+        from classes.solver_config import SolverConfig
+
+        with timed(timer, "encode"):
+            config = SolverConfig(cached_program.program, profile_obj, None if profile_obj.has_transcript else cached_program.index, catalog=catalog)
+        with config:
+            with timed(timer, "check"):
+                return config.minimum_unit_cap(max(1, int((deadline - time.monotonic()) * 1000)))
+
+    try:
+        with state.admission.admit(deadline) as waited:
+            timer.record("queue", waited)
+            result = state.solver_pool.run(search)
+    except AdmissionRejected as rejected:
+        return _service_unavailable(f"Solver busy ({rejected.reason}), retry later", rejected.retry_after)
+
+    with timer.span("json"):
+        response = jsonify({
+            "max_quarter_units": result.cap,
+            "optimal": result.optimal,
+            "checks": result.checks,
+            "schedule": format_schedule(result.schedule, cached_program.program, catalog)["schedule"]
+        })
+    return response, 200
+
+
+@api.post('/repair-user-schedule')
+def repair_user_schedule():
+    deadline = _request_deadline()
+    timer = g.timer
+    state = get_state()
+
+    # Accessing request information; without "previous" the repair starts from the stored schedule
+    request_json = request.json
+    program_ids = request_json.get("program")
+    program_ids = program_ids if isinstance(program_ids, list) else [program_ids]
+    program_id = "+".join(map(str, program_ids))
+    profile_id = request_json.get("profile")
+
+    # Pulling documents
+    cached_program, missing_id = _load_programs(program_ids)
+    if cached_program is None:
+        return jsonify({"error": f"No program found with ID {missing_id}"}), 404
+    profile_dict = _load_profile(profile_id)
+    if profile_dict is None:
+        return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+    profile_obj = Profile.from_dict(profile_dict)
+    catalog = _load_catalog(profile_obj)
+
+    previous_names = request_json.get("previous")
+    if previous_names is None:
+        with timer.span("mongo"):
+            stored = state.mongo.collection(SCHEDULE_COLLECTION).find_one({"profile": profile_id, "program": program_id})
+        previous_names = stored["schedule"] if stored is not None else {}
+    try:
+        previous = schedule_from_names(previous_names)
+    except (KeyError, AttributeError) as error:
+        return jsonify({"error": f"Invalid previous schedule: {error}"}), 400
+
+    try:
+        result = _run_repair(cached_program, profile_obj, catalog, previous, deadline)
+    except AdmissionRejected as rejected:
+        return _service_unavailable(f"Solver busy ({rejected.reason}), retry later", rejected.retry_after)
+    if result.schedule:
+        _save_schedule(profile_id, program_ids, cached_program.version, result.schedule)
+
+    with timer.span("json"):
+        response = jsonify({
+            "schedule": format_schedule(result.schedule, cached_program.program, catalog)["schedule"],
+            "diff": schedule_diff(previous, result.schedule, profile_obj.completed_courses) if result.schedule is not None else None,
+            "checks": result.checks,
+            "complete": result.complete
+        })
+    return response, 200
+
+
+@api.post('/process-repair-queue')
+def process_repair_queue():
+    deadline = _request_deadline()
+    state = get_state()
+    # Accessing request information; meant for a scheduled job, one batch per call
+    batch = int((request.get_json(silent=True) or {}).get("batch", REPAIR_BATCH))
+
+    with g.timer.span("mongo"):
+        documents = state.repair_queue.claim(batch)
+    counts = {"repaired": 0, "infeasible": 0, "requeued": 0}
+    for position, document in enumerate(documents):
+        program_ids = document.get("programs") or document["program"].split("+")
+        cached_program, _ = _load_programs(program_ids)
+        profile_dict = _load_profile(document["profile"])
+        if cached_program is None or profile_dict is None:
+            state.repair_queue.give_up(document["_id"])
+            counts["infeasible"] += 1
+            continue
+        profile_obj = Profile.from_dict(profile_dict)
+        try:
+            result = _run_repair(cached_program, profile_obj, _load_catalog(profile_obj), schedule_from_names(document["schedule"]), deadline)
+        except AdmissionRejected:
+            # Interactive requests come first; the rest of the batch waits for the next call
+            for unrepaired in documents[position:]:
+                state.repair_queue.release(unrepaired["_id"])
+            counts["requeued"] += len(documents) - position
+            break
+        if result.schedule is not None:
+            # Saving replaces the document, which marks it valid again
+            _save_schedule(document["profile"], program_ids, cached_program.version, result.schedule)
+            counts["repaired"] += 1
+        elif result.complete:
+            state.repair_queue.give_up(document["_id"])
+            counts["infeasible"] += 1
+        else:
+            state.repair_queue.release(document["_id"])
+            counts["requeued"] += 1
+
+    with g.timer.span("mongo"):
+        remaining = state.repair_queue.pending()
+    return jsonify({**counts, "remaining": remaining}), 200
+
+
+@api.get('/search-courses')
+def search_courses():
+    # Extracting URL parameters; ger and quarter may repeat (every GER, any of the quarters)
+    query = request.args.get("q", "")
+    code_prefix = request.args.get("code", "")
+    try:
+        gers = [GER[name] for name in request.args.getlist("ger")]
+        quarters = [Quarter[name] for name in request.args.getlist("quarter")]
+    except KeyError as error:
+        return jsonify({"error": f"Invalid quarter or GER name: {error.args[0]}"}), 400
+    try:
+        limit = min(int(request.args.get("limit", 20)), SEARCH_MAX_LIMIT)
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be positive and offset not negative"}), 400
+
+    with g.timer.span("search"):
+        result = get_state().catalog_index.get().search(query, code_prefix, gers, quarters, limit, offset)
+
+    with g.timer.span("json"):
+        response = jsonify({
+            "courses": [{**hit.course.to_dict(), "score": hit.score} for hit in result.hits],
+            "has_more": result.has_more
+        })
+    return response, 200
+
+
+@api.get('/get-program')
+def get_program():
+    program_id = request.args.get("program")
+    try:
+        fields = parse_fields(request.args.get("fields"), PROGRAM_FIELDS)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    collection = get_state().mongo.collection("Programs")
+
+    # Version probe; a client that still holds this version gets a 304 without the document being read
+    with g.timer.span("mongo"):
+        version_doc = collection.find_one({"id": program_id}, {"version": 1})
+    if version_doc is None:
+        return jsonify({"error": f"No program found with ID {program_id}"}), 404
+
+    def build():
+        with g.timer.span("mongo"):
+            program_dict = collection.find_one({"id": program_id}, mongo_projection(fields, ["id", "version"])) or {}
+        return project(program_dict, fields), program_version(program_dict)
+
+    return _read_response("program", program_id, program_version(version_doc), [fields], build)
+
+
+@api.get('/get-programs')
+def get_programs():
+    return _read_page("Programs", "programs", PROGRAM_FIELDS)
+
+
+@api.get('/get-program-courses')
+def get_program_courses():
+    # Courses are only ever appended to a program, so a position stays valid across versions
+    program_id = request.args.get("program")
+    try:
+        fields = parse_fields(request.args.get("fields"), COURSE_FIELDS)
+        limit = _read_limit()
+        start = int(decode_cursor(request.args.get("cursor")).get("position", 0))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    collection = get_state().mongo.collection("Programs")
+
+    with g.timer.span("mongo"):
+        version_doc = collection.find_one({"id": program_id}, {"version": 1})
+    if version_doc is None:
+        return jsonify({"error": f"No program found with ID {program_id}"}), 404
+
+    def build():
+        # $slice reads one extra course to tell whether another page follows
+        with g.timer.span("mongo"):
+            program_dict = collection.find_one(
+                {"id": program_id}, {"_id": 0, "version": 1, "required_courses": {"$slice": [start, limit + 1]}}
+            ) or {}
+        courses = program_dict.get("required_courses", [])
+        next_cursor = encode_cursor({"position": start + limit}) if len(courses) > limit else None
+        version = program_version(program_dict)
+        page = {"courses": [project(course, fields) for course in courses[:limit]], "version": version, "next_cursor": next_cursor}
+        return page, version
+
+    return _read_response("program-courses", program_id, program_version(version_doc), [fields, start, limit], build)
+
+
+@api.get('/get-profile')
+def get_profile():
+    profile_id = request.args.get("profile")
+    try:
+        fields = parse_fields(request.args.get("fields"), PROFILE_FIELDS)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    collection = get_state().mongo.collection("Profiles")
+
+    # Profiles carry a version like programs do
+    with g.timer.span("mongo"):
+        version_doc = collection.find_one({"id": profile_id}, {"version": 1})
+    if version_doc is None:
+        return jsonify({"error": f"No profile found with ID {profile_id}"}), 404
+
+    def build():
+        with g.timer.span("mongo"):
+            profile_dict = collection.find_one({"id": profile_id}, mongo_projection(fields, ["id", "version"])) or {}
+        return project(profile_dict, fields), program_version(profile_dict)
+
+    return _read_response("profile", profile_id, program_version(version_doc), [fields], build)
+
+
+@api.get('/get-profiles')
+def get_profiles():
+    return _read_page("Profiles", "profiles", PROFILE_FIELDS)
 
 
 # Insert a program document into DB
-@app.post('/post-program')
+@api.post('/post-program')
 def post_program():
-    
+
     # Accessing DB and collection
-    db = client["SchedulerDB"]
-    collection = db["Programs"]
-    
+    collection = get_state().mongo.collection("Programs")
+
     # Pseudo validation (Add real validation)
     request_json = request.json
-    program = Program.from_dict(request_json)
-    program_insert = program.to_dict()
-    
-    inserted_id = collection.insert_one(program_insert).inserted_id
+    with g.timer.span("from_dict"):
+        program = Program.from_dict(request_json)
+        program_insert = program.to_dict()
+    program_insert["version"] = 1
+
+    with g.timer.span("mongo"):
+        inserted_id = collection.insert_one(program_insert).inserted_id
     inserted_string = f"Inserted ID: {inserted_id}"
-    
+    get_state().catalog_index.update(lambda index: _index_program_courses(index, program.required_courses))
+
     return jsonify({"result": inserted_string}), 200
 
 
-@app.post('/post-program-course')
+@api.post('/post-program-course')
 def post_program_course():
-    
+
     # Accessing DB and collection
-    db = client["SchedulerDB"]
-    collection = db["Programs"]
-    
+    state = get_state()
+    collection = state.mongo.collection("Programs")
+
     # Accessing request information
     request_json = request.json
     course = request_json['course']
     program_id = request_json['id']
-    
+
     # Validating for valid (offered quarters) string
-    for quarter_string in course['offered_quarters']:
-        if quarter_string not in Quarter.__members__:
-            return jsonify({"error": f"Invalid quarter offered string: {quarter_string}"}), 400
-    
-    # Updating program sheet
-    result = collection.update_one(
-        {"id": program_id},
-        {"$push": {"required_courses": course}}
-    )
-    
+    quarter_string = invalid_offered_quarter(course)
+    if quarter_string is not None:
+        return jsonify({"error": f"Invalid quarter offered string: {quarter_string}"}), 400
+
+    # Updating program sheet; bumping the version invalidates cached copies in every worker
+    with g.timer.span("mongo"):
+        result = collection.update_one(
+            {"id": program_id},
+            {"$push": {"required_courses": course}, "$inc": {"version": 1}}
+        )
+
     # Check if the update was successful
     if result.matched_count == 0:
         return jsonify({"error": f"No program found with ID {program_id}"}), 404
-    
-    return jsonify({"result": f"Course {course['code']}: {course['title']} added to program {program_id}"}), 200
+    state.program_cache.invalidate(program_id)
+    state.catalog_index.update(lambda index: _index_program_courses(index, [Course.from_dict(course)]))
+    invalidated = _revalidate(Change("course_added", course["code"], program_id))
 
-@app.post('/post-prereq-course')
+    return jsonify({
+        "result": f"Course {course['code']}: {course['title']} added to program {program_id}",
+        "invalidated": invalidated
+    }), 200
+
+@api.post('/post-prereq-course')
 def post_prereq_course():
     # Accessing DB and collection
-    db = client["SchedulerDB"]
-    collection = db["Programs"]
-    
+    state = get_state()
+    collection = state.mongo.collection("Programs")
+
     # Accessing request information
     request_json = request.json
     program_id = request_json['id']
     course_code = request_json['course']
-    
+
     # Getting prereq course
     prereq_course = request_json['prereq_course']
-    
-    result = collection.update_one(
-        {
-            "id": program_id, 
-            "required_courses.code": course_code
-        },
-        {
-            "$push": {
-                    "required_courses.$.prereqs": prereq_course
+
+    with g.timer.span("mongo"):
+        result = collection.update_one(
+            {
+                "id": program_id,
+                "required_courses": {"$elemMatch": {"code": course_code}}
+            },
+            {
+                "$push": {
+                        "required_courses.$.prereqs": prereq_course
+                },
+                "$inc": {"version": 1}
             }
-        }
-    )
-    
+        )
+
     if result.matched_count == 0:
         return jsonify({"error": f"No program found with ID {program_id} or course with code {course_code}"}), 404
     if result.modified_count == 0:
         return jsonify({"error": f"Course {course_code} not found in program {program_id}"}), 404
-    
-    return jsonify({"result": f"Prereq course {prereq_course} added to course {course_code} in program {program_id}"}), 200
-    
+    state.program_cache.invalidate(program_id)
+    invalidated = _revalidate(Change("prereq_added", course_code, program_id))
+
+    return jsonify({
+        "result": f"Prereq course {prereq_course} added to course {course_code} in program {program_id}",
+        "invalidated": invalidated
+    }), 200
+
+
 
+# Insert or replace a course in the elective catalog
+@api.post('/post-catalog-course')
+def post_catalog_course():
 
-@app.post('/post-profile')
+    # Accessing DB and collection
+    state = get_state()
+    collection = state.mongo.collection(CATALOG_COLLECTION)
+
+    # Accessing request information
+    course = request.json
+    quarter_string = invalid_offered_quarter(course)
+    if quarter_string is not None:
+        return jsonify({"error": f"Invalid quarter offered string: {quarter_string}"}), 400
+    try:
+        with g.timer.span("from_dict"):
+            course_insert = Course.from_dict(course).to_dict()
+    except KeyError as error:
+        return jsonify({"error": f"Invalid GER or grade name: {error.args[0]}"}), 400
+
+    # One document per course code
+    with g.timer.span("mongo"):
+        collection.replace_one({"code": course_insert["code"]}, course_insert, upsert=True)
+    catalog_course = Course.from_dict(course_insert)
+    state.catalog_index.update(lambda index: index.add(catalog_course))
+    invalidated = _revalidate(Change("offering_changed", catalog_course.code), [catalog_course])
+
+    return jsonify({
+        "result": f"Course {course_insert['code']}: {course_insert['title']} added to the catalog",
+        "invalidated": invalidated
+    }), 200
+
+
+@api.post('/post-profile')
 def post_profile():
-    
+
     # Accessing DB and collection
-    db = client["SchedulerDB"]
-    collection = db["Profiles"]
-    
+    collection = get_state().mongo.collection("Profiles")
+
     # Pseudo validatin (Add real validation)
     request_json = request.json
-    profile = Profile.from_dict(request_json)
-    profile_insert = profile.to_dict()
-    
-    inserted_id = collection.insert_one(profile_insert).inserted_id
+    try:
+        with g.timer.span("from_dict"):
+            profile = Profile.from_dict(request_json)
+            profile_insert = profile.to_dict()
+    except KeyError as error:
+        return jsonify({"error": f"Invalid quarter or GER name: {error.args[0]}"}), 400
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    # Versioned like programs, for the ETags of /get-profile
+    profile_insert["version"] = 1
+
+    with g.timer.span("mongo"):
+        inserted_id = collection.insert_one(profile_insert).inserted_id
     inserted_string = f"Inserted ID: {inserted_id}"
-    
+
     return jsonify({"result": inserted_string}), 200
 
-# REMOVE THIS FOR PRODUCTION
-app.run(debug=True)
-    
\ No newline at end of file
+
+if __name__ == '__main__':
+    # Development server only; production runs under gunicorn
+    create_app().run(debug=True)
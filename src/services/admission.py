@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, Optional
+
+from services.metrics import MetricsRegistry
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a solve cannot start before its deadline.
+
+    Attributes:
+        reason (str): "queue_full", "deadline" (expired while queued) or "would_miss_deadline" (rejected up front).
+        retry_after (int): Suggested seconds before retrying, for the Retry-After header.
+    """
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Solve rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Concurrency limiter in front of the solver with a bounded FIFO wait queue.
+
+    At most ``max_concurrent`` solves run at once; up to ``max_queue`` more wait in arrival order.
+    A request is rejected immediately when the queue is full or when the expected wait (queue
+    position times the smoothed solve time) already exceeds its deadline, and rejected when its
+    deadline passes while still queued. Freed slots are handed directly to the oldest waiter.
+
+    Attributes:
+        max_concurrent (int): Solves allowed to run at the same time.
+        max_queue (int): Requests allowed to wait for a slot.
+    """
+    # Weight of the newest sample in the smoothed solve duration
+    SMOOTHING = 0.2
+
+    def __init__(self, max_concurrent: int, max_queue: int, registry: Optional[MetricsRegistry] = None) -> None:
+        self._max_concurrent = max(1, max_concurrent)
+        self._max_queue = max(0, max_queue)
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._avg_solve_seconds = 0.0
+
+        registry = registry or MetricsRegistry()
+        self._queue_depth = registry.gauge("solver_queue_depth", "Requests waiting for a solver slot")
+        self._active_gauge = registry.gauge("solver_active", "Solves currently running")
+        self._wait_seconds = registry.histogram("solver_admission_wait_seconds", "Time spent waiting for a solver slot")
+        self._admitted = registry.counter("solver_admitted_total", "Requests admitted to the solver")
+        self._rejections = registry.counter("solver_admission_rejections_total", "Requests rejected by admission control")
+        self._queue_depth.set(0)
+        self._active_gauge.set(0)
+
+    def _retry_after(self, position: int) -> int:
+        # Rough time until the queue ahead of a new arrival drains
+        expected = (position + 1) * self._avg_solve_seconds / self._max_concurrent
+        return max(1, math.ceil(expected))
+
+    def _reject(self, reason: str, position: int) -> AdmissionRejected:
+        self._rejections.inc(reason=reason)
+        return AdmissionRejected(reason, self._retry_after(position))
+
+    def _acquire(self, deadline: float) -> float:
+        """Blocks until a slot is granted and returns the time waited; raises AdmissionRejected"""
+        start = time.monotonic()
+        with self._lock:
+            if self._active < self._max_concurrent and not self._waiters:
+                self._active += 1
+                self._active_gauge.set(self._active)
+                return 0.0
+            position = len(self._waiters)
+            if position >= self._max_queue:
+                raise self._reject("queue_full", position)
+            expected_wait = (position + 1) * self._avg_solve_seconds / self._max_concurrent
+            if start + expected_wait > deadline:
+                raise self._reject("would_miss_deadline", position)
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+            self._queue_depth.set(len(self._waiters))
+
+        waiter.event.wait(max(0.0, deadline - time.monotonic()))
+
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                self._queue_depth.set(len(self._waiters))
+                raise self._reject("deadline", len(self._waiters))
+        return time.monotonic() - start
+
+    def _release(self, solve_seconds: float) -> None:
+        with self._lock:
+            self._avg_solve_seconds += self.SMOOTHING * (solve_seconds - self._avg_solve_seconds)
+            if self._waiters:
+                # Hand the slot straight to the oldest waiter; the active count is unchanged
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.event.set()
+                self._queue_depth.set(len(self._waiters))
+            else:
+                self._active -= 1
+                self._active_gauge.set(self._active)
+
+    @contextmanager
+    def admit(self, deadline: float) -> Iterator[float]:
+        """
+        Holds a solver slot for the duration of the block.
+
+        ``deadline`` is a ``time.monotonic()`` timestamp by which the solve must have started.
+        Yields the seconds spent waiting.
+        """
+        waited = self._acquire(deadline)
+        self._admitted.inc()
+        self._wait_seconds.observe(waited)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self._release(time.monotonic() - start)
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+    @property
+    def max_queue(self) -> int:
+        return self._max_queue
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
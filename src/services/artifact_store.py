@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from classes.components.course import Course
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+
+def _compress(artifact: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(artifact, separators=(",", ":")).encode("utf-8"))
+
+def _decompress(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class ArtifactStore:
+    """
+    Precompiled program constraints (``SolverConfig.to_artifact``) keyed by program content hash.
+
+    Cold workers and cache misses load the SMT-LIB2 artifact instead of encoding the program in
+    Python again. The key covers the program content and the artifact format, so an edited
+    program or a changed encoding never reuses a stale artifact. Recently used artifacts are also
+    kept in memory. Subclasses provide ``_read`` and ``_write``.
+
+    Attributes:
+        memory_entries (int): Artifacts kept in memory before the least recently used is dropped.
+    """
+    def __init__(self, memory_entries: int = 64) -> None:
+        self._memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys: "weakref.WeakKeyDictionary[Program, str]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def key(self, program: Program) -> str:
+        """Content hash of the program and the artifact format (memoized per Program object)"""
+        from classes.solver_config import ARTIFACT_FORMAT
+
+        with self._lock:
+            key = self._keys.get(program)
+        if key is None:
+            content = json.dumps(program.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+            key = hashlib.sha256(f"{ARTIFACT_FORMAT}:{content}".encode("utf-8")).hexdigest()
+            with self._lock:
+                self._keys[program] = key
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            artifact = self._memory.get(key)
+            if artifact is not None:
+                self._memory.move_to_end(key)
+                return artifact
+        blob = self._read(key)
+        if blob is None:
+            return None
+        try:
+            artifact = _decompress(blob)
+        except (zlib.error, ValueError):
+            return None
+        self._remember(key, artifact)
+        return artifact
+
+    def put(self, key: str, artifact: Dict[str, Any]) -> None:
+        self._remember(key, artifact)
+        self._write(key, _compress(artifact))
+
+    def config_for(self, program: Program, profile: Profile, index: Optional[ProgramIndex] = None, catalog: Optional[List[Course]] = None):
+        """
+        A SolverConfig for the program, from its artifact if stored, otherwise encoded (and stored).
+        Catalog electives are profile constraints, so they never change the artifact
+        """
+        from classes.solver_config import SolverConfig
+        from z3 import Z3Exception
+
+        if profile is not None and profile.has_transcript:
+            # The model is shrunk to the student's remaining courses, which is cheap to encode
+            # and rarely shared, so it is not worth an artifact
+            return SolverConfig(program=program, profile=profile, index=index, catalog=catalog)
+
+        key = self.key(program)
+        artifact = self.get(key)
+        if artifact is not None:
+            try:
+                return SolverConfig.from_artifact(program, artifact, profile, index, catalog=catalog)
+            except (ValueError, KeyError, Z3Exception):
+                # Unreadable or mismatched artifact; fall through and rebuild it
+                pass
+        config = SolverConfig(program=program, profile=profile, index=index, catalog=catalog)
+        self.put(key, config.to_artifact())
+        return config
+
+    def _remember(self, key: str, artifact: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = artifact
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _write(self, key: str, blob: bytes) -> None:
+        raise NotImplementedError
+
+
+class DiskArtifactStore(ArtifactStore):
+    """Artifacts as zlib-compressed JSON files named by key; writes are atomic renames"""
+    def __init__(self, directory: str, memory_entries: int = 64) -> None:
+        super().__init__(memory_entries)
+        self._directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}.artifact")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, blob: bytes) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        temporary = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(blob)
+        os.replace(temporary, self.path(key))
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+
+class MongoArtifactStore(ArtifactStore):
+    """Artifacts in a Mongo collection, one document per key, shared by every worker and host"""
+    def __init__(self, collection, memory_entries: int = 64) -> None:
+        super().__init__(memory_entries)
+        self._collection = collection
+
+    def _read(self, key: str) -> Optional[bytes]:
+        document = self._collection.find_one({"_id": key}, {"artifact": 1})
+        return bytes(document["artifact"]) if document is not None else None
+
+    def _write(self, key: str, blob: bytes) -> None:
+        self._collection.replace_one({"_id": key}, {"_id": key, "artifact": blob}, upsert=True)
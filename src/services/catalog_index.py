@@ -0,0 +1,537 @@
+import heapq
+import itertools
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from classes.components.course import Course
+from classes.components.enums import GER, Quarter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+# Per-occurrence weight of a token by where it appears; the code itself is a token so "cs106" finds CS106A
+CODE_WEIGHT = 10
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+
+# With at most this many filter matches, code-ordered results are sorted directly instead of walking the trie
+SPARSE_MATCHES = 2048
+# A partially typed last query word matches at most this many vocabulary words
+MAX_EXPANSIONS = 64
+# Ranked queries intersect a word's weight tiers in blocks of at least this many courses, so the
+# handful of courses with rare high weights do not multiply the intersections
+BLOCK_COURSES = 128
+
+
+def normalize_code(code: str) -> str:
+    """"cs 106a" and "CS106A" are the same course"""
+    return "".join((code or "").split()).upper()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOP_WORDS]
+
+
+def _course_weights(course: Course) -> Dict[str, int]:
+    weights: Counter = Counter()
+    weights[normalize_code(course.code).lower()] += CODE_WEIGHT
+    for token in tokenize(course.title):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(course.description):
+        weights[token] += DESCRIPTION_WEIGHT
+    return weights
+
+
+def _bit_positions(bits: int) -> List[int]:
+    """Indices of the set bits, found with str.find on the binary form (much faster than shifting a big int)"""
+    binary = bin(bits)
+    last = len(binary) - 1
+    positions = []
+    index = binary.find("1", 2)
+    while index != -1:
+        positions.append(last - index)
+        index = binary.find("1", index + 1)
+    return positions
+
+
+class _TrieNode:
+    __slots__ = ("children", "value", "has_value", "count")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        # Keys in this subtree
+        self.count = 0
+        self.value = None
+        self.has_value = False
+
+
+class PrefixTrie:
+    """Maps string keys to values and lists the keys under a prefix lazily, in lexicographic order"""
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._size = 0
+
+    def insert(self, key: str, value) -> None:
+        path = [self._root]
+        for char in key:
+            path.append(path[-1].children.setdefault(char, _TrieNode()))
+        node = path[-1]
+        if not node.has_value:
+            self._size += 1
+            for ancestor in path:
+                ancestor.count += 1
+        node.value = value
+        node.has_value = True
+
+    def remove(self, key: str) -> bool:
+        path = [self._root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+        if not path[-1].has_value:
+            return False
+        path[-1].has_value = False
+        path[-1].value = None
+        self._size -= 1
+        for ancestor in path:
+            ancestor.count -= 1
+        # Pruning the branch that now leads nowhere
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.count:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+        return True
+
+    def count(self, prefix: str = "") -> int:
+        """Number of keys starting with ``prefix``"""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return 0
+        return node.count
+
+    def items(self, prefix: str = "") -> Iterator[Tuple[str, object]]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        pending = [(prefix, node)]
+        while pending:
+            key, node = pending.pop()
+            if node.has_value:
+                yield key, node.value
+            for char in sorted(node.children, reverse=True):
+                pending.append((key + char, node.children[char]))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class SearchHit(NamedTuple):
+    course: Course
+    score: float
+
+
+class SearchResult(NamedTuple):
+    hits: List[SearchHit]
+    has_more: bool
+
+
+class CatalogIndex:
+    """
+    In-memory search index over course code, title, description, GERs and offered quarters.
+
+    Every course gets a slot number. GER and quarter filters are bitsets (Python ints, bit i for
+    slot i) so combining filters is a handful of big-int ANDs. Codes live in a prefix trie that
+    lists them in order. Keywords are bitsets too, one per token and weight: the courses matching
+    every keyword are the AND of the tokens' bitsets, and ranked queries intersect blocks of weight
+    tiers in descending order of their score bound, so they stop once no unread block can reach the
+    current top results. Courses are added, replaced and removed in place; every method is thread-safe.
+
+    Attributes:
+        courses (Iterable[Course]): Initial contents, loaded in bulk.
+    """
+    def __init__(self, courses: Iterable[Course] = ()) -> None:
+        self._lock = threading.RLock()
+        self._courses: List[Optional[Course]] = []
+        self._keys: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._codes = PrefixTrie()
+        self._words = PrefixTrie()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # Token to the bitset of courses holding it, and to one bitset per weight
+        self._token_bits: Dict[str, int] = {}
+        self._tiers: Dict[str, Dict[int, int]] = {}
+        self._ger_bits: Dict[GER, int] = {}
+        self._quarter_bits: Dict[Quarter, int] = {}
+        self._live = 0
+        self.load(courses)
+
+    def load(self, courses: Iterable[Course]) -> None:
+        """Adds (or replaces) many courses"""
+        with self._lock:
+            for course in courses:
+                self._add(course)
+
+    def add(self, course: Course) -> None:
+        """Adds a course, replacing any course with the same code"""
+        with self._lock:
+            self._add(course)
+
+    def remove(self, code: str) -> bool:
+        with self._lock:
+            key = normalize_code(code)
+            if key not in self._slots:
+                return False
+            self._remove(key)
+            return True
+
+    def get(self, code: str) -> Optional[Course]:
+        with self._lock:
+            slot = self._slots.get(normalize_code(code))
+            return None if slot is None else self._courses[slot]
+
+    def __contains__(self, code: str) -> bool:
+        return normalize_code(code) in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _add(self, course: Course) -> None:
+        key = normalize_code(course.code)
+        if key in self._slots:
+            self._remove(key)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._courses)
+            self._courses.append(None)
+            self._keys.append(None)
+        self._courses[slot] = course
+        self._keys[slot] = key
+        self._slots[key] = slot
+        self._codes.insert(key, slot)
+
+        bit = 1 << slot
+        self._live |= bit
+        for ger in set(course.ug_reqs or []):
+            self._ger_bits[ger] = self._ger_bits.get(ger, 0) | bit
+        for quarter in set(course.offered_quarters):
+            self._quarter_bits[quarter] = self._quarter_bits.get(quarter, 0) | bit
+
+        for token, weight in _course_weights(course).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._token_bits[token] = 0
+                self._tiers[token] = {}
+                self._words.insert(token, None)
+            postings[slot] = weight
+            self._token_bits[token] |= bit
+            tiers = self._tiers[token]
+            tiers[weight] = tiers.get(weight, 0) | bit
+
+    def _remove(self, key: str) -> None:
+        slot = self._slots.pop(key)
+        course = self._courses[slot]
+        self._courses[slot] = None
+        self._keys[slot] = None
+        self._codes.remove(key)
+
+        mask = ~(1 << slot)
+        self._live &= mask
+        for ger in set(course.ug_reqs or []):
+            self._ger_bits[ger] &= mask
+        for quarter in set(course.offered_quarters):
+            self._quarter_bits[quarter] &= mask
+
+        for token, weight in _course_weights(course).items():
+            postings = self._postings[token]
+            del postings[slot]
+            self._token_bits[token] &= mask
+            tiers = self._tiers[token]
+            tiers[weight] &= mask
+            if not tiers[weight]:
+                del tiers[weight]
+            if not postings:
+                del self._postings[token]
+                del self._token_bits[token]
+                del self._tiers[token]
+                self._words.remove(token)
+        self._free.append(slot)
+
+    def search(
+        self,
+        query: str = "",
+        code_prefix: str = "",
+        gers: Sequence[GER] = (),
+        quarters: Sequence[Quarter] = (),
+        limit: int = 20,
+        offset: int = 0
+    ) -> SearchResult:
+        """
+        Courses matching every keyword of ``query`` (the last one may be partially typed), whose code
+        starts with ``code_prefix``, that carry every GER in ``gers`` and are offered in any of
+        ``quarters``. Keyword searches are ranked by weighted term frequency times inverse document
+        frequency; otherwise results are ordered by code.
+        """
+        prefix = normalize_code(code_prefix)
+        terms = tokenize(query)
+        # A query that does not end in a separator is still being typed
+        partial = bool(terms) and query[-1:].isalnum()
+        wanted = offset + limit + 1
+
+        with self._lock:
+            bits = self._live
+            for ger in gers:
+                bits &= self._ger_bits.get(ger, 0)
+            if quarters:
+                offered = 0
+                for quarter in quarters:
+                    offered |= self._quarter_bits.get(quarter, 0)
+                bits &= offered
+            filtered = bool(gers or quarters)
+
+            if terms:
+                ranked = self._ranked(terms, partial, bits if filtered else None, prefix, wanted)
+            else:
+                ranked = [(slot, 0.0) for slot in self._ordered(bits, prefix, wanted)]
+            hits = [SearchHit(self._courses[slot], score) for slot, score in ranked]
+
+        return SearchResult(hits[offset:offset + limit], len(hits) > offset + limit)
+
+    def _acceptor(self, bits: Optional[int], prefix: str) -> Callable[[int], bool]:
+        keys = self._keys
+        if bits is None and not prefix:
+            return lambda slot: True
+        if bits is None:
+            return lambda slot: keys[slot].startswith(prefix)
+        # Byte lookups are O(1), unlike shifting a 20k-bit int for every candidate
+        mask = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        size = len(mask)
+        return lambda slot: (slot >> 3) < size and mask[slot >> 3] >> (slot & 7) & 1 and keys[slot].startswith(prefix)
+
+    def _ordered(self, bits: int, prefix: str, wanted: int) -> List[int]:
+        """The first ``wanted`` slots in ``bits`` under ``prefix``, by code"""
+        if bits.bit_count() <= SPARSE_MATCHES:
+            keys = self._keys
+            matches = sorted((keys[slot], slot) for slot in _bit_positions(bits) if keys[slot].startswith(prefix))
+            return [slot for _, slot in matches[:wanted]]
+        # Dense filters: walking the trie in order finds enough matches almost immediately
+        accept = self._acceptor(bits, prefix)
+        slots = []
+        for _, slot in self._codes.items(prefix):
+            if accept(slot):
+                slots.append(slot)
+                if len(slots) == wanted:
+                    break
+        return slots
+
+    def _groups(self, terms: List[str], partial: bool) -> Optional[List[List[str]]]:
+        """Vocabulary words each term matches, None when some term matches nothing"""
+        groups = [[term] if term in self._postings else [] for term in terms]
+        if partial:
+            last = terms[-1]
+            expansions = (word for word, _ in self._words.items(last) if word != last)
+            groups[-1] += itertools.islice(expansions, MAX_EXPANSIONS - len(groups[-1]))
+        return groups if all(groups) else None
+
+    def _candidates(self, bits: Optional[int], prefix: str) -> Optional[List[int]]:
+        """Every slot passing the filters and the prefix when there are few enough to score one by one"""
+        if bits is not None and bits.bit_count() <= SPARSE_MATCHES:
+            keys = self._keys
+            return [slot for slot in _bit_positions(bits) if keys[slot].startswith(prefix)]
+        if prefix and self._codes.count(prefix) <= SPARSE_MATCHES:
+            accept = self._acceptor(bits, "")
+            return [slot for _, slot in self._codes.items(prefix) if accept(slot)]
+        return None
+
+    def _ranked(self, terms: List[str], partial: bool, bits: Optional[int], prefix: str, wanted: int) -> List[Tuple[int, float]]:
+        groups = self._groups(terms, partial)
+        if groups is None:
+            return []
+        total = len(self._slots)
+        idf = {word: math.log(1 + total / len(self._postings[word])) for group in groups for word in group}
+        weighted = [[(idf[word], self._postings[word]) for word in group] for group in groups]
+
+        def score(slot) -> Optional[float]:
+            total_score = 0.0
+            for group in weighted:
+                best = 0.0
+                for word_idf, postings in group:
+                    weight = postings.get(slot)
+                    if weight is not None and word_idf * weight > best:
+                        best = word_idf * weight
+                if best == 0.0:
+                    return None
+                total_score += best
+            return total_score
+
+        def score_words(slot) -> Optional[float]:
+            # Same as score when no term was expanded, which is most queries
+            total_score = 0.0
+            for (word_idf, postings), in weighted:
+                weight = postings.get(slot)
+                if weight is None:
+                    return None
+                total_score += word_idf * weight
+            return total_score
+
+        if all(len(group) == 1 for group in groups):
+            score = score_words
+
+        top: List[Tuple[float, int]] = []
+
+        def offer(slot) -> None:
+            slot_score = score(slot)
+            if slot_score is None:
+                return
+            if len(top) < wanted:
+                heapq.heappush(top, (slot_score, -slot))
+            elif slot_score > top[0][0]:
+                heapq.heapreplace(top, (slot_score, -slot))
+
+        # Courses holding a word of every group, one big-int AND per group
+        matching = self._live if bits is None else bits
+        for group in groups:
+            union = 0
+            for word in group:
+                union |= self._token_bits[word]
+            matching &= union
+
+        # Few matches: scoring each of them beats walking the tiers until enough turn up
+        candidates = self._candidates(matching, prefix)
+        if candidates is not None:
+            for slot in candidates:
+                offer(slot)
+            return self._sorted_hits(top)
+
+        blocks = [self._blocks(group, idf) for group in groups]
+
+        def combination(position: Tuple[int, ...]) -> Tuple[float, Tuple[int, ...]]:
+            # One block per group; no course in all of them scores above the summed bounds
+            return -sum(group_blocks[index][0] for group_blocks, index in zip(blocks, position)), position
+
+        accept = self._acceptor(None, prefix)
+        seen = 0
+        first = (0,) * len(blocks)
+        pending = [combination(first)]
+        visited = {first}
+        while pending:
+            negative, position = heapq.heappop(pending)
+            # Combinations come out by falling bound, so no unread course can enter the top results
+            if len(top) >= wanted and -negative < top[0][0]:
+                break
+            combined = matching
+            for group_blocks, index in zip(blocks, position):
+                combined &= group_blocks[index][1]
+                if not combined:
+                    break
+            if combined:
+                # Courses of an expanded group sit in a block of every word they hold
+                combined ^= combined & seen
+                seen |= combined
+                for slot in _bit_positions(combined):
+                    if accept(slot):
+                        offer(slot)
+            for i, group_blocks in enumerate(blocks):
+                if position[i] + 1 < len(group_blocks):
+                    following = position[:i] + (position[i] + 1,) + position[i + 1:]
+                    if following not in visited:
+                        visited.add(following)
+                        heapq.heappush(pending, combination(following))
+        return self._sorted_hits(top)
+
+    def _blocks(self, group: List[str], idf: Dict[str, float]) -> List[Tuple[float, int]]:
+        """
+        The weight tiers of the group's words, best score first, merged into blocks of at least
+        BLOCK_COURSES courses, each with the best score a course in it can get from the group.
+        An expanded group merges the single-course tiers of its code words too.
+        """
+        tiers = sorted(
+            ((idf[word] * weight, tier) for word in group for weight, tier in self._tiers[word].items()),
+            key=lambda entry: -entry[0]
+        )
+        blocks = []
+        bits, best = 0, None
+        for tier_score, tier in tiers:
+            if best is None:
+                best = tier_score
+            bits |= tier
+            if bits.bit_count() >= BLOCK_COURSES:
+                blocks.append((best, bits))
+                bits, best = 0, None
+        if bits:
+            blocks.append((best, bits))
+        return blocks
+
+    def _sorted_hits(self, top: List[Tuple[float, int]]) -> List[Tuple[int, float]]:
+        """Best score first, ties by code"""
+        ranked = sorted(top, key=lambda entry: (-entry[0], self._keys[-entry[1]]))
+        return [(-negative_slot, slot_score) for slot_score, negative_slot in ranked]
+
+
+class RefreshingCatalogIndex:
+    """
+    A CatalogIndex built from ``loader`` on first use and rebuilt once it is ``refresh_seconds`` old,
+    which picks up writes made by other workers. Writes made by this process are applied in place
+    with ``update`` (and replayed onto an index that is being rebuilt); readers keep using the
+    current index while a rebuild runs.
+
+    Attributes:
+        loader (Callable[[], Iterable[Course]]): Reads every searchable course.
+        refresh_seconds (float): Age after which the next search rebuilds the index.
+    """
+    def __init__(self, loader: Callable[[], Iterable[Course]], refresh_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._loader = loader
+        self._refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._index: Optional[CatalogIndex] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._pending: Optional[List[Callable[[CatalogIndex], None]]] = None
+
+    def get(self) -> CatalogIndex:
+        index = self._index
+        if index is not None and not self._stale():
+            return index
+        # Only the first build makes readers wait; a refresh already in progress keeps serving the old index
+        if not self._build_lock.acquire(blocking=index is None):
+            return index
+        try:
+            if self._index is not None and not self._stale():
+                return self._index
+            with self._lock:
+                self._pending = []
+            rebuilt = CatalogIndex(self._loader())
+            with self._lock:
+                for change in self._pending:
+                    change(rebuilt)
+                self._pending = None
+                self._index = rebuilt
+                self._built_at = self._clock()
+            return rebuilt
+        finally:
+            self._build_lock.release()
+
+    def update(self, change: Callable[[CatalogIndex], None]) -> None:
+        """Applies a write to the built index, if any; nothing to do before the first search"""
+        with self._lock:
+            if self._index is not None:
+                change(self._index)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def _stale(self) -> bool:
+        return self._clock() - self._built_at >= self._refresh_seconds
@@ -0,0 +1,74 @@
+import threading
+from typing import Any, Callable, Optional
+
+
+def default_client_factory(connection_string: str) -> Any:
+    """Opens a TLS MongoClient against the configured cluster"""
+    # Imported here so that importing the app does not pay for pymongo/certifi
+    from pymongo import MongoClient
+    # certifi included to explicitly point the backend to a trusted CA certificate
+    import certifi
+    return MongoClient(connection_string, tls=True, tlsCAFile=certifi.where())
+
+
+def default_async_client_factory(connection_string: str) -> Any:
+    """Opens a TLS Motor (asyncio) client for the ASGI front-end"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    import certifi
+    return AsyncIOMotorClient(connection_string, tls=True, tlsCAFile=certifi.where())
+
+
+class MongoProvider:
+    """
+    Lazily creates the Mongo client the first time a collection is requested.
+
+    Attributes:
+        connection_string (str): Connection string handed to the client factory.
+        database_name (str): Name of the scheduler database.
+        client_factory (Callable[[str], MongoClient]): Creates the client on first use
+            (``default_async_client_factory`` gives a Motor client with the same interface).
+    """
+    def __init__(
+        self,
+        connection_string: Optional[str],
+        database_name: str,
+        client_factory: Optional[Callable[[str], Any]] = None
+    ) -> None:
+        self._connection_string = connection_string
+        self._database_name = database_name
+        self._client_factory = client_factory or default_client_factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if self._connection_string is None and self._client_factory in (default_client_factory, default_async_client_factory):
+                        raise RuntimeError("No Mongo connection string configured")
+                    self._client = self._client_factory(self._connection_string)
+        return self._client
+
+    @property
+    def db(self) -> Any:
+        return self.client[self._database_name]
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def collection(self, name: str) -> Any:
+        return self.db[name]
+
+    def reset_after_fork(self) -> None:
+        """Forgets any client inherited from the parent process without touching its sockets"""
+        self._client = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Closes the current client; the next access opens a fresh one"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.components.prereq import Prereq
+from classes.constrain.program import Program
+
+# Status of a stored schedule document (see schedule_service.schedule_document)
+VALID = "valid"
+INVALID = "invalid"
+REPAIRING = "repairing"
+INFEASIBLE = "infeasible"
+
+
+class Change(NamedTuple):
+    """
+    A write that may break stored schedules.
+
+    Attributes:
+        kind (str): "course_added" (``course`` became required in ``program``), "prereq_added"
+            (``course`` in ``program`` got a new prerequisite) or "offering_changed" (the catalog
+            entry of ``course`` was replaced, possibly with other quarters).
+        course (str): Course code the write touched.
+        program (Optional[str]): Program id, None for catalog writes.
+    """
+    kind: str
+    course: str
+    program: Optional[str] = None
+
+    def query(self) -> Dict[str, Any]:
+        """Mongo filter for the schedules the change can affect, served by the ``courses`` index"""
+        if self.kind == "course_added":
+            # Every plan of the program that does not have the course yet is missing it
+            return {"programs": self.program, "courses": {"$ne": self.course}}
+        if self.kind == "prereq_added":
+            return {"programs": self.program, "courses": self.course}
+        return {"courses": self.course}
+
+
+def validate_schedule(
+    schedule: Dict[str, Quarter],
+    program: Program,
+    completed: Iterable[str] = (),
+    max_quarter_units: Optional[int] = None,
+    catalog: Iterable[Course] = ()
+) -> List[str]:
+    """
+    Violations of the program's hard constraints by a stored schedule, in one pass over its
+    courses and prerequisite items (no solver call): missing required courses, courses placed
+    in a quarter they are not offered in, prerequisites not taken before, and quarters over the
+    unit cap. Catalog electives in the schedule are checked against ``catalog`` when given.
+    """
+    completed = set(completed)
+    courses = {course.code: course for course in catalog}
+    courses.update({course.code: course for course in program.required_courses})
+    violations = []
+
+    for course in program.required_courses:
+        if course.code not in schedule and course.code not in completed:
+            violations.append(f"{course.code} is not scheduled")
+
+    loads: Dict[Quarter, int] = {}
+    for code, quarter in schedule.items():
+        course = courses.get(code)
+        if course is None:
+            continue
+        if quarter not in course.offered_quarters:
+            violations.append(f"{code} is not offered in {quarter.name}")
+        if not _prereqs_met(course.prereqs, quarter, schedule, completed, courses):
+            violations.append(f"{code} is scheduled before its prerequisites")
+        units = course.units[0] if isinstance(course.units, tuple) else course.units or 0
+        loads[quarter] = loads.get(quarter, 0) + units
+
+    if max_quarter_units is not None:
+        for quarter, load in sorted(loads.items(), key=lambda item: item[0].value):
+            if load > max_quarter_units:
+                violations.append(f"{quarter.name} has {load} units, above the cap of {max_quarter_units}")
+    return violations
+
+
+def _prereqs_met(
+    items: List[Union[str, Prereq]],
+    quarter: Quarter,
+    schedule: Dict[str, Quarter],
+    completed: set,
+    courses: Dict[str, Course],
+    conjunction: bool = True
+) -> bool:
+    # Same meaning as the solver: codes it knows nothing about count as satisfied
+    met = []
+    for item in items:
+        if isinstance(item, Prereq):
+            met.append(_prereqs_met(item.objects, quarter, schedule, completed, courses, item.type == "And"))
+        elif item in completed:
+            met.append(True)
+        elif item in schedule:
+            met.append(schedule[item].value < quarter.value)
+        else:
+            met.append(item not in courses)
+    if not met:
+        return True
+    return all(met) if conjunction else any(met)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Fields ``Change.query`` matches read to revalidate a stored schedule
+AFFECTED_FIELDS = {"profile": 1, "program": 1, "programs": 1, "schedule": 1}
+SCHEDULE_INDEXES = ([("courses", 1)], [("programs", 1), ("courses", 1)], [("status", 1), ("invalidated_at", 1)])
+
+
+def _invalidation(violations: List[str]) -> Dict[str, Any]:
+    return {"$set": {"status": INVALID, "violations": violations, "invalidated_at": _utcnow()}}
+
+
+class RepairQueue:
+    """
+    Stored schedules waiting for repair. The queue is the ``status`` field of the schedule
+    documents themselves, so every worker shares it and it survives restarts. Workers claim a
+    batch with a lease, and a claim whose worker died is taken over once the lease expires.
+
+    Attributes:
+        collection (Collection): The Schedules collection.
+        lease_seconds (float): How long a claimed schedule stays with one worker.
+    """
+    def __init__(self, collection: Any, lease_seconds: float = 60) -> None:
+        self._collection = collection
+        self._lease = timedelta(seconds=lease_seconds)
+        self._indexed = False
+
+    def ensure_indexes(self) -> None:
+        """Multikey indexes behind ``Change.query`` and the queue; creating them again is a no-op"""
+        if self._indexed:
+            return
+        for keys in SCHEDULE_INDEXES:
+            self._collection.create_index(keys)
+        self._indexed = True
+
+    def affected(self, change: Change) -> List[Dict[str, Any]]:
+        self.ensure_indexes()
+        return list(self._collection.find(change.query(), AFFECTED_FIELDS))
+
+    def enqueue(self, document_id: Any, violations: List[str]) -> None:
+        self._collection.update_one({"_id": document_id}, _invalidation(violations))
+
+    def claim(self, batch_size: int) -> List[Dict[str, Any]]:
+        """Up to ``batch_size`` queued schedules, oldest first, leased to the caller"""
+        self.ensure_indexes()
+        claimed = []
+        while len(claimed) < batch_size:
+            now = _utcnow()
+            document = self._collection.find_one_and_update(
+                {"$or": [{"status": INVALID}, {"status": REPAIRING, "lease_until": {"$lt": now}}]},
+                {"$set": {"status": REPAIRING, "lease_until": now + self._lease}},
+                sort=[("invalidated_at", 1)]
+            )
+            if document is None:
+                break
+            claimed.append(document)
+        return claimed
+
+    def give_up(self, document_id: Any) -> None:
+        """No schedule satisfies the program any more; the student has to change something first"""
+        self._collection.update_one({"_id": document_id}, {"$set": {"status": INFEASIBLE}, "$unset": {"lease_until": ""}})
+
+    def release(self, document_id: Any) -> None:
+        """Back in the queue, e.g. after the repair ran out of time"""
+        self._collection.update_one({"_id": document_id}, {"$set": {"status": INVALID}, "$unset": {"lease_until": ""}})
+
+    def pending(self) -> int:
+        return self._collection.count_documents({"status": {"$in": [INVALID, REPAIRING]}})
+
+
+class AsyncRepairQueue:
+    """
+    The write side of RepairQueue over a Motor collection, for the ASGI front-end: it finds and
+    queues broken schedules, and the Flask workers' ``/process-repair-queue`` repairs them.
+
+    Attributes:
+        collection (AsyncIOMotorCollection): The Schedules collection.
+    """
+    def __init__(self, collection: Any) -> None:
+        self._collection = collection
+        self._indexed = False
+
+    async def ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        for keys in SCHEDULE_INDEXES:
+            await self._collection.create_index(keys)
+        self._indexed = True
+
+    async def affected(self, change: Change) -> List[Dict[str, Any]]:
+        await self.ensure_indexes()
+        return await self._collection.find(change.query(), AFFECTED_FIELDS).to_list(length=None)
+
+    async def enqueue(self, document_id: Any, violations: List[str]) -> None:
+        await self._collection.update_one({"_id": document_id}, _invalidation(violations))
@@ -0,0 +1,140 @@
+import asyncio
+import atexit
+import gc
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+from services.program_cache import ProgramCache
+
+logger = logging.getLogger(__name__)
+
+USAGE_COLLECTION = "ProgramUsage"
+
+
+class ProgramUsage:
+    """
+    Solve counts per program, kept in memory on the request path and added to the usage
+    collection by a background thread every ``flush_interval_s`` seconds, so the master can
+    preload the most used programs without solves ever writing to Mongo.
+
+    Attributes:
+        db (Callable[[], Database]): Returns the database to flush into (resolved at flush time).
+        flush_interval_s (float): Seconds between flushes; counts not yet flushed are lost if the
+            worker dies, which only makes the ranking slightly stale.
+    """
+    def __init__(self, db: Callable[[], Any], flush_interval_s: float = 30) -> None:
+        self._db = db
+        self._flush_interval_s = flush_interval_s
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(self, program_id: str) -> None:
+        """Counts one solve; starts the flusher on first use (in the worker, never the master)"""
+        with self._lock:
+            self._counts[program_id] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="program-usage", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def flush(self) -> int:
+        """Adds the pending counts to the usage collection and returns how many programs were written"""
+        counts = self._take()
+        written = 0
+        try:
+            for program_id, solves in counts.items():
+                self._db()[USAGE_COLLECTION].update_one({"id": program_id}, {"$inc": {"solves": solves}}, upsert=True)
+                written += 1
+        except Exception:
+            self._restore(counts, written)
+        return written
+
+    def _take(self) -> Counter:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def _restore(self, counts: Counter, written: int) -> None:
+        logger.warning("Flushing program usage failed; retrying later", exc_info=True)
+        with self._lock:
+            self._counts.update(dict(list(counts.items())[written:]))
+
+    def reset_after_fork(self) -> None:
+        """Forgets the parent's counts and flusher thread (threads do not survive fork)"""
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._flush_interval_s):
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+
+class AsyncProgramUsage(ProgramUsage):
+    """
+    ProgramUsage for the ASGI front-end: the database is Motor, so ``flush`` is awaited and the
+    periodic flush is ``run``, a task on the event loop, instead of a thread.
+    """
+    def record(self, program_id: str) -> None:
+        with self._lock:
+            self._counts[program_id] += 1
+
+    async def flush(self) -> int:
+        counts = self._take()
+        written = 0
+        try:
+            for program_id, solves in counts.items():
+                await self._db()[USAGE_COLLECTION].update_one({"id": program_id}, {"$inc": {"solves": solves}}, upsert=True)
+                written += 1
+        except Exception:
+            self._restore(counts, written)
+        return written
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_s)
+            await self.flush()
+
+
+def most_used_programs(db: Any, top_n: int) -> List[str]:
+    if top_n <= 0:
+        return []
+    cursor = db[USAGE_COLLECTION].find({}, {"id": 1}).sort("solves", -1).limit(top_n)
+    return [doc["id"] for doc in cursor]
+
+
+def preload_programs(db: Any, cache: ProgramCache, program_ids: List[str], top_n: int = 0) -> List[str]:
+    """
+    Deserializes and indexes programs into ``cache`` in the gunicorn master.
+
+    Only pure-Python objects are built here: no z3 context is created, because z3 state
+    must not be shared across fork. Returns the ids that were loaded.
+    """
+    wanted = list(dict.fromkeys(list(program_ids) + most_used_programs(db, top_n)))
+    loaded = []
+    for program_dict in db["Programs"].find({"id": {"$in": wanted}}):
+        cache.put(program_dict["id"], program_dict)
+        loaded.append(program_dict["id"])
+    missing = set(wanted) - set(loaded)
+    if missing:
+        logger.warning("Preload skipped unknown programs: %s", sorted(missing))
+    return loaded
+
+
+def freeze_shared_state() -> None:
+    """
+    Moves everything allocated so far into the permanent GC generation so the collector in
+    forked workers never writes to (and therefore never copies) the preloaded pages.
+    """
+    gc.collect()
+    gc.freeze()
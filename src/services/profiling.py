@@ -0,0 +1,350 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# A request is profiled when it carries the configured token in the header or the query parameter;
+# the mode header/parameter picks the profiler ("sample" unless given)
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "_profile"
+PROFILE_MODE_HEADER = "X-Profile-Mode"
+PROFILE_MODE_PARAM = "_profile_mode"
+PROFILE_OUTPUT_HEADER = "X-Profile-Output"
+PROFILE_MODES = ("sample", "cprofile")
+
+# Where the time went, decided by the innermost Python frame of a sample (or, under cProfile, the
+# function a call's own time belongs to). ctypes calls add no frame, so time inside libz3 lands on
+# the z3core wrapper that called it:
+#   z3_check  Z3 searching (the solver and optimizer check calls)
+#   z3_api    other Z3 calls: building terms, simplifying, parsing SMT-LIB2, reading models
+#   encoding  Python in classes/ (SolverConfig, presolve, MaxSAT) between Z3 calls
+#   wait      blocked on a lock or a future, e.g. a request thread waiting for a solver thread
+#   other     everything else (Flask, Mongo, JSON)
+# Totals are summed over threads, so a request waiting on its solver thread counts both. The
+# sampler needs the GIL to take a sample, so samples favour Z3 calls (which release it) over pure
+# Python; cProfile counts Python exactly but slows it down. Compare categories within one mode.
+CATEGORIES = ("z3_check", "z3_api", "encoding", "wait", "other")
+Z3_CHECK_FUNCTIONS = frozenset({"Z3_solver_check", "Z3_solver_check_assumptions", "Z3_optimize_check"})
+
+_Z3_DIR = os.sep + "z3" + os.sep
+_CLASSES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "classes") + os.sep
+_SRC_DIR = os.path.dirname(_CLASSES_DIR.rstrip(os.sep)) + os.sep
+
+_active: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+def classify(filename: str, function: str) -> str:
+    """The category (see ``CATEGORIES``) of time spent in ``function`` of ``filename``"""
+    if _Z3_DIR in filename:
+        return "z3_check" if function in Z3_CHECK_FUNCTIONS else "z3_api"
+    if filename.startswith(_CLASSES_DIR):
+        return "encoding"
+    if (filename == "~" and "acquire" in function) or (filename.endswith("threading.py") and function == "wait"):
+        return "wait"
+    return "other"
+
+
+def follow(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    ``fn`` wrapped so the thread that runs it is profiled with the current request, or ``fn`` itself
+    when the request is not profiled (see ``SolverPool.submit``)
+    """
+    session = _active.get()
+    if session is None:
+        return fn
+
+    def profiled(*args: Any, **kwargs: Any) -> Any:
+        with session.attach():
+            return fn(*args, **kwargs)
+    return profiled
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_SRC_DIR):
+        filename = filename[len(_SRC_DIR):]
+    elif _Z3_DIR in filename:
+        filename = "z3/" + os.path.basename(filename)
+    else:
+        filename = os.path.basename(filename)
+    # Collapsed-stack lines separate frames with ";" and the count with the last space
+    return f"{filename}:{code.co_name}".replace(";", ",").replace(" ", "_")
+
+
+class _Sampler:
+    """Samples the stacks of the attached threads every ``interval`` seconds from a daemon thread"""
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._threads: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._ticks = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def add(self, ident: int, name: str) -> None:
+        with self._lock:
+            self._threads[ident] = name
+
+    def remove(self, ident: int) -> None:
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._elapsed = time.perf_counter() - self._start
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self._threads.items())
+            for ident, name in threads:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[(name, tuple(reversed(stack)))] += 1
+            self._ticks += 1
+
+    def collapsed(self) -> List[str]:
+        """``thread;outer;...;inner count`` lines for flamegraph.pl, speedscope or inferno"""
+        lines: Counter = Counter()
+        for (name, stack), count in self._stacks.items():
+            lines[";".join([name] + [_frame_label(code) for code in stack])] += count
+        return [f"{line} {count}" for line, count in sorted(lines.items())]
+
+    def attribution(self) -> Tuple[Dict[str, float], int]:
+        """Milliseconds per category (samples times the measured tick length) and the sample count"""
+        tick_ms = self._elapsed * 1000 / self._ticks if self._ticks else 0.0
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        samples = 0
+        for (_, stack), count in self._stacks.items():
+            totals[classify(stack[-1].co_filename, stack[-1].co_name)] += count * tick_ms
+            samples += count
+        return totals, samples
+
+
+class ProfileSession:
+    """
+    One profiled request: the request thread plus every solver thread it hands work to.
+
+    Attributes:
+        mode (str): "sample" (collapsed stacks) or "cprofile" (pstats).
+    """
+    def __init__(self, mode: str, sample_interval: float) -> None:
+        self._mode = mode
+        self._sample_interval = sample_interval
+        self._sampler: Optional[_Sampler] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._token = None
+        self._stopped = False
+        self._start = time.perf_counter()
+        self._elapsed = 0.0
+
+    def start(self) -> None:
+        if self._mode == "cprofile":
+            try:
+                self._enable_profile()
+            except ValueError:
+                # Another cProfile is active process-wide (Python 3.12+); sampling still works
+                self._mode = "sample"
+        if self._mode == "sample":
+            self._sampler = _Sampler(self._sample_interval)
+            self._sampler.add(threading.get_ident(), "request")
+            self._sampler.start()
+        self._token = _active.set(self)
+
+    @contextmanager
+    def attach(self) -> Iterator[None]:
+        """Profiles the current (solver) thread for the duration of the block"""
+        ident = threading.get_ident()
+        profile = None
+        if self._sampler is not None:
+            self._sampler.add(ident, threading.current_thread().name)
+        else:
+            try:
+                profile = self._enable_profile()
+            except ValueError:
+                # Python 3.12+ profiles every thread with the request's profiler already
+                pass
+        try:
+            yield
+        finally:
+            if self._sampler is not None:
+                self._sampler.remove(ident)
+            if profile is not None:
+                profile.disable()
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        self._elapsed = time.perf_counter() - self._start
+        if self._sampler is not None:
+            self._sampler.stop()
+        elif self._profiles:
+            self._profiles[0].disable()
+        if self._token is not None:
+            try:
+                _active.reset(self._token)
+            except ValueError:
+                _active.set(None)
+
+    def _enable_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.enable()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """The request thread's and solver threads' profiles merged, None in sample mode"""
+        if not self._profiles:
+            return None
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def attribution(self) -> Tuple[Dict[str, float], Optional[int]]:
+        """Milliseconds per category, and the sample count in sample mode"""
+        if self._sampler is not None:
+            return self._sampler.attribution()
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        stats = self.stats()
+        if stats is not None:
+            for (filename, _, function), (_, _, own_time, _, _) in stats.stats.items():
+                totals[classify(filename, function)] += own_time * 1000
+        return totals, None
+
+    """Accessors"""
+    @property
+    def mode(self) -> str:
+        return self._mode
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+    @property
+    def sampler(self) -> Optional[_Sampler]:
+        return self._sampler
+
+
+class RequestProfiler:
+    """
+    Profiles single requests on demand and writes the results to ``directory``.
+
+    A request that presents ``token`` gets a ``ProfileSession``; every other request costs one
+    attribute check. Each profile is written as ``<stem>.folded`` (collapsed stacks, sample mode)
+    or ``<stem>.pstats`` (cProfile mode), next to ``<stem>.json`` with the endpoint, the
+    Server-Timing phases and the time per category (Z3 search, other Z3 calls, Python encoding,
+    waiting, other). Oldest files are deleted once the directory holds more than ``max_bytes``.
+
+    Attributes:
+        directory (str): Where profiles are written (created on first profile).
+        token (str | None): Secret that turns profiling on for a request; None disables profiling.
+        max_bytes (int): Size cap of the directory.
+        sample_interval_ms (float): Time between stack samples in sample mode.
+    """
+    def __init__(self, directory: str, token: Optional[str], max_bytes: int = 50 * 1024 * 1024, sample_interval_ms: float = 5) -> None:
+        self._directory = directory
+        self._token = token
+        self._max_bytes = max_bytes
+        self._sample_interval_ms = sample_interval_ms
+        self._lock = threading.Lock()
+
+    def requested(self, token: Optional[str]) -> bool:
+        """Whether ``token`` (from the header or the parameter) asks for a profile"""
+        if self._token is None or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self._token.encode())
+
+    def start(self, mode: str = "sample") -> ProfileSession:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+        session = ProfileSession(mode, self._sample_interval_ms / 1000)
+        session.start()
+        return session
+
+    def finish(self, session: ProfileSession, label: str, details: Optional[Dict[str, Any]] = None) -> str:
+        """Stops ``session``, writes its files and returns their common stem"""
+        session.stop()
+        attribution, samples = session.attribution()
+        stem = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{label}-{uuid.uuid4().hex[:8]}"
+        record = {
+            "label": label,
+            "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "mode": session.mode,
+            "elapsed_ms": session.elapsed * 1000,
+            "attribution_ms": attribution,
+            **({"samples": samples} if samples is not None else {}),
+            **(details or {}),
+        }
+
+        with self._lock:
+            os.makedirs(self._directory, exist_ok=True)
+            if session.sampler is not None:
+                record["profile"] = f"{stem}.folded"
+                with open(os.path.join(self._directory, record["profile"]), "w") as file:
+                    file.write("\n".join(session.sampler.collapsed()) + "\n")
+            else:
+                record["profile"] = f"{stem}.pstats"
+                stats = session.stats()
+                if stats is not None:
+                    stats.dump_stats(os.path.join(self._directory, record["profile"]))
+            with open(os.path.join(self._directory, f"{stem}.json"), "w") as file:
+                json.dump(record, file, indent=2, default=str)
+            self._rotate(stem)
+        return stem
+
+    def profiles(self) -> List[str]:
+        """Paths of the written files, oldest first"""
+        if not os.path.isdir(self._directory):
+            return []
+        paths = [os.path.join(self._directory, name) for name in os.listdir(self._directory)]
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def _rotate(self, keep: str) -> None:
+        # Keeps the profile just written even if it alone exceeds the cap
+        paths = self.profiles()
+        sizes = {path: os.path.getsize(path) for path in paths}
+        total = sum(sizes.values())
+        for path in paths:
+            if total <= self._max_bytes:
+                break
+            if os.path.basename(path).startswith(keep):
+                continue
+            os.remove(path)
+            total -= sizes[path]
+
+
+    """Accessors"""
+    @property
+    def directory(self) -> str:
+        return self._directory
+    @property
+    def enabled(self) -> bool:
+        return self._token is not None
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+    @property
+    def sample_interval_ms(self) -> float:
+        return self._sample_interval_ms
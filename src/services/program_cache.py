@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union
+
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+
+
+class CachedProgram(NamedTuple):
+    """
+    A deserialized program, its shared metadata and the document version it was built from
+    (for merged programs, the versions of every program joined with "+")
+    """
+    program: Program
+    index: ProgramIndex
+    version: Union[int, str]
+
+
+def program_version(program_dict: Dict[str, Any]) -> int:
+    """Programs written before versioning was introduced count as version 0"""
+    return program_dict.get("version", 0) or 0
+
+
+class ProgramCache:
+    """
+    In-process LRU cache of deserialized programs keyed by program id.
+
+    Entries are validated against the ``version`` field of the program document, which every
+    write endpoint increments, so a stale entry is never served even across workers.
+
+    Attributes:
+        max_entries (int): Maximum number of programs kept before the least recently used is evicted.
+    """
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedProgram]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, program_id: str, version: Optional[int] = None) -> Optional[CachedProgram]:
+        """Returns the cached entry if present and (when given) at the requested version"""
+        with self._lock:
+            entry = self._entries.get(program_id)
+            if entry is None or (version is not None and entry.version != version):
+                return None
+            self._entries.move_to_end(program_id)
+            return entry
+
+    def put(self, program_id: str, program_dict: Dict[str, Any]) -> CachedProgram:
+        """Deserializes and indexes a program document and stores the result"""
+        return self.put_program(program_id, Program.from_dict(program_dict), program_version(program_dict))
+
+    def put_program(self, program_id: str, program: Program, version: Union[int, str]) -> CachedProgram:
+        """Indexes and stores an already built program (e.g. several programs merged into one)"""
+        entry = CachedProgram(program, ProgramIndex(program), version)
+        with self._lock:
+            self._entries[program_id] = entry
+            self._entries.move_to_end(program_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_load(self, program_id: str, version: Optional[int], loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[CachedProgram]:
+        """Returns the cached entry or loads the full document with ``loader`` and caches it"""
+        entry = self.get(program_id, version)
+        if entry is not None:
+            return entry
+        program_dict = loader()
+        if program_dict is None:
+            return None
+        return self.put(program_id, program_dict)
+
+    def invalidate(self, program_id: str) -> None:
+        with self._lock:
+            self._entries.pop(program_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, program_id: str) -> bool:
+        with self._lock:
+            return program_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
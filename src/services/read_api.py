@@ -0,0 +1,148 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Shared by the read endpoints (/get-program, /get-programs, /get-program-courses, /get-profile,
+# /get-profiles): cursors, field projections, entity tags, gzip and the cache of encoded bodies
+
+# Top-level fields a read may project, per document kind
+PROGRAM_FIELDS = ("id", "version", "required_courses", "pools")
+PROFILE_FIELDS = (
+    "id", "version", "max_quarter_units", "min_quarter_units", "completed_courses", "current_quarter",
+    "ger_minimums", "preferences"
+)
+COURSE_FIELDS = (
+    "code", "title", "units", "description", "prereqs", "coreqs", "offered_quarters", "instructors",
+    "median_hrs", "median_grade", "percent_A_A_plus", "ug_reqs", "grading"
+)
+
+# Bodies smaller than this are sent uncompressed; gzip would barely shrink them
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Opaque, URL-safe token for the position after the last item of a page"""
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Dict[str, Any]:
+    """The position encoded by ``encode_cursor``, {} for the first page"""
+    if not token:
+        return {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Fields listed in a ``fields=a,b`` parameter, in the order of ``allowed``, None when the
+    parameter is absent (every field)
+    """
+    if value is None:
+        return None
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = sorted(fields - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [field for field in allowed if field in fields]
+
+
+def mongo_projection(fields: Optional[List[str]], always: Sequence[str] = ("id",)) -> Dict[str, Any]:
+    """Mongo projection of ``fields`` (plus ``always``), never the ObjectId"""
+    if fields is None:
+        return {"_id": 0}
+    return {"_id": 0, **{field: 1 for field in list(always) + fields}}
+
+
+def project(document: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+def entity_tag(kind: str, document_id: str, version: Any, *variant: Any) -> str:
+    """
+    Strong ETag of one representation of a document: its version plus everything else that
+    shapes the body (projection, page, content coding), so equal tags mean identical bytes
+    """
+    digest = hashlib.sha1(json.dumps([kind, document_id, *variant], default=str).encode()).hexdigest()[:16]
+    return f'"{kind}-v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (``gzip;q=0`` refuses it)"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def encode_body(body: bytes, gzipped: bool) -> Tuple[bytes, Optional[str]]:
+    """The body and its Content-Encoding (None when sent as is)"""
+    if gzipped and len(body) >= GZIP_MIN_BYTES:
+        return gzip.compress(body, GZIP_LEVEL), "gzip"
+    return body, None
+
+
+class EncodedBodyCache:
+    """
+    LRU of serialized (and possibly gzipped) response bodies keyed by their strong ETag. A tag
+    names the document version, so an entry never goes stale; a new version simply gets a new tag.
+
+    Attributes:
+        max_entries (int): Bodies kept before the least recently used is evicted.
+        max_bytes (int): Bodies larger than this are not cached.
+    """
+    def __init__(self, max_entries: int = 512, max_bytes: int = 1 << 20) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, body: bytes, encoding: Optional[str]) -> None:
+        if len(body) > self._max_bytes:
+            return
+        with self._lock:
+            self._entries[etag] = (body, encoding)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,131 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from services.impact import VALID
+from services.program_cache import ProgramCache
+
+# Shared by the Flask (controller.py) and ASGI (asgi.py) front-ends so both return identical payloads
+
+NO_SCHEDULE_FOUND = {"schedule": "No schedule found"}
+
+# Catalog of courses outside any program, which solves draw GER electives from
+CATALOG_COLLECTION = "Courses"
+
+# Last schedule solved for each (profile, program) pair, which /repair-user-schedule starts from
+SCHEDULE_COLLECTION = "Schedules"
+
+# Per-process cache used when solves run in a worker process (see solve_documents)
+_process_program_cache = ProgramCache(max_entries=64)
+
+
+def format_schedule(schedule: Optional[Dict[str, Quarter]], program: Program, catalog: Optional[List[Course]] = None) -> Dict[str, Any]:
+    """
+    Groups a solved schedule into the response payload, one "CODE: Title" string per course
+    (electives taken from ``catalog`` included)
+    """
+    if not schedule:
+        return NO_SCHEDULE_FOUND
+
+    # Master schedule dictionary
+    schedule_dict = {Quarter.FRESH_FALL: [], Quarter.FRESH_WINTER: [], Quarter.FRESH_SPRING: [],
+                     Quarter.SOPH_FALL: [], Quarter.SOPH_WINTER: [], Quarter.SOPH_SPRING: [],
+                     Quarter.JUNIOR_FALL: [], Quarter.JUNIOR_WINTER: [], Quarter.JUNIOR_SPRING: [],
+                     Quarter.SENIOR_FALL: [], Quarter.SENIOR_WINTER: [], Quarter.SENIOR_SPRING: []}
+
+    titles = {course.code: course.title for course in catalog or []}
+    titles.update({course.code: course.title for course in program.required_courses})
+    for course_code, quarter in schedule.items():
+        schedule_string = f"{course_code}: {titles[course_code]}"
+        # Summer quarters only appear in the response when something is scheduled in them
+        schedule_dict.setdefault(quarter, []).append(schedule_string)
+
+    # Converting schedule to JSON serializable format
+    return {"schedule": {quarter.name: courses for quarter, courses in schedule_dict.items()}}
+
+
+def schedule_to_names(schedule: Optional[Dict[str, Quarter]]) -> Optional[Dict[str, str]]:
+    """Stores a schedule as course code to quarter name (e.g. in Mongo)"""
+    return None if schedule is None else {code: quarter.name for code, quarter in schedule.items()}
+
+
+def schedule_from_names(names: Optional[Dict[str, str]]) -> Optional[Dict[str, Quarter]]:
+    return None if names is None else {code: Quarter[name] for code, name in names.items()}
+
+
+def schedule_document(profile_id: str, program_ids: List[str], program_version: Any, schedule: Dict[str, Quarter]) -> Dict[str, Any]:
+    """
+    The stored form of a student's schedule, one document per profile and program (ids joined
+    with "+"). ``programs`` and ``courses`` are indexed so edits can find the plans they affect
+    (see services.impact)
+    """
+    return {
+        "profile": profile_id,
+        "program": "+".join(program_ids),
+        "programs": list(program_ids),
+        "program_version": program_version,
+        "schedule": schedule_to_names(schedule),
+        "courses": sorted(schedule),
+        "status": VALID,
+        "updated_at": time.time()
+    }
+
+
+def schedule_diff(previous: Dict[str, Quarter], schedule: Dict[str, Quarter], completed: List[str] = ()) -> Dict[str, Any]:
+    """
+    What changed between two schedules: courses kept in place, moved (from and to quarter names),
+    added, removed, and completed (in the transcript since the previous schedule)
+    """
+    completed = set(completed)
+    return {
+        "kept": sorted(code for code, quarter in previous.items() if schedule.get(code) == quarter),
+        "moved": {
+            code: {"from": quarter.name, "to": schedule[code].name}
+            for code, quarter in sorted(previous.items()) if code in schedule and schedule[code] != quarter
+        },
+        "added": {code: quarter.name for code, quarter in sorted(schedule.items()) if code not in previous},
+        "removed": {code: quarter.name for code, quarter in sorted(previous.items()) if code not in schedule and code not in completed},
+        "completed": sorted(code for code in previous if code not in schedule and code in completed)
+    }
+
+
+def invalid_offered_quarter(course: Dict[str, Any]) -> Optional[str]:
+    """Returns the first offered quarter string that is not a Quarter member, if any"""
+    for quarter_string in course.get('offered_quarters', []):
+        if quarter_string not in Quarter.__members__:
+            return quarter_string
+    return None
+
+
+def catalog_query(profile: Profile) -> Optional[Dict[str, Any]]:
+    """Mongo filter for the catalog courses that can cover the profile's GER minimums, None if it has none"""
+    if not profile.ger_minimums:
+        return None
+    return {"ug_reqs": {"$in": [ger.name for ger in profile.ger_minimums]}}
+
+
+def solve_documents(
+    program_dict: Dict[str, Any],
+    profile_dict: Dict[str, Any],
+    catalog_dicts: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Solves straight from the Mongo documents (and catalog course documents, see ``catalog_query``)
+    and returns the response payload.
+
+    Takes and returns plain dicts so it can run in a ProcessPoolExecutor worker; programs are
+    cached per worker process by id and version.
+    """
+    from services.solver_pool import solve_schedule
+
+    cached = _process_program_cache.get_or_load(
+        program_dict.get("id"),
+        program_dict.get("version", 0) or 0,
+        lambda: program_dict
+    )
+    catalog = [Course.from_dict(course_dict) for course_dict in catalog_dicts or []]
+    schedule = solve_schedule(cached.program, Profile.from_dict(profile_dict), cached.index, catalog=catalog)
+    return format_schedule(schedule, cached.program, catalog)
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Environment variables that override values read from appsettings.json
+ENV_SETTINGS_FILE = "SCHEDULER_SETTINGS_FILE"
+ENV_CONNECTION_STRING = "SCHEDULER_MONGO_URI"
+ENV_DATABASE_NAME = "SCHEDULER_DB_NAME"
+ENV_WARMUP_PROGRAMS = "SCHEDULER_WARMUP_PROGRAMS"
+ENV_PRELOAD_PROGRAMS = "SCHEDULER_PRELOAD_PROGRAMS"
+ENV_PRELOAD_TOP_N = "SCHEDULER_PRELOAD_TOP_N"
+ENV_SOLVER_MODE = "SCHEDULER_SOLVER_MODE"
+ENV_SOLVER_THREADS = "SCHEDULER_SOLVER_THREADS"
+ENV_SOLVER_PROCESSES = "SCHEDULER_SOLVER_PROCESSES"
+ENV_ADMISSION_MAX_CONCURRENT = "SCHEDULER_ADMISSION_MAX_CONCURRENT"
+ENV_ADMISSION_MAX_QUEUE = "SCHEDULER_ADMISSION_MAX_QUEUE"
+ENV_REQUEST_TIMEOUT_MS = "SCHEDULER_REQUEST_TIMEOUT_MS"
+ENV_SINGLE_FLIGHT = "SCHEDULER_SINGLE_FLIGHT"
+ENV_SLOW_SOLVE_MS = "SCHEDULER_SLOW_SOLVE_MS"
+ENV_SLOW_SOLVE_DIR = "SCHEDULER_SLOW_SOLVE_DIR"
+ENV_ARTIFACT_STORE = "SCHEDULER_ARTIFACT_STORE"
+ENV_ARTIFACT_DIR = "SCHEDULER_ARTIFACT_DIR"
+ENV_PROFILE_TOKEN = "SCHEDULER_PROFILE_TOKEN"
+ENV_PROFILE_DIR = "SCHEDULER_PROFILE_DIR"
+
+DEFAULT_SETTINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "appsettings.json")
+DEFAULT_DATABASE_NAME = "SchedulerDB"
+DEFAULT_SLOW_SOLVE_DIR = os.path.join(tempfile.gettempdir(), "scheduler-slow-solves")
+DEFAULT_ARTIFACT_DIR = os.path.join(tempfile.gettempdir(), "scheduler-artifacts")
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "scheduler-profiles")
+
+
+def load_app_settings(file_path: str = DEFAULT_SETTINGS_FILE) -> Dict[str, Any]:
+    """Reads the JSON settings file, returning an empty dict if it does not exist"""
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r') as file:
+        return json.load(file)
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    """Parses a threshold where "off" (or empty) disables the feature"""
+    if value is None or str(value).strip().lower() in ("", "off", "none"):
+        return None
+    return float(value)
+
+
+def resolve_config(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Builds the Flask config for the scheduler app.
+
+    Precedence (highest first): explicit overrides, environment variables, settings file.
+    Nothing here touches the network; the Mongo client is only created on first use.
+    """
+    overrides = overrides or {}
+    settings_file = overrides.get("SETTINGS_FILE") or os.environ.get(ENV_SETTINGS_FILE) or DEFAULT_SETTINGS_FILE
+    app_settings = load_app_settings(settings_file)
+
+    connection_string = (
+        os.environ.get(ENV_CONNECTION_STRING)
+        or app_settings.get("DatabaseConnection", {}).get("ConnectionString")
+    )
+
+    config = {
+        "SETTINGS_FILE": settings_file,
+        "MONGO_CONNECTION_STRING": connection_string,
+        "MONGO_DATABASE": os.environ.get(ENV_DATABASE_NAME) or app_settings.get("DatabaseName") or DEFAULT_DATABASE_NAME,
+        # Factory returning a MongoClient; tests swap in mongomock here
+        "MONGO_CLIENT_FACTORY": None,
+        # Program ids compiled by the warm-up hook before the worker serves traffic
+        "WARMUP_PROGRAMS": _split_list(os.environ.get(ENV_WARMUP_PROGRAMS)) or app_settings.get("WarmupPrograms", []),
+        "WARMUP_ON_START": False,
+        # Programs deserialized and indexed in the gunicorn master and shared with workers
+        "PRELOAD_PROGRAMS": _split_list(os.environ.get(ENV_PRELOAD_PROGRAMS)) or app_settings.get("PreloadPrograms", []),
+        "PRELOAD_TOP_N": int(os.environ.get(ENV_PRELOAD_TOP_N) or app_settings.get("PreloadTopN", 0)),
+        # Solve counts behind the top-N ranking are kept in memory and written every this many seconds
+        "USAGE_FLUSH_S": float(app_settings.get("UsageFlushSeconds", 30)),
+        # "inline" solves on the request thread, "thread" hands solves to a bounded thread pool
+        "SOLVER_MODE": os.environ.get(ENV_SOLVER_MODE) or app_settings.get("SolverMode", "inline"),
+        "SOLVER_THREADS": int(os.environ.get(ENV_SOLVER_THREADS) or app_settings.get("SolverThreads", os.cpu_count() or 1)),
+        # ASGI front-end: solver process pool size (0 solves on the event loop's thread pool)
+        # and how many solves may be submitted per process before callers wait
+        "SOLVER_PROCESSES": int(os.environ.get(ENV_SOLVER_PROCESSES) or app_settings.get("SolverProcesses", os.cpu_count() or 1)),
+        "SOLVER_PENDING_PER_PROCESS": 2,
+        # Admission control in front of the solver: concurrent solves, bounded wait queue and the
+        # default per-request deadline (clients may shorten it, up to the maximum, per request)
+        "ADMISSION_MAX_CONCURRENT": int(os.environ.get(ENV_ADMISSION_MAX_CONCURRENT) or app_settings.get("AdmissionMaxConcurrent", os.cpu_count() or 1)),
+        "ADMISSION_MAX_QUEUE": int(os.environ.get(ENV_ADMISSION_MAX_QUEUE) or app_settings.get("AdmissionMaxQueue", 4 * (os.cpu_count() or 1))),
+        "REQUEST_TIMEOUT_MS": int(os.environ.get(ENV_REQUEST_TIMEOUT_MS) or app_settings.get("RequestTimeoutMs", 10000)),
+        "MAX_REQUEST_TIMEOUT_MS": 60000,
+        # Coalescing of identical in-flight solves: "local" (threads of one worker), "mongo"
+        # (also across workers through a lease document) or "off"
+        "SINGLE_FLIGHT": os.environ.get(ENV_SINGLE_FLIGHT) or app_settings.get("SingleFlight", "local"),
+        # Solves slower than this are captured (SMT-LIB2 + inputs) for offline replay; "off" disables
+        "SLOW_SOLVE_MS": _optional_float(os.environ.get(ENV_SLOW_SOLVE_MS) or app_settings.get("SlowSolveMs", 5000)),
+        "SLOW_SOLVE_DIR": os.environ.get(ENV_SLOW_SOLVE_DIR) or app_settings.get("SlowSolveDir", DEFAULT_SLOW_SOLVE_DIR),
+        "SLOW_SOLVE_MAX_BYTES": int(app_settings.get("SlowSolveMaxBytes", 100 * 1024 * 1024)),
+        # What-if sessions keep a warm solver per advising session
+        "WHAT_IF_MAX_SESSIONS": int(app_settings.get("WhatIfMaxSessions", 256)),
+        "WHAT_IF_SESSION_TTL_S": float(app_settings.get("WhatIfSessionTtlSeconds", 900)),
+        # Precompiled program constraints keyed by content hash: "disk", "mongo" (shared by all
+        # workers and hosts) or "off" to always encode programs in Python
+        "ARTIFACT_STORE": os.environ.get(ENV_ARTIFACT_STORE) or app_settings.get("ArtifactStore", "disk"),
+        "ARTIFACT_DIR": os.environ.get(ENV_ARTIFACT_DIR) or app_settings.get("ArtifactDir", DEFAULT_ARTIFACT_DIR),
+        # Course search index; writes to this worker update it in place, other workers' writes show
+        # up once it is rebuilt
+        "CATALOG_INDEX_REFRESH_S": float(app_settings.get("CatalogIndexRefreshSeconds", 300)),
+        # Requests carrying this token (X-Profile header or _profile parameter) are profiled on their
+        # own; without a token profiling is off
+        "PROFILE_TOKEN": os.environ.get(ENV_PROFILE_TOKEN) or app_settings.get("ProfileToken"),
+        "PROFILE_DIR": os.environ.get(ENV_PROFILE_DIR) or app_settings.get("ProfileDir", DEFAULT_PROFILE_DIR),
+        "PROFILE_MAX_BYTES": int(app_settings.get("ProfileMaxBytes", 50 * 1024 * 1024)),
+        "PROFILE_SAMPLE_INTERVAL_MS": float(app_settings.get("ProfileSampleIntervalMs", 5)),
+    }
+    config.update(overrides)
+    return config
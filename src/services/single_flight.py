@@ -0,0 +1,168 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from services.metrics import MetricsRegistry
+
+
+class SingleFlightTimeout(Exception):
+    """Raised to a waiting caller when the in-flight call it joined does not finish in time"""
+
+
+def solve_key(program_id: str, program_version: int, profile_dict: Dict[str, Any]) -> str:
+    """
+    Canonical key of a solve: program id and version plus the profile's content (not its Mongo _id),
+    so two requests share a result exactly when they would produce the same model.
+    """
+    profile = {name: value for name, value in profile_dict.items() if name != "_id"}
+    canonical = json.dumps([program_id, program_version, profile], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key across threads of one worker: the first caller
+    runs the function, later callers with the same key block and receive its result (or exception).
+    Nothing is cached once the call completes.
+    """
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        registry = registry or MetricsRegistry()
+        self._coalesced = registry.counter("solve_coalesced_total", "Solve requests that joined an identical in-flight solve")
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._coalesced.inc(scope="thread")
+            if not call.done.wait(timeout):
+                raise SingleFlightTimeout(f"In-flight call {key} did not finish in time")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching what pymongo returns for stored dates
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class MongoLeaseSingleFlight:
+    """
+    Cross-worker coalescing through a lease document per key.
+
+    The worker that inserts the lease runs the call and writes the encoded result into the
+    document; workers that find an existing lease poll it until the result appears. A lease whose
+    holder died (expired without a result) is taken over. Threads inside a worker are coalesced
+    locally first, so each worker polls Mongo at most once per key.
+
+    Attributes:
+        collection (Collection): Lease collection; ``ensure_indexes`` adds a TTL index for cleanup.
+        lease_seconds (float): How long a leader may run before others may take over.
+        result_seconds (float): How long a finished result stays readable by late joiners.
+        poll_interval (float): Seconds between polls while waiting on another worker.
+        encode / decode (Callable): Convert results to and from BSON-storable values.
+    """
+    def __init__(
+        self,
+        collection: Any,
+        lease_seconds: float = 30,
+        result_seconds: float = 5,
+        poll_interval: float = 0.05,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+        registry: Optional[MetricsRegistry] = None
+    ) -> None:
+        self._collection = collection
+        self._lease = timedelta(seconds=lease_seconds)
+        self._result_ttl = timedelta(seconds=result_seconds)
+        self._poll_interval = poll_interval
+        self._encode = encode
+        self._decode = decode
+        self._local = SingleFlight(registry)
+        registry = registry or MetricsRegistry()
+        self._coalesced = registry.counter("solve_coalesced_total", "Solve requests that joined an identical in-flight solve")
+
+    def ensure_indexes(self) -> None:
+        self._collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        return self._local.do(key, lambda: self._do_across_workers(key, fn, timeout), timeout)
+
+    def _try_lease(self, key: str, owner: str) -> bool:
+        from pymongo.errors import DuplicateKeyError
+
+        now = _utcnow()
+        try:
+            self._collection.insert_one({"_id": key, "owner": owner, "done": False, "expires_at": now + self._lease})
+            return True
+        except DuplicateKeyError:
+            pass
+        # Take over a lease whose holder expired without publishing a result
+        taken = self._collection.find_one_and_update(
+            {"_id": key, "done": False, "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + self._lease}}
+        )
+        return taken is not None
+
+    def _lead(self, key: str, owner: str, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException:
+            self._collection.delete_one({"_id": key, "owner": owner})
+            raise
+        self._collection.update_one(
+            {"_id": key, "owner": owner},
+            {"$set": {"done": True, "result": self._encode(result), "expires_at": _utcnow() + self._result_ttl}}
+        )
+        return result
+
+    def _do_across_workers(self, key: str, fn: Callable[[], Any], timeout: Optional[float]) -> Any:
+        owner = uuid.uuid4().hex
+        give_up = None if timeout is None else time.monotonic() + timeout
+        joined = False
+        while True:
+            if self._try_lease(key, owner):
+                return self._lead(key, owner, fn)
+            if not joined:
+                self._coalesced.inc(scope="worker")
+                joined = True
+            document = self._collection.find_one({"_id": key})
+            if document is not None and document.get("done"):
+                return self._decode(document.get("result"))
+            if give_up is not None and time.monotonic() >= give_up:
+                raise SingleFlightTimeout(f"Lease {key} held by another worker did not finish in time")
+            time.sleep(self._poll_interval)
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+CAPTURE_SUFFIX = ".json"
+
+
+class SlowSolveCapture:
+    """
+    Writes solves slower than ``threshold_ms`` to ``directory`` for offline replay
+    (``python -m benchmarks.replay``).
+
+    Each capture is one JSON file with the SMT-LIB2 assertions, the program and profile documents,
+    the catalog courses offered to the solver for GER minimums, the Z3 parameters and statistics
+    and the elapsed time. Oldest captures are deleted once the
+    directory holds more than ``max_bytes``.
+
+    Attributes:
+        directory (str): Where captures are written (created on first capture).
+        threshold_ms (float | None): Solves at least this slow are captured; None disables capturing.
+        max_bytes (int): Size cap of the directory.
+    """
+    def __init__(self, directory: str, threshold_ms: Optional[float], max_bytes: int = 100 * 1024 * 1024) -> None:
+        self._directory = directory
+        self._threshold_ms = threshold_ms
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def should_capture(self, seconds: float) -> bool:
+        return self._threshold_ms is not None and seconds * 1000 >= self._threshold_ms
+
+    def capture(
+        self,
+        config,
+        program_dict: Dict[str, Any],
+        profile_dict: Dict[str, Any],
+        seconds: float,
+        catalog_dicts: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Writes one capture for a checked SolverConfig and returns its path"""
+        record = {
+            "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "elapsed_ms": seconds * 1000,
+            "result": str(config.last_result),
+            "params": config.params,
+            "statistics": config.statistics(),
+            "program": program_dict,
+            "profile": {key: value for key, value in profile_dict.items() if key != "_id"},
+            "catalog": catalog_dicts or [],
+            "smt2": config.to_smt2(),
+        }
+        name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{program_dict.get('id', 'program')}-{uuid.uuid4().hex[:8]}{CAPTURE_SUFFIX}"
+        path = os.path.join(self._directory, name)
+
+        with self._lock:
+            os.makedirs(self._directory, exist_ok=True)
+            with open(path, "w") as file:
+                json.dump(record, file, default=str)
+            self._rotate()
+        return path
+
+    def maybe_capture(
+        self,
+        config,
+        program_dict: Dict[str, Any],
+        profile_dict: Dict[str, Any],
+        seconds: float,
+        catalog_dicts: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        if not self.should_capture(seconds):
+            return None
+        return self.capture(config, program_dict, profile_dict, seconds, catalog_dicts)
+
+    def captures(self) -> List[str]:
+        """Capture paths, oldest first"""
+        if not os.path.isdir(self._directory):
+            return []
+        paths = [os.path.join(self._directory, name) for name in os.listdir(self._directory) if name.endswith(CAPTURE_SUFFIX)]
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def _rotate(self) -> None:
+        # Keeps at least the newest capture even if it alone exceeds the cap
+        paths = self.captures()
+        sizes = {path: os.path.getsize(path) for path in paths}
+        total = sum(sizes.values())
+        for path in paths[:-1]:
+            if total <= self._max_bytes:
+                break
+            os.remove(path)
+            total -= sizes[path]
+
+
+    """Accessors"""
+    @property
+    def directory(self) -> str:
+        return self._directory
+    @property
+    def threshold_ms(self) -> Optional[float]:
+        return self._threshold_ms
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
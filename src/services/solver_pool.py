@@ -0,0 +1,115 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from services.artifact_store import ArtifactStore
+from services.profiling import follow
+from services.timing import RequestTimer, timed
+
+SOLVER_MODES = ("inline", "thread")
+
+
+class SolveTimeout(Exception):
+    """Raised when Z3 gives up (returns unknown) because the solve ran past its time budget"""
+
+
+def solve_schedule(
+    program: Program,
+    profile: Profile,
+    index: Optional[ProgramIndex] = None,
+    timeout_ms: Optional[int] = None,
+    timer: Optional[RequestTimer] = None,
+    observer: Optional[Callable[[Any, float], None]] = None,
+    artifacts: Optional[ArtifactStore] = None,
+    catalog: Optional[List[Course]] = None
+) -> Optional[Dict[str, Quarter]]:
+    """
+    Solves in a fresh Z3 context that is released as soon as the schedule is extracted.
+
+    Encoding, check and model extraction are recorded as separate spans on ``timer``;
+    ``observer`` receives the SolverConfig and the seconds spent encoding and checking, after
+    the check and before the context is released (e.g. to read statistics or capture the SMT-LIB2).
+    With an ``artifacts`` store the program constraints are loaded precompiled when available.
+    ``catalog`` holds the electives the solver may add for the profile's GER minimums.
+    A profile with preferences is solved with ``SolverConfig.optimize`` instead of a single check.
+    """
+    from classes.solver_config import SolverConfig
+    from z3 import sat, unknown
+
+    start = time.perf_counter()
+    with timed(timer, "encode"):
+        if artifacts is not None:
+            config = artifacts.config_for(program, profile, index, catalog)
+        else:
+            config = SolverConfig(program=program, profile=profile, index=index, catalog=catalog)
+    with config:
+        if timeout_ms is not None:
+            config.set_timeout(timeout_ms)
+        if profile is not None and profile.preferences:
+            # Anytime: a schedule found before the deadline is returned even if it is not the best
+            with timed(timer, "check"):
+                preferred = config.optimize(timeout_ms)
+            if observer is not None:
+                observer(config, time.perf_counter() - start)
+            if preferred.schedule is None and not preferred.optimal:
+                raise SolveTimeout(f"Solve did not finish within {timeout_ms} ms")
+            return preferred.schedule
+        with timed(timer, "check"):
+            result = config.check_solvable()
+        if observer is not None:
+            observer(config, time.perf_counter() - start)
+        if result == unknown:
+            raise SolveTimeout(f"Solve did not finish within {timeout_ms} ms")
+        if result != sat:
+            return None
+        with timed(timer, "extract"):
+            return config.extract_schedule()
+
+
+class SolverPool:
+    """
+    Runs solves either inline on the request thread or on a bounded thread pool.
+
+    Every solve owns its own Z3 context, and Z3 releases the GIL while checking, so the
+    thread mode solves in parallel across cores while capping how many solves run at once.
+
+    Attributes:
+        mode (str): "inline" or "thread".
+        max_workers (int): Thread pool size in "thread" mode.
+    """
+    def __init__(self, mode: str = "inline", max_workers: Optional[int] = None) -> None:
+        if mode not in SOLVER_MODES:
+            raise ValueError(f"Unknown solver mode {mode!r}, expected one of {SOLVER_MODES}")
+        self._mode = mode
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solver") if mode == "thread" else None
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self._executor is not None:
+            # A profiled request keeps profiling on the solver thread
+            return self._executor.submit(follow(fn), *args, **kwargs)
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+    @property
+    def max_workers(self) -> Optional[int]:
+        return self._max_workers
@@ -0,0 +1,90 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, Optional
+
+
+class RequestTimer:
+    """
+    Named phase durations of one request, rendered as a ``Server-Timing`` header.
+
+    Spans with the same name accumulate (e.g. several Mongo round trips). Safe to record into
+    from the solver thread while the request thread waits.
+    """
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    @property
+    def spans(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._spans)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def header(self) -> str:
+        """Server-Timing value in milliseconds, e.g. ``mongo;dur=1.20, check;dur=35.10, total;dur=40.02``"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()]
+        parts.append(f"total;dur={self.elapsed * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def timed(timer: Optional[RequestTimer], name: str) -> ContextManager[None]:
+    """``timer.span(name)``, or a no-op when there is no timer (solves outside a request)"""
+    return timer.span(name) if timer is not None else nullcontext()
+
+
+PROGRAM_SIZE_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+COUNT_BUCKETS = (0, 10, 100, 1000, 10000, 100000, 1000000)
+MEMORY_MB_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class RequestMetrics:
+    """
+    Request phase and solver histograms on a MetricsRegistry.
+
+    Attributes:
+        request_seconds (Histogram): End-to-end latency per endpoint, method and status.
+        phase_seconds (Histogram): Time per endpoint and Server-Timing phase.
+        solves (Counter): Solve outcomes (sat, unsat, unknown).
+        program_courses (Histogram): Required courses of each solved program.
+        conflicts, decisions (Histogram): Z3 search statistics per solve.
+        memory_mb (Histogram): Z3 memory use reported after each solve.
+    """
+    def __init__(self, registry) -> None:
+        self.request_seconds = registry.histogram("http_request_duration_seconds", "Request latency by endpoint")
+        self.phase_seconds = registry.histogram("http_request_phase_seconds", "Request time spent per phase (Server-Timing spans)")
+        self.solves = registry.counter("solver_solves_total", "Solves by result")
+        self.program_courses = registry.histogram("solver_program_courses", "Required courses per solved program", PROGRAM_SIZE_BUCKETS)
+        self.conflicts = registry.histogram("solver_conflicts", "Z3 conflicts per solve", COUNT_BUCKETS)
+        self.decisions = registry.histogram("solver_decisions", "Z3 decisions per solve", COUNT_BUCKETS)
+        self.memory_mb = registry.histogram("solver_memory_mb", "Z3 memory (MB) after each solve", MEMORY_MB_BUCKETS)
+
+    def observe_request(self, endpoint: str, method: str, status: int, timer: RequestTimer) -> None:
+        self.request_seconds.observe(timer.elapsed, endpoint=endpoint, method=method, status=status)
+        for phase, seconds in timer.spans.items():
+            self.phase_seconds.observe(seconds, endpoint=endpoint, phase=phase)
+
+    def observe_solve(self, config, seconds: float) -> None:
+        """Solver observer: records the outcome, program size and Z3 statistics of a checked SolverConfig"""
+        stats = config.statistics()
+        self.solves.inc(result=str(config.last_result))
+        self.program_courses.observe(len(config.course_dict))
+        self.conflicts.observe(stats.get("conflicts", 0))
+        self.decisions.observe(stats.get("decisions", 0))
+        self.memory_mb.observe(stats.get("max memory", stats.get("memory", 0)))
@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from services.solver_pool import SolveTimeout
+from services.timing import RequestTimer, timed
+
+
+class SessionClosed(RuntimeError):
+    """The session was evicted while a question was waiting for it; ask again on a new session"""
+
+
+class WhatIfQuestion:
+    """
+    One advisor question against a session's warm solver.
+
+    Attributes:
+        pins (Dict[str, Quarter]): Courses that must be taken in a given quarter.
+        exclusions (Dict[str, List[Quarter]]): Quarters a course must not be taken in.
+        quarters_off (List[Quarter]): Quarters with no courses at all (e.g. summer off).
+        completed (List[str]): Courses assumed already taken; their prerequisite edges count as satisfied.
+    """
+    def __init__(
+        self,
+        pins: Optional[Dict[str, Quarter]] = None,
+        exclusions: Optional[Dict[str, List[Quarter]]] = None,
+        quarters_off: Optional[List[Quarter]] = None,
+        completed: Optional[List[str]] = None
+    ) -> None:
+        self._pins = pins or {}
+        self._exclusions = exclusions or {}
+        self._quarters_off = quarters_off or []
+        self._completed = completed or []
+
+    @classmethod
+    def from_dict(cls, dict) -> 'WhatIfQuestion':
+        """Reads ``pin``, ``exclude``, ``quarters_off`` and ``completed``; raises KeyError on unknown quarter names"""
+        return cls(
+            pins={code: Quarter[name] for code, name in (dict.get("pin") or {}).items()},
+            exclusions={code: [Quarter[name] for name in names] for code, names in (dict.get("exclude") or {}).items()},
+            quarters_off=[Quarter[name] for name in dict.get("quarters_off") or []],
+            completed=list(dict.get("completed") or [])
+        )
+
+
+    """Accessors"""
+    @property
+    def pins(self) -> Dict[str, Quarter]:
+        return self._pins
+    @property
+    def exclusions(self) -> Dict[str, List[Quarter]]:
+        return self._exclusions
+    @property
+    def quarters_off(self) -> List[Quarter]:
+        return self._quarters_off
+    @property
+    def completed(self) -> List[str]:
+        return self._completed
+
+
+class WhatIfSession:
+    """
+    A warm SolverConfig for one advising session.
+
+    The base constraints are asserted once; every question is answered with assumption literals
+    passed to ``check`` so follow-up questions skip encoding entirely. Z3 solvers are not thread
+    safe, so questions on one session are serialized.
+
+    Attributes:
+        program (Program): Program the session was built for.
+        config (SolverConfig): The warm solver, in ``assume_pending`` mode.
+    """
+    def __init__(
+        self,
+        program: Program,
+        profile: Profile,
+        index: Optional[ProgramIndex] = None,
+        catalog: Optional[List[Course]] = None
+    ) -> None:
+        from classes.solver_config import SolverConfig
+
+        self._program = program
+        self._config = SolverConfig(program=program, profile=profile, index=index, assume_pending=True, catalog=catalog)
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._closed = False
+
+    def ask(self, question: WhatIfQuestion, timeout_ms: Optional[int] = None, timer: Optional[RequestTimer] = None) -> Dict[str, Any]:
+        """
+        Returns ``feasible``, the ``schedule`` (course code to Quarter) when feasible and, when not,
+        the ``conflicts``: the parts of the question that cannot hold together.
+        Raises ValueError for courses outside the program, SolveTimeout when the check runs out of
+        time and SessionClosed when the session was evicted meanwhile.
+        """
+        from z3 import sat, unknown
+
+        # Courses on the profile's transcript are not in the model; completing them again is a no-op
+        remaining = self._config.index.courses
+        program_codes = {course.code for course in self._program.required_courses}
+        unknown_codes = [code for code in list(question.pins) + list(question.exclusions) if code not in remaining]
+        unknown_codes += [code for code in question.completed if code not in program_codes]
+        if unknown_codes:
+            raise ValueError(f"Courses not in the remaining program {self._program.id}: {', '.join(unknown_codes)}")
+        completed = {code for code in question.completed if code in remaining}
+
+        with self._lock:
+            if self._closed:
+                raise SessionClosed(f"What-if session for program {self._program.id} was closed")
+            self._last_used = time.monotonic()
+            config = self._config
+            described: Dict[str, str] = {}
+            assumptions = []
+            for code, quarter in question.pins.items():
+                assumptions.append(config.pin_literal(code, quarter))
+                described[str(assumptions[-1])] = f"{code} in {quarter.name}"
+            for code, quarters in question.exclusions.items():
+                for quarter in quarters:
+                    assumptions.append(config.exclude_literal(code, quarter))
+                    described[str(assumptions[-1])] = f"{code} not in {quarter.name}"
+            for quarter in question.quarters_off:
+                assumptions.append(config.quarter_off_literal(quarter))
+                described[str(assumptions[-1])] = f"{quarter.name} off"
+
+            if timeout_ms is not None:
+                config.set_timeout(timeout_ms)
+            with timed(timer, "check"):
+                result = config.check_assumptions(assumptions, completed)
+            if result == unknown:
+                raise SolveTimeout(f"What-if did not finish within {timeout_ms} ms")
+            if result != sat:
+                # Pending literals in the core mean a course still to be taken cannot fit either
+                conflicts = sorted({described.get(str(literal), f"{str(literal).split('!', 1)[-1]} required") for literal in config.unsat_core()})
+                return {"feasible": False, "schedule": None, "conflicts": conflicts}
+            with timed(timer, "extract"):
+                return {"feasible": True, "schedule": config.extract_schedule(), "conflicts": []}
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._config.close()
+
+
+    """Accessors"""
+    @property
+    def program(self) -> Program:
+        return self._program
+    @property
+    def config(self):
+        return self._config
+    @property
+    def last_used(self) -> float:
+        return self._last_used
+
+
+class WhatIfStore:
+    """
+    Bounded LRU of what-if sessions keyed by session id.
+
+    A session is rebuilt when its ``key`` changes (new program version or edited profile) and
+    dropped after ``ttl_seconds`` without questions.
+
+    Attributes:
+        max_sessions (int): Sessions kept before the least recently used is closed.
+        ttl_seconds (float): Idle time after which a session is closed.
+    """
+    def __init__(self, max_sessions: int = 256, ttl_seconds: float = 900) -> None:
+        self._max_sessions = max_sessions
+        self._ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session(self, session_id: str, key: str, factory: Callable[[], WhatIfSession]) -> WhatIfSession:
+        """Returns the live session for ``session_id`` and ``key``, building it with ``factory`` if needed"""
+        with self._lock:
+            expired = self._expire()
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] == key:
+                self._sessions.move_to_end(session_id)
+                session = entry[1]
+                entry = None
+            else:
+                session = None
+        for stale in expired + ([entry[1]] if entry is not None else []):
+            stale.close()
+        if session is not None:
+            return session
+
+        # Encoding happens outside the store lock so other sessions are not held up
+        session = factory()
+        evicted = []
+        with self._lock:
+            self._sessions[session_id] = (key, session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1][1])
+        for stale in evicted:
+            stale.close()
+        return session
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            entry[1].close()
+
+    def _expire(self) -> List[WhatIfSession]:
+        cutoff = time.monotonic() - self._ttl_seconds
+        expired = [session_id for session_id, (_, session) in self._sessions.items() if session.last_used < cutoff]
+        return [self._sessions.pop(session_id)[1] for session_id in expired]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
@@ -0,0 +1,6 @@
+from controller import create_app, preload
+
+# Production entry point: `gunicorn` (see gunicorn.conf.py) imports this module once in the
+# master when preload_app is on, so the preloaded programs are shared by every forked worker.
+app = create_app()
+preload(app)
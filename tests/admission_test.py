@@ -0,0 +1,111 @@
+import threading
+import time
+
+import mongomock
+import pytest
+
+from controller import create_app
+from services.admission import AdmissionController, AdmissionRejected
+from services.metrics import MetricsRegistry
+
+
+def _deadline(seconds: float) -> float:
+    return time.monotonic() + seconds
+
+
+def test_admits_up_to_max_concurrent_without_waiting():
+    admission = AdmissionController(max_concurrent=2, max_queue=0)
+
+    with admission.admit(_deadline(1)) as first_wait, admission.admit(_deadline(1)) as second_wait:
+        assert admission.active == 2
+        assert first_wait == second_wait == 0.0
+    assert admission.active == 0
+
+def test_rejects_when_queue_full():
+    registry = MetricsRegistry()
+    admission = AdmissionController(max_concurrent=1, max_queue=0, registry=registry)
+
+    with admission.admit(_deadline(1)):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with admission.admit(_deadline(1)):
+                pass
+
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+    assert 'solver_admission_rejections_total{reason="queue_full"} 1' in registry.render()
+
+def test_rejects_when_deadline_passes_in_queue():
+    admission = AdmissionController(max_concurrent=1, max_queue=1)
+
+    with admission.admit(_deadline(1)):
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected) as rejected:
+            with admission.admit(_deadline(0.05)):
+                pass
+
+    assert rejected.value.reason == "deadline"
+    assert time.monotonic() - start < 0.5
+    assert admission.queue_depth == 0
+
+def test_rejects_up_front_when_expected_wait_exceeds_deadline():
+    admission = AdmissionController(max_concurrent=1, max_queue=5)
+    with admission.admit(_deadline(1)):
+        time.sleep(0.05)
+    # Smoothed solve time is now ~10ms; pretend solves take 10s
+    admission._avg_solve_seconds = 10.0
+
+    with admission.admit(_deadline(1)):
+        with pytest.raises(AdmissionRejected) as rejected:
+            with admission.admit(_deadline(1)):
+                pass
+
+    assert rejected.value.reason == "would_miss_deadline"
+    assert rejected.value.retry_after >= 10
+
+def test_queued_requests_are_admitted_in_order():
+    admission = AdmissionController(max_concurrent=1, max_queue=3)
+    order = []
+    gate = admission.admit(_deadline(5))
+    gate.__enter__()
+
+    def worker(name):
+        with admission.admit(_deadline(5)):
+            order.append(name)
+
+    threads = []
+    for name in ["a", "b", "c"]:
+        thread = threading.Thread(target=worker, args=(name,))
+        thread.start()
+        threads.append(thread)
+        while admission.queue_depth < len(threads):
+            time.sleep(0.001)
+    gate.__exit__(None, None, None)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["a", "b", "c"]
+    assert admission.active == 0
+
+
+def test_solve_endpoint_returns_503_with_retry_after():
+    mongo_client = mongomock.MongoClient()
+    app = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "ADMISSION_MAX_CONCURRENT": 1,
+        "ADMISSION_MAX_QUEUE": 0
+    })
+    client = app.test_client()
+    client.post('/post-program', json={"id": "CS", "required_courses": [{"code": "C1", "title": "T", "units": 5, "offered_quarters": ["FRESH_FALL"]}]})
+    client.post('/post-profile', json={"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12})
+
+    with app.extensions["scheduler"].admission.admit(_deadline(5)):
+        busy = client.get('/solve-user-schedule?program=CS&profile=STUDENT', headers={"X-Request-Timeout-Ms": "50"})
+    ok = client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+    metrics = client.get('/metrics').get_data(as_text=True)
+
+    assert busy.status_code == 503
+    assert int(busy.headers["Retry-After"]) >= 1
+    assert ok.status_code == 200
+    assert "solver_queue_depth 0" in metrics
+    assert "solver_admission_wait_seconds_count 2" in metrics
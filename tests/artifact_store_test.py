@@ -0,0 +1,111 @@
+import os
+
+import mongomock
+import pytest
+
+from benchmarks.artifact_bench import bench_size
+from benchmarks.generator import generate_profile, generate_program
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+from services.artifact_store import DiskArtifactStore, MongoArtifactStore
+from z3 import sat, unsat
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 5, "offered_quarters": ["FRESH_WINTER"], "prereqs": ["C1"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+
+
+def test_artifact_round_trip_solves_the_same():
+    program = generate_program(40, seed=1)
+    profile = generate_profile(program)
+    artifact = SolverConfig(program, profile).to_artifact()
+
+    loaded = SolverConfig.from_artifact(program, artifact, profile)
+    assert loaded.check_solvable() == sat
+    schedule = loaded.extract_schedule()
+    for course in program.required_courses:
+        assert schedule[course.code] in course.offered_quarters
+        assert all(schedule[prereq].value < schedule[course.code].value for prereq in course.prereqs)
+
+    # The profile part is applied on top of the artifact, so a tighter cap still binds
+    tight = Profile(id="TIGHT", max_quarter_units=1)
+    assert SolverConfig.from_artifact(program, artifact, tight).check_solvable() == unsat
+
+
+def test_from_artifact_rejects_other_programs_and_formats():
+    artifact = SolverConfig(generate_program(10, seed=0)).to_artifact()
+
+    with pytest.raises(ValueError):
+        SolverConfig.from_artifact(generate_program(12, seed=0), artifact)
+    with pytest.raises(ValueError):
+        SolverConfig.from_artifact(generate_program(10, seed=0), dict(artifact, format=-1))
+
+
+def test_disk_store_serves_cold_instances_and_keys_by_content(tmp_path):
+    program = generate_program(20, seed=1)
+    profile = generate_profile(program)
+    DiskArtifactStore(str(tmp_path)).config_for(program, profile)
+
+    cold = DiskArtifactStore(str(tmp_path))
+    key = cold.key(program)
+    assert os.path.exists(cold.path(key))
+    assert cold.get(key)["variables"]["courses"]["CS100"] == "CS100"
+    assert cold.config_for(program, profile).check_solvable() == sat
+
+    edited = Program.from_dict(dict(program.to_dict(), pools=[], required_courses=program.to_dict()["required_courses"][1:]))
+    assert cold.key(Program.from_dict(program.to_dict())) == key
+    assert cold.key(edited) != key
+
+
+def test_corrupt_artifact_is_rebuilt(tmp_path):
+    program = generate_program(10, seed=0)
+    store = DiskArtifactStore(str(tmp_path))
+    with open(store.path(store.key(program)), "wb") as file:
+        file.write(b"not an artifact")
+
+    assert DiskArtifactStore(str(tmp_path)).config_for(program, generate_profile(program)).check_solvable() == sat
+
+
+def test_mongo_store():
+    collection = mongomock.MongoClient().db.SolverArtifacts
+    program = generate_program(10, seed=0)
+    MongoArtifactStore(collection).config_for(program, generate_profile(program))
+
+    assert collection.count_documents({}) == 1
+    assert MongoArtifactStore(collection).get(collection.find_one()["_id"]) is not None
+
+
+def test_endpoint_stores_artifact_once_per_program_version(tmp_path):
+    mongo_client = mongomock.MongoClient()
+    app = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "ARTIFACT_STORE": "disk",
+        "ARTIFACT_DIR": str(tmp_path)
+    })
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+
+    first = client.get('/solve-user-schedule?program=CS&profile=STUDENT').get_json()
+    assert client.get('/solve-user-schedule?program=CS&profile=STUDENT').get_json() == first
+    assert len(os.listdir(tmp_path)) == 1
+
+    client.post('/post-program-course', json={"id": "CS", "course": {"code": "C3", "title": "Course 3", "units": 3, "offered_quarters": ["SOPH_FALL"]}})
+    client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_artifact_bench_reports_both_paths(tmp_path):
+    entry = bench_size(10, seed=0, repeats=1, directory=str(tmp_path))
+
+    assert set(entry["median_ms"]) == {"encode", "artifact"}
+    assert entry["results"] == ["sat"]
@@ -0,0 +1,128 @@
+import asyncio
+
+import mongomock
+from mongomock_motor import AsyncMongoMockClient
+
+from asgi import create_asgi_app
+from classes.components.enums import Quarter
+from controller import create_app
+from services.schedule_service import schedule_document
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 5, "offered_quarters": ["FRESH_WINTER"], "prereqs": ["C1"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+# Everything else is served by the Flask app only (see the README)
+ASGI_ROUTES = {
+    ('/solve-user-schedule', 'GET'),
+    ('/post-program', 'POST'),
+    ('/post-program-course', 'POST'),
+    ('/post-prereq-course', 'POST'),
+    ('/post-catalog-course', 'POST'),
+    ('/post-profile', 'POST'),
+}
+NEW_COURSE = {"id": "CS", "course": {"code": "C3", "title": "Course 3", "units": 5, "offered_quarters": ["FRESH_SPRING"]}}
+
+
+def _asgi_app(solver_processes: int = 0):
+    mongo_client = AsyncMongoMockClient()
+    return create_asgi_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "SOLVER_PROCESSES": solver_processes
+    })
+
+async def _exercise_asgi(app):
+    client = app.test_client()
+    responses = {}
+    async with app.test_app():
+        await client.post('/post-program', json=PROGRAM)
+        await client.post('/post-profile', json=PROFILE)
+        await client.post('/post-program-course', json=NEW_COURSE)
+        await client.post('/post-prereq-course', json={"id": "CS", "course": "C3", "prereq_course": "C2"})
+        responses["solve"] = await client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+        responses["missing"] = await client.get('/solve-user-schedule?program=NOPE&profile=STUDENT')
+        responses["bad_quarter"] = await client.post('/post-program-course', json={"id": "CS", "course": {"code": "X", "title": "X", "offered_quarters": ["FALL"]}})
+        return {name: (response.status_code, await response.get_json()) for name, response in responses.items()}
+
+def _routes(app):
+    return {(rule.rule, method) for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+            for method in rule.methods - {'HEAD', 'OPTIONS'}}
+
+def _exercise_flask():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+    client.post('/post-program-course', json=NEW_COURSE)
+    client.post('/post-prereq-course', json={"id": "CS", "course": "C3", "prereq_course": "C2"})
+    responses = {
+        "solve": client.get('/solve-user-schedule?program=CS&profile=STUDENT'),
+        "missing": client.get('/solve-user-schedule?program=NOPE&profile=STUDENT'),
+        "bad_quarter": client.post('/post-program-course', json={"id": "CS", "course": {"code": "X", "title": "X", "offered_quarters": ["FALL"]}}),
+    }
+    return {name: (response.status_code, response.get_json()) for name, response in responses.items()}
+
+
+def test_asgi_matches_flask_payloads():
+    asgi_responses = asyncio.run(_exercise_asgi(_asgi_app()))
+
+    assert asgi_responses == _exercise_flask()
+    assert asgi_responses["solve"][1]["schedule"]["FRESH_SPRING"] == ["C3: Course 3"]
+
+def test_asgi_solves_in_process_pool():
+    asgi_responses = asyncio.run(_exercise_asgi(_asgi_app(solver_processes=1)))
+
+    assert asgi_responses["solve"][0] == 200
+    assert asgi_responses["solve"][1]["schedule"]["FRESH_FALL"] == ["C1: Course 1"]
+
+async def _exercise_asgi_writes(app, mongo_client):
+    client = app.test_client()
+    schedules = mongo_client["SchedulerDB"]["Schedules"]
+    async with app.test_app():
+        await client.post('/post-program', json=PROGRAM)
+        await client.post('/post-profile', json=PROFILE)
+        await schedules.insert_one(schedule_document("STUDENT", ["CS"], 1, {"C1": Quarter.FRESH_FALL, "C2": Quarter.FRESH_WINTER}))
+
+        # A catalog course no stored plan holds breaks nothing, a new required course breaks every plan
+        unaffected = await client.post('/post-catalog-course', json={"code": "PHIL1", "title": "Ethics", "units": 4, "offered_quarters": ["FRESH_WINTER"]})
+        added = await client.post('/post-program-course', json=NEW_COURSE)
+        return (await unaffected.get_json())["invalidated"], (await added.get_json())["invalidated"], await schedules.find_one({"profile": "STUDENT"})
+
+def test_asgi_writes_queue_broken_schedules():
+    mongo_client = AsyncMongoMockClient()
+    app = create_asgi_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None, "SOLVER_PROCESSES": 0})
+    unaffected, added, stored = asyncio.run(_exercise_asgi_writes(app, mongo_client))
+
+    assert unaffected == 0 and added == 1
+    assert stored["status"] == "invalid" and stored["violations"] == ["C3 is not scheduled"]
+
+def test_asgi_routes_are_the_documented_subset():
+    flask_routes = _routes(create_app({"MONGO_CLIENT_FACTORY": lambda _: mongomock.MongoClient(), "MONGO_CONNECTION_STRING": None}))
+
+    assert _routes(_asgi_app()) == ASGI_ROUTES
+    assert ASGI_ROUTES <= flask_routes
+
+async def _count_asgi_usage(app, mongo_client):
+    client = app.test_client()
+    usage = mongo_client["SchedulerDB"]["ProgramUsage"]
+    async with app.test_app():
+        await client.post('/post-program', json=PROGRAM)
+        await client.post('/post-profile', json=PROFILE)
+        for _ in range(2):
+            await client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+        # Counted in memory while serving, written when the app shuts down
+        during = await usage.count_documents({})
+    return during, await usage.find_one({"id": "CS"})
+
+def test_asgi_solves_count_program_usage_without_writing():
+    mongo_client = AsyncMongoMockClient()
+    app = create_asgi_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None, "SOLVER_PROCESSES": 0})
+    during, stored = asyncio.run(_count_asgi_usage(app, mongo_client))
+
+    assert during == 0 and stored["solves"] == 2
@@ -0,0 +1,135 @@
+import mongomock
+
+from benchmarks.generator import generate_catalog
+from classes.components.course import Course
+from classes.components.enums import GER, Quarter
+from controller import create_app
+from services import catalog_index
+from services.catalog_index import CatalogIndex, PrefixTrie, RefreshingCatalogIndex
+
+COURSES = [
+    {"code": "CS106A", "title": "Programming Methodology", "description": "Introduction to programming in Python",
+     "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"], "ug_reqs": ["WAY_FR"]},
+    {"code": "CS106B", "title": "Programming Abstractions", "description": "Recursion, data structures and algorithms",
+     "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "ug_reqs": ["WAY_FR", "WAY_SMA"]},
+    {"code": "CS161", "title": "Design and Analysis of Algorithms", "description": "Algorithms: sorting, graphs, dynamic programming",
+     "units": 5, "offered_quarters": ["SOPH_FALL"], "ug_reqs": []},
+    {"code": "PHIL1", "title": "Introduction to Ethics", "description": "Moral theories and their critics",
+     "units": 4, "offered_quarters": ["FRESH_FALL"], "ug_reqs": ["WAY_ER"]},
+]
+
+
+def _index():
+    return CatalogIndex(Course.from_dict(course_dict) for course_dict in COURSES)
+
+
+def _codes(result):
+    return [hit.course.code for hit in result.hits]
+
+
+def test_trie_lists_prefix_in_order():
+    trie = PrefixTrie()
+    for key in ["CS161", "CS106B", "PHIL1", "CS106A"]:
+        trie.insert(key, key.lower())
+
+    assert [key for key, _ in trie.items("CS1")] == ["CS106A", "CS106B", "CS161"]
+    assert trie.count("CS10") == 2
+    assert trie.remove("CS106A") and not trie.remove("CS106A")
+    assert list(trie.items("CS106")) == [("CS106B", "cs106b")]
+    assert trie.count() == len(trie) == 3
+
+
+def test_code_prefix_and_filters():
+    index = _index()
+
+    assert _codes(index.search(code_prefix="cs 106")) == ["CS106A", "CS106B"]
+    # Every GER must match, any quarter may
+    assert _codes(index.search(gers=[GER.WAY_FR, GER.WAY_SMA])) == ["CS106B"]
+    assert _codes(index.search(quarters=[Quarter.FRESH_FALL, Quarter.SOPH_FALL])) == ["CS106A", "CS161", "PHIL1"]
+    assert _codes(index.search(code_prefix="CS", quarters=[Quarter.FRESH_FALL])) == ["CS106A"]
+
+    page = index.search(limit=3)
+    assert page.has_more and _codes(index.search(limit=3, offset=3)) == ["PHIL1"]
+
+
+def test_keywords_rank_title_over_description():
+    index = _index()
+
+    # "Algorithms" is in CS161's title and twice in its text, once in CS106B's description
+    assert _codes(index.search("algorithms")) == ["CS161", "CS106B"]
+    # Every word has to match
+    assert _codes(index.search("introduction programming")) == ["CS106A"]
+    assert _codes(index.search("introduction", gers=[GER.WAY_ER])) == ["PHIL1"]
+    # The last word may still be being typed, or be a course code
+    assert _codes(index.search("progr")) == ["CS106A", "CS106B", "CS161"]
+    assert _codes(index.search("cs106")) == ["CS106A", "CS106B"]
+    assert _codes(index.search("progr ")) == []
+
+
+def test_incremental_updates():
+    index = _index()
+    index.add(Course.from_dict({**COURSES[3], "title": "Ethics in Society", "ug_reqs": ["WAY_ER", "WAY_EDP"]}))
+    index.add(Course.from_dict({"code": "CS109", "title": "Probability for Computer Scientists", "offered_quarters": ["SOPH_FALL"]}))
+
+    assert len(index) == 5
+    assert _codes(index.search("introduction")) == ["CS106A"]
+    assert _codes(index.search(gers=[GER.WAY_EDP])) == ["PHIL1"]
+    assert index.remove("CS161") and "CS161" not in index
+    assert _codes(index.search("algorithms")) == ["CS106B"]
+    assert _codes(index.search(quarters=[Quarter.SOPH_FALL])) == ["CS109"]
+
+
+def test_tiered_ranking_matches_exhaustive_scoring(monkeypatch):
+    catalog = generate_catalog(2000, seed=3)
+    index = CatalogIndex(catalog)
+
+    for query in ["data", "machine learning", "quantum ethics seminar", "stat", "learning th", "science"]:
+        # A filter every course passes, small enough to score each candidate instead of walking the tiers
+        exhaustive = index.search(query, limit=15, gers=[], quarters=list(Quarter))
+        with monkeypatch.context() as patch:
+            patch.setattr(catalog_index, "SPARSE_MATCHES", 0)
+            fast = index.search(query, limit=15)
+            prefixed = index.search(query, code_prefix=catalog[0].code[:2], limit=5)
+        assert [hit.score for hit in fast.hits] == [hit.score for hit in exhaustive.hits] and fast.has_more == exhaustive.has_more
+        assert [hit.score for hit in prefixed.hits] == [hit.score for hit in index.search(query, code_prefix=catalog[0].code[:2], limit=5).hits]
+
+
+def test_refreshing_index_replays_writes_and_rebuilds():
+    now = [0.0]
+    loads = []
+
+    def loader():
+        loads.append(now[0])
+        return [Course.from_dict(COURSES[0])]
+
+    refreshing = RefreshingCatalogIndex(loader, refresh_seconds=60, clock=lambda: now[0])
+    # Nothing to update before the first build
+    refreshing.update(lambda index: index.add(Course.from_dict(COURSES[1])))
+    assert _codes(refreshing.get().search()) == ["CS106A"]
+
+    refreshing.update(lambda index: index.add(Course.from_dict(COURSES[1])))
+    assert _codes(refreshing.get().search()) == ["CS106A", "CS106B"]
+    now[0] = 61
+    assert _codes(refreshing.get().search()) == ["CS106A"] and loads == [0.0, 61]
+
+
+def test_search_endpoint():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json={"id": "CS", "required_courses": COURSES[:3], "pools": []})
+    client.post('/post-catalog-course', json=COURSES[3])
+
+    response = client.get('/search-courses?q=algorithms')
+    assert [course["code"] for course in response.get_json()["courses"]] == ["CS161", "CS106B"]
+
+    # Writes after the first search update the index in place
+    client.post('/post-catalog-course', json={**COURSES[2], "title": "Algorithms", "ug_reqs": ["WAY_AQR"]})
+    client.post('/post-program-course', json={"id": "CS", "course": {"code": "CS109", "title": "Probability", "units": 5, "offered_quarters": ["SOPH_FALL"]}})
+    response = client.get('/search-courses?ger=WAY_AQR&quarter=SOPH_FALL&quarter=SOPH_WINTER')
+    assert [course["code"] for course in response.get_json()["courses"]] == ["CS161"]
+    response = client.get('/search-courses?code=cs1&limit=2')
+    assert [course["code"] for course in response.get_json()["courses"]] == ["CS106A", "CS106B"] and response.get_json()["has_more"]
+    assert client.get('/search-courses?q=probability').get_json()["courses"][0]["code"] == "CS109"
+
+    assert client.get('/search-courses?ger=WAY_NOPE').status_code == 400
+    assert client.get('/search-courses?limit=0').status_code == 400
@@ -11,3 +11,21 @@ if src_path not in sys.path:
 
 # Optional: Print sys.path to verify it's been added
 print(f"Added to PYTHONPATH: {src_path}")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False, help="Also run tests marked slow (soaks)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long soak runs, skipped unless --runslow is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    import pytest
+    skip_slow = pytest.mark.skip(reason="slow soak, run with --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
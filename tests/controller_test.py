@@ -0,0 +1,154 @@
+import gc
+import os
+import subprocess
+import sys
+import time
+
+import mongomock
+import pytest
+
+from controller import after_fork, create_app, preload, warm_up
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Budgets are generous enough for a loaded CI box but catch an eager z3/Mongo import creeping back in
+IMPORT_BUDGET_SECONDS = 2.0
+CREATE_APP_BUDGET_SECONDS = 0.5
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "prereqs": ["C1"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+
+
+@pytest.fixture
+def mongo_client():
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def app(mongo_client):
+    return create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None})
+
+
+def test_import_is_fast_and_side_effect_free():
+    code = (
+        "import sys, time; start = time.perf_counter(); import controller; "
+        "elapsed = time.perf_counter() - start; "
+        "print(elapsed, 'z3' in sys.modules, 'pymongo' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    elapsed, z3_loaded, pymongo_loaded = result.stdout.split()
+
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+    assert z3_loaded == "False"
+    assert pymongo_loaded == "False"
+    assert "appending" not in result.stdout
+
+
+def test_create_app_is_fast_and_does_not_connect():
+    factory_calls = []
+    start = time.perf_counter()
+    app = create_app({"MONGO_CLIENT_FACTORY": lambda uri: factory_calls.append(uri), "MONGO_CONNECTION_STRING": "mongodb://unused"})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < CREATE_APP_BUDGET_SECONDS
+    assert factory_calls == []
+    assert not app.extensions["scheduler"].mongo.connected
+
+
+def test_config_from_environment(monkeypatch):
+    monkeypatch.setenv("SCHEDULER_MONGO_URI", "mongodb://from-env")
+    monkeypatch.setenv("SCHEDULER_WARMUP_PROGRAMS", "CS, MATH")
+    app = create_app({"SETTINGS_FILE": "does-not-exist.json"})
+
+    assert app.config["MONGO_CONNECTION_STRING"] == "mongodb://from-env"
+    assert app.config["WARMUP_PROGRAMS"] == ["CS", "MATH"]
+
+
+def test_solve_user_schedule(app):
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+
+    response = client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+
+    assert response.status_code == 200
+    schedule = response.get_json()["schedule"]
+    assert schedule["FRESH_FALL"] == ["C1: Course 1"]
+    assert len(schedule["FRESH_WINTER"] + schedule["FRESH_SPRING"]) == 1
+
+
+def test_solve_user_schedule_missing_program(app):
+    response = app.test_client().get('/solve-user-schedule?program=NOPE&profile=STUDENT')
+
+    assert response.status_code == 404
+
+
+def test_write_endpoint_invalidates_cached_program(app):
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+    client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+
+    client.post('/post-program-course', json={
+        "id": "CS",
+        "course": {"code": "C3", "title": "Course 3", "units": 5, "offered_quarters": ["SOPH_FALL"]}
+    })
+    schedule = client.get('/solve-user-schedule?program=CS&profile=STUDENT').get_json()["schedule"]
+
+    assert schedule["SOPH_FALL"] == ["C3: Course 3"]
+
+
+def test_warm_up_compiles_configured_programs(app):
+    app.test_client().post('/post-program', json=PROGRAM)
+
+    timings = warm_up(app, ["CS"])
+
+    assert set(timings) == {"CS"}
+    assert "CS" in app.extensions["scheduler"].program_cache
+
+
+def test_preload_shares_programs_and_drops_master_client(mongo_client):
+    app = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "PRELOAD_PROGRAMS": ["CS"],
+        "PRELOAD_TOP_N": 1
+    })
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-program', json=dict(PROGRAM, id="MATH"))
+    client.post('/post-profile', json=PROFILE)
+    client.get('/solve-user-schedule?program=MATH&profile=STUDENT')
+    state = app.extensions["scheduler"]
+    state.program_cache.clear()
+
+    loaded = preload(app)
+    after_fork(app)
+
+    assert sorted(loaded) == ["CS", "MATH"]
+    assert "CS" in state.program_cache and "MATH" in state.program_cache
+    assert not state.mongo.connected
+    gc.unfreeze()
+
+
+def test_solves_count_program_usage_without_writing(app, mongo_client):
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+    usage = mongo_client["SchedulerDB"]["ProgramUsage"]
+
+    for _ in range(3):
+        client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+    assert usage.count_documents({}) == 0
+
+    state = app.extensions["scheduler"]
+    assert state.program_usage.pending == 3
+    assert state.program_usage.flush() == 1
+    assert usage.find_one({"id": "CS"})["solves"] == 3 and state.program_usage.pending == 0
@@ -3,6 +3,7 @@ from classes.constrain.program import Program
 from classes.constrain.profile import Profile
 from classes.components.enums import Quarter, GER, Grade, Grading
 from classes.components.pool import Pool
+from classes.components.preference import Preference
 
 def test_course_from_dict_all_fields_populated():
     
@@ -90,7 +91,11 @@ def test_profile_from_dict():
     profile = Profile(
         id="ID",
         max_quarter_units=20,
-        min_quarter_units=12
+        min_quarter_units=12,
+        completed_courses=["CS106A"],
+        current_quarter=Quarter.SOPH_FALL,
+        ger_minimums={GER.WAY_SMA: 2},
+        preferences=[Preference("NoSummer", weight=3), Preference("TakeBy", course="CS107", quarter=Quarter.SOPH_WINTER)]
     )
     
     profile_dict = profile.to_dict()
@@ -100,4 +105,8 @@ def test_profile_from_dict():
     assert type(profile_from_dict) == Profile
     assert profile.id == profile_from_dict.id
     assert profile.max_quarter_units == profile_from_dict.max_quarter_units
-    assert profile.min_quarter_units == profile_from_dict.min_quarter_units
\ No newline at end of file
+    assert profile.min_quarter_units == profile_from_dict.min_quarter_units
+    assert profile_from_dict.completed_courses == ["CS106A"]
+    assert profile_from_dict.current_quarter == Quarter.SOPH_FALL
+    assert profile_from_dict.ger_minimums == {GER.WAY_SMA: 2}
+    assert profile_from_dict.preferences == profile.preferences
\ No newline at end of file
@@ -0,0 +1,44 @@
+from benchmarks.generator import generate_catalog, generate_profile, generate_program
+from benchmarks.solver_bench import bench_size, compare
+from classes.solver_config import SolverConfig
+from z3 import sat
+
+
+def test_generator_is_deterministic():
+    first = generate_program(40, depth=5, pools=2, pool_nesting=2, seed=7)
+    second = generate_program(40, depth=5, pools=2, pool_nesting=2, seed=7)
+
+    assert first.to_dict() == second.to_dict()
+    assert first.to_dict() != generate_program(40, depth=5, pools=2, pool_nesting=2, seed=8).to_dict()
+
+def test_generator_shape():
+    program = generate_program(60, depth=4, density=0.8, pools=3, pool_nesting=2, seed=1)
+    position = {course.code: i for i, course in enumerate(program.required_courses)}
+
+    assert len(program.required_courses) == 60
+    assert len({course.code for course in program.required_courses}) == 60
+    assert len(program.pools) == 3 and all(pool.type == "Pool" for pool in program.pools)
+    for course in program.required_courses:
+        assert course.offered_quarters
+        assert course.units in (3, 4, 5)
+        # Prerequisites always come from earlier (lower level) courses, so the graph is acyclic
+        assert all(position[prereq] < position[course.code] for prereq in course.prereqs)
+
+def test_generated_program_is_solvable():
+    program = generate_program(30, seed=0)
+
+    assert SolverConfig(program=program, profile=generate_profile(program)).check_solvable() == sat
+
+def test_generate_catalog():
+    catalog = generate_catalog(200, seed=3)
+
+    assert len(catalog) == 200
+    assert any(course.ug_reqs for course in catalog)
+    assert all(course.title and course.description for course in catalog)
+
+def test_bench_size_reports_phases():
+    entry = bench_size(10, seed=0, repeats=1, depth=3, density=0.3, sparsity=0.5, endpoint=True)
+
+    assert entry["result"] == "sat"
+    assert set(entry["median_ms"]) == {"construct", "check", "extract", "endpoint"}
+    assert compare({"results": [entry]}, {"results": [entry]})
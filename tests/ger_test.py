@@ -0,0 +1,109 @@
+import mongomock
+
+from benchmarks.generator import generate_catalog, generate_profile, generate_program
+from classes.components.course import Course
+from classes.components.enums import GER, Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+from z3 import sat, unsat
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL"], "ug_reqs": ["WAY_FR"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER"], "prereqs": ["CS106A"]},
+    ],
+    "pools": []
+}
+
+CATALOG = [
+    {"code": "PHIL1", "title": "Ethics", "units": 4, "offered_quarters": ["FRESH_FALL", "FRESH_SPRING"], "ug_reqs": ["WAY_ER"]},
+    {"code": "ARTS1", "title": "Drawing", "units": 3, "offered_quarters": ["FRESH_WINTER"], "ug_reqs": ["WAY_CE"]},
+    {"code": "ARTS2", "title": "Painting", "units": 3, "offered_quarters": ["FRESH_SPRING"], "ug_reqs": ["WAY_CE", "WAY_ER"], "prereqs": ["ARTS1"]},
+    {"code": "HIST1", "title": "History", "units": 4, "offered_quarters": ["FRESH_SPRING"], "ug_reqs": ["WAY_SI"]},
+]
+
+
+def _catalog():
+    return [Course.from_dict(course_dict) for course_dict in CATALOG]
+
+
+def _profile(**ger_minimums):
+    return Profile(id="S", max_quarter_units=10, ger_minimums={GER[name]: count for name, count in ger_minimums.items()})
+
+
+def test_electives_cover_ger_minimums():
+    config = SolverConfig(Program.from_dict(PROGRAM), _profile(WAY_ER=1, WAY_CE=2), catalog=_catalog())
+
+    # HIST1 cannot help any minimum, so it never gets a variable
+    assert sorted(config.electives) == ["ARTS1", "ARTS2", "PHIL1"]
+    schedule = config.solve()
+    assert schedule["ARTS1"] == Quarter.FRESH_WINTER and schedule["ARTS2"] == Quarter.FRESH_SPRING
+    # ARTS2 counts toward both WAY_CE and WAY_ER, so PHIL1 is not needed, but may still be taken
+    assert {"CS106A", "CS106B"} <= set(schedule)
+
+
+def test_program_and_transcript_courses_count():
+    program = Program.from_dict(PROGRAM)
+
+    config = SolverConfig(program, _profile(WAY_FR=1), catalog=_catalog())
+    assert config.electives == {}
+    assert set(config.solve()) == {"CS106A", "CS106B"}
+
+    profile = Profile(id="S", completed_courses=["PHIL1"], ger_minimums={GER.WAY_ER: 1})
+    config = SolverConfig(program, profile, catalog=_catalog())
+    assert config.electives == {}
+    assert config.check_solvable() == sat
+
+
+def test_short_catalog_is_infeasible():
+    config = SolverConfig(Program.from_dict(PROGRAM), _profile(WAY_SI=2), catalog=_catalog())
+
+    assert config.check_solvable() == unsat
+
+
+def test_electives_respect_unit_cap_and_prerequisites():
+    # ARTS2 needs ARTS1, so it cannot be taken without it
+    catalog = [course for course in _catalog() if course.code != "ARTS1"]
+    config = SolverConfig(Program.from_dict(PROGRAM), _profile(WAY_CE=1), catalog=catalog)
+    assert config.electives == {}
+    assert config.check_solvable() == unsat
+
+    # FRESH_FALL already holds CS106A (5 units), so PHIL1 (4) only fits under a cap of 9 or more
+    catalog = [Course.from_dict({**CATALOG[0], "offered_quarters": ["FRESH_FALL"]})]
+    tight = Profile(id="S", max_quarter_units=8, ger_minimums={GER.WAY_ER: 1})
+    assert SolverConfig(Program.from_dict(PROGRAM), tight, catalog=catalog).check_solvable() == unsat
+    loose = Profile(id="S", max_quarter_units=9, ger_minimums={GER.WAY_ER: 1})
+    assert SolverConfig(Program.from_dict(PROGRAM), loose, catalog=catalog).solve()["PHIL1"] == Quarter.FRESH_FALL
+
+
+def test_generated_catalog_scale():
+    program = generate_program(40, seed=1)
+    base = generate_profile(program)
+    minimums = {GER.WAY_A_II: 2, GER.WAY_SMA: 2, GER.WAY_ER: 1, GER.WRITING_2: 1, GER.LANGUAGE: 3}
+    profile = Profile(id="S", max_quarter_units=base.max_quarter_units + 5, ger_minimums=minimums)
+
+    config = SolverConfig(program, profile, catalog=generate_catalog(500, seed=1))
+    schedule = config.solve()
+    assert schedule is not None
+    tags = {code: elective.course.ug_reqs for code, elective in config.electives.items()}
+    tags.update({course.code: course.ug_reqs for course in program.required_courses})
+    for ger, minimum in minimums.items():
+        assert sum(1 for code in schedule if ger in tags[code]) >= minimum
+
+
+def test_endpoint_adds_catalog_electives():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    for course in CATALOG:
+        assert client.post('/post-catalog-course', json=course).status_code == 200
+    client.post('/post-profile', json={"id": "S", "max_quarter_units": 10, "min_quarter_units": 0, "ger_minimums": {"WAY_SI": 1}})
+
+    schedule = client.get('/solve-user-schedule?program=CS&profile=S').get_json()["schedule"]
+    assert "HIST1: History" in schedule["FRESH_SPRING"]
+
+    assert client.post('/post-profile', json={"id": "BAD", "ger_minimums": {"WAY_NOPE": 1}}).status_code == 400
+    assert client.post('/post-catalog-course', json={**CATALOG[0], "ug_reqs": ["WAY_NOPE"]}).status_code == 400
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import mongomock
+
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.constrain.program import Program
+from controller import create_app
+from services.impact import INVALID, REPAIRING, Change, RepairQueue, validate_schedule
+from services.schedule_service import schedule_document
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "prereqs": ["CS106A"]},
+        {"code": "CS109", "title": "Probability", "units": 5, "offered_quarters": ["FRESH_SPRING", "SOPH_FALL"],
+         "prereqs": [{"type": "Or", "objects": ["CS106A", "MATH19"]}]},
+    ],
+    "pools": []
+}
+
+VALID_SCHEDULE = {"CS106A": Quarter.FRESH_FALL, "CS106B": Quarter.FRESH_WINTER, "CS109": Quarter.FRESH_SPRING}
+
+
+def test_validate_schedule():
+    program = Program.from_dict(PROGRAM)
+
+    assert validate_schedule(VALID_SCHEDULE, program, max_quarter_units=5) == []
+    assert validate_schedule({**VALID_SCHEDULE, "CS106B": Quarter.FRESH_FALL}, program, max_quarter_units=5) == [
+        "CS106B is not offered in FRESH_FALL",
+        "CS106B is scheduled before its prerequisites",
+        "FRESH_FALL has 10 units, above the cap of 5",
+    ]
+    # The transcript covers missing courses and prerequisites; MATH19 is unknown, so it counts as met
+    assert validate_schedule({"CS106B": Quarter.FRESH_WINTER}, program, completed=["CS106A"]) == ["CS109 is not scheduled"]
+    assert validate_schedule({"CS109": Quarter.FRESH_SPRING, "CS106B": Quarter.FRESH_WINTER}, program, completed=["CS106A"]) == []
+
+    elective = Course.from_dict({"code": "PHIL1", "title": "Ethics", "units": 4, "offered_quarters": ["FRESH_WINTER"]})
+    assert validate_schedule({**VALID_SCHEDULE, "PHIL1": Quarter.FRESH_FALL}, program, catalog=[elective]) == ["PHIL1 is not offered in FRESH_FALL"]
+
+
+def test_change_queries():
+    assert Change("prereq_added", "CS109", "CS").query() == {"programs": "CS", "courses": "CS109"}
+    assert Change("course_added", "CS107", "CS").query() == {"programs": "CS", "courses": {"$ne": "CS107"}}
+    assert Change("offering_changed", "PHIL1").query() == {"courses": "PHIL1"}
+
+
+def test_queue_claims_with_a_lease():
+    collection = mongomock.MongoClient()["db"]["Schedules"]
+    first = collection.insert_one(schedule_document("S1", ["CS"], 1, VALID_SCHEDULE)).inserted_id
+    second = collection.insert_one(schedule_document("S2", ["CS"], 1, VALID_SCHEDULE)).inserted_id
+    queue = RepairQueue(collection, lease_seconds=60)
+
+    queue.enqueue(second, ["CS109 is not scheduled"])
+    queue.enqueue(first, ["CS109 is not scheduled"])
+    assert sorted(document["profile"] for document in queue.claim(5)) == ["S1", "S2"]
+    assert queue.claim(5) == [] and queue.pending() == 2
+
+    # A worker that died holding a claim loses it once the lease runs out
+    collection.update_one({"_id": first}, {"$set": {"lease_until": datetime(2000, 1, 1)}})
+    assert [document["profile"] for document in queue.claim(5)] == ["S1"]
+    queue.release(second)
+    assert collection.find_one({"_id": second})["status"] == INVALID
+    assert collection.find_one({"_id": first})["status"] == REPAIRING
+
+
+def test_edits_queue_only_broken_schedules():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    schedules = mongo_client["SchedulerDB"]["Schedules"]
+    client.post('/post-program', json=PROGRAM)
+    for profile_id in ["S1", "S2"]:
+        client.post('/post-profile', json={"id": profile_id, "max_quarter_units": 10, "min_quarter_units": 0})
+    schedules.insert_one(schedule_document("S1", ["CS"], 1, {**VALID_SCHEDULE, "CS106B": Quarter.FRESH_SPRING}))
+    schedules.insert_one(schedule_document("S2", ["CS"], 1, {**VALID_SCHEDULE, "CS109": Quarter.SOPH_FALL, "PHIL1": Quarter.FRESH_FALL}))
+
+    # CS109 now needs CS106B, which S1 takes in the same quarter
+    response = client.post('/post-prereq-course', json={"id": "CS", "course": "CS109", "prereq_course": "CS106B"})
+    assert response.get_json()["invalidated"] == 1
+    assert schedules.find_one({"profile": "S1"})["violations"] == ["CS109 is scheduled before its prerequisites"]
+    assert schedules.find_one({"profile": "S2"})["status"] == "valid"
+
+    body = client.post('/process-repair-queue').get_json()
+    assert body == {"repaired": 1, "infeasible": 0, "requeued": 0, "remaining": 0}
+    repaired = schedules.find_one({"profile": "S1"})
+    assert repaired["status"] == "valid" and repaired["program_version"] == 2
+    # One of the two moves, the other stays
+    assert Quarter[repaired["schedule"]["CS106B"]].value < Quarter[repaired["schedule"]["CS109"]].value
+    assert repaired["schedule"]["CS106B"] == "FRESH_SPRING" or repaired["schedule"]["CS109"] == "FRESH_SPRING"
+
+    # Catalog edits reach every plan holding the course, whatever its program
+    response = client.post('/post-catalog-course', json={"code": "PHIL1", "title": "Ethics", "units": 4, "offered_quarters": ["FRESH_WINTER"]})
+    assert response.get_json()["invalidated"] == 1
+
+    # A new required course breaks every plan of the program
+    response = client.post('/post-program-course', json={"id": "CS", "course": {"code": "CS107", "title": "Computer Organization", "units": 5, "offered_quarters": ["SOPH_WINTER"]}})
+    assert response.get_json()["invalidated"] == 2
+    assert client.post('/process-repair-queue', json={"batch": 1}).get_json()["remaining"] == 1
+    assert client.post('/process-repair-queue').get_json()["repaired"] == 1
+    assert all(document["schedule"]["CS107"] == "SOPH_WINTER" for document in schedules.find())
@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks.frontend_compare import local_flask_server, uri_client_factory
+from benchmarks.loadtest import OPERATIONS, compare, parse_mix, plan, run_load, seed_store
+
+
+def test_parse_mix():
+    assert parse_mix("solve=3, profile_write=1") == {"solve": 3, "profile_write": 1}
+    with pytest.raises(ValueError):
+        parse_mix("solve=3,delete=1")
+    with pytest.raises(ValueError):
+        parse_mix("solve=x")
+    with pytest.raises(ValueError):
+        parse_mix("solve=0")
+
+
+def test_load_run_reports_every_operation():
+    mix = {name: 1 for name in OPERATIONS}
+    with local_flask_server() as base_url:
+        workload = seed_store(base_url, programs=2, courses=10, students=2, catalog=5, seed=0)
+        # Same seed, same requests
+        assert plan(30, mix, workload, 1) == plan(30, mix, workload, 1)
+        report = run_load(base_url, workload, requests=30, concurrency=2, mix=mix, seed=1)
+
+    assert report["overall"]["requests"] == 30 and report["overall"]["error_rate"] == 0
+    assert set(report["operations"]) <= set(OPERATIONS)
+    for entry in report["operations"].values():
+        assert entry["statuses"] == {"200": entry["requests"]}
+        assert entry["p50_ms"] <= entry["p95_ms"] <= entry["p99_ms"] <= entry["max_ms"]
+    assert any(line.startswith("overall") for line in compare(report, report))
+
+
+def test_local_mongo_client_uses_tls_only_when_asked():
+    # connect=False: nothing is contacted, only the options are parsed
+    assert uri_client_factory("mongodb://127.0.0.1:27017/?connect=false").options.pool_options._ssl_context is None
+    assert uri_client_factory("mongodb://127.0.0.1:27017/?tls=true&connect=false").options.pool_options._ssl_context is not None
@@ -0,0 +1,124 @@
+import itertools
+import random
+
+import mongomock
+import pytest
+
+from benchmarks.generator import generate_profile, generate_program
+from classes.components.enums import Quarter
+from classes.components.preference import Preference
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.maxsat import solve_maxsat
+from classes.solver_config import SolverConfig
+from controller import create_app
+from services.solver_pool import SolveTimeout, solve_schedule
+from z3 import Bool, Not, Optimize, Or, Solver, is_true
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "A", "title": "Course A", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_SUMMER"]},
+        {"code": "B", "title": "Course B", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_SUMMER"]},
+    ],
+    "pools": []
+}
+
+
+def _preferences(program, seed):
+    rng = random.Random(seed)
+    preferences = [Preference("NoSummer", weight=5), Preference("MaxUnits", units=10, weight=2)]
+    for course in program.required_courses:
+        preferences.append(Preference("TakeBy", course=course.code, quarter=Quarter(rng.randint(0, 12)), weight=rng.randint(1, 5)))
+    return preferences
+
+
+def test_preference_validation():
+    assert Preference.from_dict({"type": "NoSummer"}).weight == 1
+    with pytest.raises(ValueError):
+        Preference("Mornings")
+    with pytest.raises(ValueError):
+        Preference("TakeBy", course="CS107")
+    with pytest.raises(ValueError):
+        Preference("NoSummer", weight=0)
+
+
+def test_maxsat_matches_brute_force():
+    rng = random.Random(0)
+    variables = [Bool(f"x{i}") for i in range(8)]
+
+    def literal(index, positive):
+        return variables[index] if positive else Not(variables[index])
+
+    for _ in range(5):
+        # Clauses as (variable, sign) pairs, so the brute force runs in Python
+        hard = [[(index, rng.random() < 0.5) for index in rng.sample(range(8), 3)] for _ in range(6)]
+        soft = [([(index, rng.random() < 0.5)], rng.randint(1, 4)) for index in range(8)]
+        soft += [([(index, True) for index in rng.sample(range(8), 2)], rng.randint(1, 4)) for _ in range(4)]
+
+        def holds(clause, values):
+            return any(values[index] == positive for index, positive in clause)
+
+        costs = [
+            sum(weight for clause, weight in soft if not holds(clause, values))
+            for values in itertools.product([False, True], repeat=8)
+            if all(holds(clause, values) for clause in hard)
+        ]
+        solver = Solver()
+        solver.add([Or([literal(*item) for item in clause]) for clause in hard])
+        result = solve_maxsat(solver, [(Or([literal(*item) for item in clause]), weight) for clause, weight in soft])
+        assert result.optimal and result.cost == min(costs) == result.lower_bound
+
+
+def test_preferences_trade_off_by_weight():
+    profile = Profile(id="S", max_quarter_units=5, preferences=[
+        Preference("NoSummer", weight=2),
+        Preference("TakeBy", course="B", quarter=Quarter.FRESH_FALL, weight=1),
+    ])
+    result = SolverConfig(Program.from_dict(PROGRAM), profile).optimize()
+
+    # One course has to go to summer; B keeps its place in the fall
+    assert result.optimal and result.cost == 2 and result.unmet == [0]
+    assert result.schedule == {"A": Quarter.FRESH_SUMMER, "B": Quarter.FRESH_FALL}
+
+
+def test_optimum_matches_z3_optimize():
+    program = generate_program(60, seed=1)
+    profile = Profile(id="S", max_quarter_units=generate_profile(program).max_quarter_units, preferences=_preferences(program, 1))
+    result = SolverConfig(program, profile).optimize()
+
+    reference = SolverConfig(program, profile)
+    optimize = Optimize(ctx=reference.ctx)
+    optimize.add(reference.get_assertions())
+    soft = [(constraint, preference.weight) for preference in profile.preferences for constraint in reference._preference_constraints(preference)]
+    for constraint, weight in soft:
+        optimize.add_soft(constraint, weight)
+    assert str(optimize.check()) == "sat"
+    model = optimize.model()
+
+    assert result.optimal
+    assert result.cost == sum(weight for constraint, weight in soft if not is_true(model.eval(constraint, model_completion=True)))
+
+
+def test_solve_schedule_honours_preferences_within_the_deadline():
+    program = Program.from_dict(PROGRAM)
+    profile = Profile(id="S", max_quarter_units=10, preferences=[Preference("NoSummer", weight=3)])
+    assert solve_schedule(program, profile) == {"A": Quarter.FRESH_FALL, "B": Quarter.FRESH_FALL}
+
+    large = generate_program(100, seed=2)
+    profile = Profile(id="S", max_quarter_units=generate_profile(large).max_quarter_units, preferences=_preferences(large, 2))
+    with pytest.raises(SolveTimeout):
+        solve_schedule(large, profile, timeout_ms=1)
+
+
+def test_endpoint_solves_with_profile_preferences():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    preferences = [{"type": "NoSummer", "weight": 2}, {"type": "TakeBy", "course": "B", "quarter": "FRESH_FALL"}]
+    assert client.post('/post-profile', json={"id": "S", "max_quarter_units": 5, "min_quarter_units": 0, "preferences": preferences}).status_code == 200
+
+    schedule = client.get('/solve-user-schedule?program=CS&profile=S').get_json()["schedule"]
+    assert schedule["FRESH_FALL"] == ["B: Course B"] and schedule["FRESH_SUMMER"] == ["A: Course A"]
+
+    assert client.post('/post-profile', json={"id": "BAD", "preferences": [{"type": "TakeBy", "quarter": "FRESH_FALL"}]}).status_code == 400
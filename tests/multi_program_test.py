@@ -0,0 +1,88 @@
+import mongomock
+import pytest
+
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program, ProgramConflict
+from classes.solver_config import SolverConfig
+from controller import create_app
+from z3 import sat, unsat
+
+CS = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "MATH51", "title": "Linear Algebra", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "CS109", "title": "Probability", "units": 5, "offered_quarters": ["FRESH_SPRING"], "prereqs": ["CS106A"]},
+    ],
+    "pools": [{"type": "Course", "objects": ["CS109", "STATS116"], "num_required": 1}]
+}
+
+MATH = {
+    "id": "MATH",
+    "required_courses": [
+        {"code": "MATH51", "title": "Linear Algebra", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "prereqs": ["MATH20"]},
+        {"code": "MATH20", "title": "Calculus", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+    ],
+    "pools": [{"type": "Course", "objects": ["MATH51", "MATH52", "MATH53"], "num_required": 2}]
+}
+
+
+def test_merge_dedups_shared_courses():
+    merged = Program.merge([Program.from_dict(CS), Program.from_dict(MATH)])
+
+    assert merged.id == "CS+MATH"
+    assert [course.code for course in merged.required_courses] == ["MATH51", "CS106A", "CS109", "MATH20"]
+    shared = merged.required_courses[0]
+    # Both programs accept MATH51 only in FRESH_WINTER, and it keeps MATH's prerequisite
+    assert shared.offered_quarters == [Quarter.FRESH_WINTER]
+    assert shared.prereqs == ["MATH20"]
+    assert len(merged.pools) == 2
+
+
+def test_merge_rejects_disjoint_offerings():
+    summer = {"id": "SUMMER", "required_courses": [{**MATH["required_courses"][0], "offered_quarters": ["FRESH_SUMMER"]}], "pools": []}
+
+    with pytest.raises(ProgramConflict, match="MATH51"):
+        Program.merge([Program.from_dict(CS), Program.from_dict(summer)])
+
+
+def test_merged_program_shares_one_variable_per_course():
+    config = SolverConfig([Program.from_dict(CS), Program.from_dict(MATH)], Profile(id="S"))
+
+    assert sorted(course.code for course in config.course_dict.values()) == ["CS106A", "CS109", "MATH20", "MATH51"]
+    # MATH's pool needs two of MATH51-53 but only MATH51 is in either program
+    assert config.check_solvable() == unsat
+
+
+def test_pools_count_transcript_courses():
+    profile = Profile(id="S", completed_courses=["MATH53"])
+    schedule = SolverConfig([Program.from_dict(CS), Program.from_dict(MATH)], profile).solve()
+
+    assert schedule["MATH20"] == Quarter.FRESH_FALL
+    assert schedule["MATH51"] == Quarter.FRESH_WINTER
+
+
+def test_endpoint_solves_repeated_programs():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=CS)
+    client.post('/post-program', json={**MATH, "pools": []})
+    client.post('/post-profile', json={"id": "S", "max_quarter_units": 20, "min_quarter_units": 0})
+
+    schedule = client.get('/solve-user-schedule?program=CS&program=MATH&profile=S').get_json()["schedule"]
+    entries = [entry for courses in schedule.values() for entry in courses]
+    assert len(entries) == 4
+    assert schedule["FRESH_WINTER"] == ["MATH51: Linear Algebra"]
+
+    # Editing one program invalidates the merged entry
+    client.post('/post-program-course', json={"id": "MATH", "course": {"code": "MATH52", "title": "Vector Calculus", "units": 5, "offered_quarters": ["SOPH_FALL"]}})
+    schedule = client.get('/solve-user-schedule?program=CS&program=MATH&profile=S').get_json()["schedule"]
+    assert schedule["SOPH_FALL"] == ["MATH52: Vector Calculus"]
+
+    response = client.get('/solve-user-schedule?program=CS&program=NOPE&profile=S')
+    assert response.status_code == 404 and "NOPE" in response.get_json()["error"]
+
+    client.post('/post-program', json={"id": "SUMMER", "required_courses": [{**CS["required_courses"][1], "offered_quarters": ["FRESH_SUMMER"]}], "pools": []})
+    response = client.get('/solve-user-schedule?program=CS&program=SUMMER&profile=S')
+    assert response.status_code == 409 and "CS106A" in response.get_json()["error"]
@@ -0,0 +1,108 @@
+import re
+
+from benchmarks.generator import generate_profile, generate_program
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.components.prereq import Prereq
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from classes.solver_config import SolverConfig
+from z3 import sat, unsat
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "MATH51", "title": "Linear Algebra", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_SPRING"]},
+        {"code": "CS106X", "title": "Programming Abstractions (Accelerated)", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "CS109", "title": "Probability", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING", "SOPH_FALL"],
+         "prereqs": [{"type": "Or", "objects": ["CS106B", "CS106X"]}, "MATH51"]},
+    ],
+    "pools": []
+}
+
+
+def _satisfied(items, schedule, course_quarter, conjunction=True):
+    met = [
+        _satisfied(item.objects, schedule, course_quarter, item.type == "And") if isinstance(item, Prereq)
+        else item not in schedule or schedule[item].value < course_quarter
+        for item in items
+    ]
+    return all(met) if conjunction or not met else any(met)
+
+
+def _late_cs106x():
+    return Program.from_dict({**PROGRAM, "required_courses": [
+        {**course, "offered_quarters": ["SOPH_FALL"]} if course["code"] == "CS106X" else course for course in PROGRAM["required_courses"]
+    ]})
+
+
+def test_nested_prereqs_round_trip():
+    course = Course.from_dict(PROGRAM["required_courses"][3])
+
+    assert course.prereqs == [Prereq("Or", ["CS106B", "CS106X"]), "MATH51"]
+    assert course.prereq_codes == ["CS106B", "CS106X", "MATH51"]
+    assert course.to_dict()["prereqs"] == PROGRAM["required_courses"][3]["prereqs"]
+    # Flat lists keep their old shape and meaning
+    assert Course.from_dict({"code": "C", "prereqs": ["A", "B"]}).to_dict()["prereqs"] == ["A", "B"]
+
+
+def test_propagation_takes_the_earliest_alternative():
+    index = ProgramIndex(Program.from_dict(PROGRAM))
+
+    assert index.necessary["CS109"] == frozenset({"MATH51"})
+    # CS106X in FRESH_FALL opens FRESH_WINTER; CS106B is not needed, so CS109 does not bound it
+    assert index.domain("CS109") == [Quarter.FRESH_WINTER, Quarter.FRESH_SPRING, Quarter.SOPH_FALL]
+    assert index.domain("CS106B") == [Quarter.FRESH_SPRING]
+    assert index.domain("MATH51") == [Quarter.FRESH_FALL, Quarter.FRESH_WINTER]
+
+
+def test_solver_uses_an_alternative():
+    program = Program.from_dict(PROGRAM)
+    schedule = SolverConfig(program, Profile(id="S", max_quarter_units=10)).solve()
+    assert _satisfied(program.required_courses[3].prereqs, schedule, schedule["CS109"].value)
+
+    # Pinning CS109 to FRESH_WINTER only works through CS106X
+    config = SolverConfig(program, Profile(id="S", max_quarter_units=10))
+    assert config.check_assumptions([config.pin_literal("CS109", Quarter.FRESH_WINTER)]) == sat
+    assert config.extract_schedule()["CS106X"] == Quarter.FRESH_FALL and config.extract_schedule()["MATH51"] == Quarter.FRESH_FALL
+
+    config = SolverConfig(_late_cs106x(), Profile(id="S", max_quarter_units=10))
+    assert config.check_assumptions([config.pin_literal("CS109", Quarter.FRESH_WINTER)]) == unsat
+
+
+def test_identical_alternatives_share_one_auxiliary():
+    shared = {"type": "Or", "objects": ["CS106B", "CS106X"]}
+    # Two quarters each, so presolve leaves the alternatives to the solver
+    flexible = [
+        {**course, "offered_quarters": course["offered_quarters"] + ["FRESH_WINTER"]} if course["code"] in ("CS106B", "CS106X") else course
+        for course in PROGRAM["required_courses"]
+    ]
+    program = Program.from_dict({**PROGRAM, "required_courses": flexible + [
+        {"code": "CS107", "title": "Computer Organization", "units": 5, "offered_quarters": ["SOPH_FALL"], "prereqs": [shared]},
+        {"code": "CS110", "title": "Systems", "units": 5, "offered_quarters": ["SOPH_WINTER"], "prereqs": [shared]},
+    ]})
+    config = SolverConfig(program, Profile(id="S", max_quarter_units=15))
+
+    assert set(re.findall(r"prereq!\d+", config.to_smt2())) == {"prereq!0"}
+    assert config.check_solvable() == sat
+
+
+def test_transcript_satisfies_an_alternative():
+    profile = Profile(id="S", max_quarter_units=10, completed_courses=["CS106B", "MATH51"], current_quarter=Quarter.FRESH_WINTER)
+    config = SolverConfig(_late_cs106x(), profile)
+
+    # CS106X is still required by the program, but CS109 no longer waits for it
+    assert config.check_assumptions([config.pin_literal("CS109", Quarter.FRESH_WINTER)]) == sat
+    assert config.extract_schedule()["CS106X"] == Quarter.SOPH_FALL
+
+
+def test_generated_program_with_alternatives():
+    program = generate_program(80, density=0.8, disjunction_rate=0.5, seed=1)
+    assert any(isinstance(item, Prereq) for course in program.required_courses for item in course.prereqs)
+
+    schedule = SolverConfig(program, generate_profile(program)).solve()
+    assert schedule is not None
+    for course in program.required_courses:
+        assert _satisfied(course.prereqs, schedule, schedule[course.code].value)
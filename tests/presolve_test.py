@@ -0,0 +1,61 @@
+from benchmarks.generator import generate_profile, generate_program
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from classes.presolve import presolve
+from classes.solver_config import SolverConfig
+from z3 import sat, unsat
+
+
+def _program():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_FALL])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_FALL, Quarter.FRESH_WINTER])
+    C3 = Course(code='C3', units=5, offered_quarters=[Quarter.FRESH_WINTER, Quarter.FRESH_SPRING])
+    return Program(id="ID", required_courses=[C1, C2, C3])
+
+
+def test_presolve_fixes_singleton_courses():
+    result = presolve(ProgramIndex(_program()))
+
+    assert result.feasible and result.rounds == 1
+    assert result.fixed == {'C1': Quarter.FRESH_FALL}
+    assert result.fixed_units == {Quarter.FRESH_FALL: 5}
+    assert result.domains['C3'] == [Quarter.FRESH_WINTER, Quarter.FRESH_SPRING]
+
+def test_presolve_capacity_cascades():
+    result = presolve(ProgramIndex(_program()), max_quarter_units=5)
+
+    # C1 pushes C2 to winter, which then pushes C3 to spring
+    assert result.feasible and result.rounds == 3
+    assert result.fixed == {'C1': Quarter.FRESH_FALL, 'C2': Quarter.FRESH_WINTER, 'C3': Quarter.FRESH_SPRING}
+
+def test_presolve_detects_overloaded_quarter():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_FALL])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_FALL])
+    program = Program(id="ID", required_courses=[C1, C2])
+
+    assert not presolve(ProgramIndex(program), max_quarter_units=5).feasible
+    config = SolverConfig(program, Profile(id="S", max_quarter_units=5, min_quarter_units=0))
+    assert config.check_solvable() == unsat
+
+def test_fixed_courses_leave_the_encoding():
+    config = SolverConfig(_program(), Profile(id="S", max_quarter_units=10, min_quarter_units=0))
+
+    assert config.fixed == {'C1': Quarter.FRESH_FALL}
+    assert 'C1' not in config.to_smt2() and 'C2' in config.to_smt2()
+    schedule = config.solve()
+    assert schedule['C1'] == Quarter.FRESH_FALL and set(schedule) == {'C1', 'C2', 'C3'}
+
+def test_generated_schedule_keeps_fixed_courses_through_an_artifact():
+    program = generate_program(60, seed=3)
+    profile = generate_profile(program)
+    config = SolverConfig(program, profile)
+    assert config.fixed and config.check_solvable() == sat
+
+    loaded = SolverConfig.from_artifact(program, config.to_artifact(), profile)
+    schedule = loaded.solve()
+    assert schedule is not None
+    assert all(schedule[code] == quarter for code, quarter in config.fixed.items())
+    assert set(schedule) >= {course.code for course in program.required_courses}
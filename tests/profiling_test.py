@@ -0,0 +1,78 @@
+import json
+import os
+import pstats
+
+import mongomock
+import pytest
+
+from benchmarks.generator import generate_profile, generate_program
+from controller import create_app
+from services.profiling import CATEGORIES, classify
+
+
+def _client(tmp_path, **config):
+    mongo_client = mongomock.MongoClient()
+    client = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "ARTIFACT_STORE": "off",
+        "PROFILE_DIR": str(tmp_path),
+        "PROFILE_SAMPLE_INTERVAL_MS": 1,
+        **config
+    }).test_client()
+    program = generate_program(40, seed=0)
+    profile = generate_profile(program)
+    client.post('/post-program', json=program.to_dict())
+    client.post('/post-profile', json=profile.to_dict())
+    return client, f'/solve-user-schedule?program={program.id}&profile={profile.id}'
+
+
+def test_classify():
+    assert classify(os.path.join("site-packages", "z3", "z3core.py"), "Z3_solver_check_assumptions") == "z3_check"
+    assert classify(os.path.join("site-packages", "z3", "z3.py"), "Int") == "z3_api"
+    assert classify("~", "<method 'acquire' of '_thread.lock' objects>") == "wait"
+    assert classify("flask/app.py", "dispatch_request") == "other"
+
+
+def test_profiling_is_off_without_a_token(tmp_path):
+    client, url = _client(tmp_path, PROFILE_TOKEN=None)
+    response = client.get(url, headers={"X-Profile": "anything"})
+    assert response.status_code == 200 and "X-Profile-Output" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampled_request_writes_collapsed_stacks(tmp_path):
+    client, url = _client(tmp_path, PROFILE_TOKEN="secret")
+    assert "X-Profile-Output" not in client.get(url, headers={"X-Profile": "wrong"}).headers
+
+    stem = client.get(f'{url}&_profile=secret').headers["X-Profile-Output"]
+    with open(tmp_path / f"{stem}.json") as file:
+        record = json.load(file)
+    assert record["mode"] == "sample" and record["status"] == 200 and "_profile" not in record["args"]
+    assert set(record["attribution_ms"]) == set(CATEGORIES) and "check" in record["spans_ms"]
+
+    with open(tmp_path / record["profile"]) as file:
+        lines = file.read().splitlines()
+    assert lines and all(line.startswith("request;") and line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_cprofile_follows_the_solver_thread(tmp_path):
+    client, url = _client(tmp_path, PROFILE_TOKEN="secret", SOLVER_MODE="thread")
+    stem = client.get(url, headers={"X-Profile": "secret", "X-Profile-Mode": "cprofile"}).headers["X-Profile-Output"]
+    with open(tmp_path / f"{stem}.json") as file:
+        record = json.load(file)
+
+    stats = pstats.Stats(str(tmp_path / record["profile"]))
+    assert any(function == "check_solvable" for _, _, function in stats.stats)
+    # The check ran on the solver thread while the request thread waited for it
+    assert record["attribution_ms"]["z3_check"] > 0 and record["attribution_ms"]["wait"] > 0
+
+    assert client.get(url, headers={"X-Profile": "secret", "X-Profile-Mode": "perf"}).status_code == 400
+
+
+def test_profile_directory_is_bounded(tmp_path):
+    client, url = _client(tmp_path, PROFILE_TOKEN="secret", PROFILE_MAX_BYTES=1)
+    for _ in range(3):
+        stem = client.get(url, headers={"X-Profile": "secret"}).headers["X-Profile-Output"]
+    # Only the newest profile survives a cap smaller than one profile
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{stem}.folded", f"{stem}.json"])
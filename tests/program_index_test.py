@@ -0,0 +1,45 @@
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from classes.components.course import Course
+from classes.components.enums import Quarter
+
+
+def test_program_index_prereq_graph_ignores_outside_courses():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_FALL])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_WINTER], prereqs=['C1', 'OUTSIDE'])
+
+    index = ProgramIndex(Program(id="ID", required_courses=[C1, C2]))
+
+    assert index.prereq_graph == {'C2': frozenset({'C1'})}
+    assert index.dependents == {'C1': frozenset({'C2'})}
+    assert index.topological_order == ('C1', 'C2')
+
+def test_program_index_propagates_bounds():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_FALL, Quarter.FRESH_WINTER, Quarter.FRESH_SPRING])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_FALL, Quarter.FRESH_WINTER, Quarter.FRESH_SPRING], prereqs=['C1'])
+    C3 = Course(code='C3', units=5, offered_quarters=[Quarter.FRESH_FALL, Quarter.FRESH_SPRING], prereqs=['C2'])
+
+    index = ProgramIndex(Program(id="ID", required_courses=[C1, C2, C3]))
+
+    assert index.domain('C1') == [Quarter.FRESH_FALL]
+    assert index.domain('C2') == [Quarter.FRESH_WINTER]
+    assert index.domain('C3') == [Quarter.FRESH_SPRING]
+    assert index.feasible
+
+def test_program_index_detects_infeasible_chain():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_WINTER])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_FALL], prereqs=['C1'])
+
+    index = ProgramIndex(Program(id="ID", required_courses=[C1, C2]))
+
+    assert index.domain('C2') == []
+    assert not index.feasible
+
+def test_program_index_cycle_falls_back_to_offered_quarters():
+    C1 = Course(code='C1', units=5, offered_quarters=[Quarter.FRESH_FALL], prereqs=['C2'])
+    C2 = Course(code='C2', units=5, offered_quarters=[Quarter.FRESH_WINTER], prereqs=['C1'])
+
+    index = ProgramIndex(Program(id="ID", required_courses=[C1, C2]))
+
+    assert index.topological_order is None
+    assert index.domain('C1') == [Quarter.FRESH_FALL]
@@ -0,0 +1,94 @@
+import mongomock
+
+from benchmarks.generator import generate_profile, generate_program
+from benchmarks.range_bench import bench_size
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "prereqs": ["CS106A"]},
+        {"code": "CS107", "title": "Computer Organization", "units": 5, "offered_quarters": ["FRESH_SPRING", "SOPH_FALL"], "prereqs": ["CS106B"]},
+    ],
+    "pools": []
+}
+
+
+def _naive_matrix(program, profile):
+    matrix = {}
+    for course in program.required_courses:
+        for quarter in Quarter:
+            config = SolverConfig(program, profile)
+            matrix[(course.code, quarter)] = str(config.check_assumptions([config.pin_literal(course.code, quarter)])) == "sat"
+    return matrix
+
+
+def test_matrix_matches_one_check_per_pair():
+    program = Program.from_dict(PROGRAM)
+    profile = Profile(id="S", max_quarter_units=5)
+
+    analysis = SolverConfig(program, profile).feasibility_matrix()
+
+    assert {(code, quarter): bool(feasible) for code, quarters in analysis.matrix.items() for quarter, feasible in quarters.items()} == _naive_matrix(program, profile)
+    assert analysis.feasible_quarters("CS106A") == [Quarter.FRESH_FALL, Quarter.FRESH_WINTER]
+    assert analysis.feasible_quarters("CS106B") == [Quarter.FRESH_WINTER, Quarter.FRESH_SPRING]
+    assert analysis.checks < analysis.candidates
+
+
+def test_matrix_on_generated_program_saves_checks():
+    program = generate_program(30, seed=1)
+    profile = generate_profile(program)
+    analysis = SolverConfig(program, profile).feasibility_matrix()
+
+    assert analysis.checks < analysis.candidates < 30 * len(Quarter)
+    code = program.required_courses[10].code
+    for quarter in Quarter:
+        config = SolverConfig(program, profile)
+        expected = str(config.check_assumptions([config.pin_literal(code, quarter)])) == "sat"
+        assert bool(analysis.matrix[code][quarter]) == expected
+
+
+def test_infeasible_plan_has_an_empty_matrix():
+    analysis = SolverConfig(Program.from_dict(PROGRAM), Profile(id="S", max_quarter_units=1)).feasibility_matrix()
+
+    assert analysis.checks == 1
+    assert not any(analysis.feasible_quarters(code) for code in analysis.matrix)
+
+
+def test_course_quarter_range_endpoint():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json={"id": "S", "max_quarter_units": 20, "min_quarter_units": 0})
+
+    body = client.get('/course-quarter-range?program=CS&profile=S').get_json()
+
+    assert body["courses"]["CS107"] == {"feasible": ["FRESH_SPRING", "SOPH_FALL"], "undecided": []}
+    assert body["checks"] <= body["candidates"]
+    assert client.get('/course-quarter-range?program=CS&profile=NOPE').status_code == 404
+
+
+def test_range_bench_reports_saved_checks():
+    entry = bench_size(10, seed=0, sparsity=0.5)
+
+    assert entry["checks_saved"] == entry["naive_checks"] - entry["checks"] > 0
+
+
+def test_analyses_restore_the_config_timeout():
+    program = generate_program(30, seed=0)
+    config = SolverConfig(program, generate_profile(program))
+    config.feasibility_matrix(timeout_ms=5000)
+    config.repair({}, timeout_ms=5000)
+    assert "timeout" not in config.params
+
+    config.set_timeout(60000)
+    config.feasibility_matrix(timeout_ms=5000)
+    config.minimum_unit_cap(timeout_ms=5000)
+    config.repair(config.solve(), timeout_ms=5000)
+    assert config.params["timeout"] == 60000
+    assert str(config.check_solvable()) == "sat"
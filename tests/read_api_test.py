@@ -0,0 +1,124 @@
+import gzip
+
+import mongomock
+import pytest
+
+import controller
+from controller import create_app
+from services.read_api import accepts_gzip, decode_cursor, encode_cursor, etag_matches
+
+
+def _course(code, **fields):
+    return {"code": code, "title": f"Course {code}", "units": 5, "offered_quarters": ["FRESH_FALL"], **fields}
+
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [_course(f"C{i}", description="Word " * 60) for i in range(5)],
+    "pools": []
+}
+
+
+@pytest.fixture
+def client():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    return client
+
+
+def test_helpers():
+    assert decode_cursor(encode_cursor({"after": "CS"})) == {"after": "CS"}
+    assert decode_cursor(None) == {}
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+    assert accepts_gzip("deflate, gzip;q=0.5") and accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0") and not accepts_gzip("br") and not accepts_gzip(None)
+    assert etag_matches('W/"a", "b"', '"a"') and etag_matches("*", '"a"') and not etag_matches('"b"', '"a"')
+
+
+def test_get_program_with_projection(client):
+    response = client.get('/get-program?program=CS&fields=id,pools')
+    assert response.status_code == 200
+    assert response.get_json() == {"id": "CS", "pools": []}
+
+    program = client.get('/get-program?program=CS').get_json()
+    assert program["version"] == 1 and len(program["required_courses"]) == 5 and "_id" not in program
+
+    assert client.get('/get-program?program=CS&fields=id,secret').status_code == 400
+    assert client.get('/get-program?program=NOPE').status_code == 404
+
+
+def test_revalidation_skips_serialization(client, monkeypatch):
+    first = client.get('/get-program?program=CS')
+    etag = first.headers["ETag"]
+    assert etag.startswith('"program-v1-') and first.headers["Cache-Control"] == "no-cache"
+
+    encoded = []
+    monkeypatch.setattr(controller, "encode_body", lambda *args: encoded.append(args) or (b"", None))
+    response = client.get('/get-program?program=CS', headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.data == b"" and response.headers["ETag"] == etag
+    # A client without the body is served the cached bytes
+    assert client.get('/get-program?program=CS').data == first.data
+    assert encoded == []
+    monkeypatch.undo()
+
+    # A write bumps the version, so the old tag no longer matches
+    client.post('/post-program-course', json={"id": "CS", "course": _course("C9")})
+    response = client.get('/get-program?program=CS', headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"].startswith('"program-v2-')
+    assert client.get('/get-program?program=CS&fields=id').headers["ETag"] != response.headers["ETag"]
+
+
+def test_gzip(client):
+    plain = client.get('/get-program?program=CS')
+    zipped = client.get('/get-program?program=CS', headers={"Accept-Encoding": "gzip"})
+
+    assert zipped.headers["Content-Encoding"] == "gzip" and zipped.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(zipped.data) == plain.data and len(zipped.data) < len(plain.data)
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    # Small bodies are not worth compressing
+    assert "Content-Encoding" not in client.get('/get-program?program=CS&fields=id', headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_cursor_pagination(client):
+    for program_id in ["B", "E", "A", "D"]:
+        client.post('/post-program', json={**PROGRAM, "id": program_id})
+
+    ids, cursor = [], None
+    while True:
+        page = client.get('/get-programs', query_string={"limit": 2, "fields": "id", **({"cursor": cursor} if cursor else {})}).get_json()
+        assert all(set(program) == {"id"} for program in page["programs"])
+        ids += [program["id"] for program in page["programs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == ["A", "B", "CS", "D", "E"]
+    assert client.get('/get-programs?cursor=%%%').status_code == 400
+
+
+def test_program_courses_pages(client):
+    page = client.get('/get-program-courses?program=CS&limit=2&fields=code,units').get_json()
+    assert page["courses"] == [{"code": "C0", "units": 5}, {"code": "C1", "units": 5}] and page["version"] == 1
+
+    codes = [course["code"] for course in page["courses"]]
+    while page["next_cursor"]:
+        response = client.get(f'/get-program-courses?program=CS&limit=2&fields=code&cursor={page["next_cursor"]}')
+        assert response.headers["ETag"]
+        page = response.get_json()
+        codes += [course["code"] for course in page["courses"]]
+    assert codes == ["C0", "C1", "C2", "C3", "C4"]
+
+
+def test_get_profiles(client):
+    client.post('/post-profile', json={"id": "S1", "max_quarter_units": 20, "min_quarter_units": 12})
+    client.post('/post-profile', json={"id": "S2", "max_quarter_units": 18, "min_quarter_units": 12})
+
+    response = client.get('/get-profile?profile=S1&fields=max_quarter_units')
+    assert response.get_json() == {"max_quarter_units": 20} and response.headers["ETag"].startswith('"profile-v1-')
+    assert client.get('/get-profile?profile=S1&fields=max_quarter_units', headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    page = client.get('/get-profiles?limit=1').get_json()
+    assert [profile["id"] for profile in page["profiles"]] == ["S1"] and page["next_cursor"]
+    assert client.get('/get-profile?profile=NOPE').status_code == 404
@@ -0,0 +1,102 @@
+import mongomock
+
+from benchmarks.generator import generate_profile, generate_program
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+from services.schedule_service import schedule_diff
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER", "FRESH_SPRING"], "prereqs": ["CS106A"]},
+        {"code": "MATH51", "title": "Linear Algebra", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER", "FRESH_SPRING"]},
+        {"code": "CS109", "title": "Probability", "units": 5, "offered_quarters": ["FRESH_SPRING", "SOPH_FALL"], "prereqs": ["CS106B", "MATH51"]},
+    ],
+    "pools": []
+}
+
+PREVIOUS = {"CS106A": Quarter.FRESH_FALL, "MATH51": Quarter.FRESH_FALL, "CS106B": Quarter.FRESH_WINTER, "CS109": Quarter.FRESH_SPRING}
+
+
+def _program(**offered):
+    return Program.from_dict({**PROGRAM, "required_courses": [
+        {**course, "offered_quarters": offered.get(course["code"], course["offered_quarters"])} for course in PROGRAM["required_courses"]
+    ]})
+
+
+def test_valid_previous_schedule_is_kept():
+    result = SolverConfig(_program(), Profile(id="S", max_quarter_units=10)).repair(PREVIOUS)
+
+    assert result.schedule == PREVIOUS
+    assert result.kept == set(PREVIOUS) and result.moved == set() and result.checks == 1
+
+
+def test_only_conflicting_courses_move():
+    # MATH51 is no longer offered in FRESH_FALL; nothing else has to change
+    result = SolverConfig(_program(MATH51=["FRESH_WINTER", "FRESH_SPRING"]), Profile(id="S", max_quarter_units=10)).repair(PREVIOUS)
+    assert result.moved == {"MATH51"}
+    assert result.schedule["MATH51"] == Quarter.FRESH_WINTER
+
+    # A 5-unit cap allows one course per quarter, so the chain behind the FRESH_FALL clash shifts
+    # by one quarter (three moves either way) and the rest stays
+    result = SolverConfig(_program(), Profile(id="S", max_quarter_units=5)).repair(PREVIOUS)
+    assert result.complete and len(result.moved) == 3 and len(result.kept) == 1
+    loads = {}
+    for quarter in result.schedule.values():
+        loads[quarter] = loads.get(quarter, 0) + 5
+    assert max(loads.values()) <= 5
+
+
+def test_infeasible_program_has_no_repair():
+    result = SolverConfig(_program(CS109=["FRESH_FALL"]), Profile(id="S", max_quarter_units=10)).repair(PREVIOUS)
+
+    assert result.schedule is None and result.moved == set(PREVIOUS)
+
+
+def test_repair_moves_fewer_courses_than_a_cold_solve():
+    program = generate_program(60, seed=0)
+    previous = SolverConfig(program, generate_profile(program, slack=1.6)).solve()
+    tighter = generate_profile(program, slack=1.25)
+
+    result = SolverConfig(program, tighter).repair(previous)
+    cold = SolverConfig(program, tighter).solve()
+    assert result.schedule is not None
+    assert len(result.moved) < sum(1 for code, quarter in previous.items() if cold[code] != quarter)
+
+
+def test_schedule_diff():
+    schedule = {"CS106A": Quarter.FRESH_FALL, "CS106B": Quarter.FRESH_SPRING, "CS110": Quarter.SOPH_FALL}
+    previous = {**PREVIOUS, "CS106B": Quarter.FRESH_WINTER}
+
+    assert schedule_diff(previous, schedule, completed=["MATH51"]) == {
+        "kept": ["CS106A"],
+        "moved": {"CS106B": {"from": "FRESH_WINTER", "to": "FRESH_SPRING"}},
+        "added": {"CS110": "SOPH_FALL"},
+        "removed": {"CS109": "FRESH_SPRING"},
+        "completed": ["MATH51"]
+    }
+
+
+def test_endpoint_repairs_the_stored_schedule():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json={"id": "S", "max_quarter_units": 10, "min_quarter_units": 0})
+
+    assert client.get('/solve-user-schedule?program=CS&profile=S').status_code == 200
+    stored = mongo_client["SchedulerDB"]["Schedules"].find_one({"profile": "S", "program": "CS"})
+    assert set(stored["schedule"]) == {"CS106A", "CS106B", "MATH51", "CS109"} and stored["program_version"] == 1
+
+    client.post('/post-program-course', json={"id": "CS", "course": {"code": "CS107", "title": "Computer Organization", "units": 5, "offered_quarters": ["SOPH_FALL", "SOPH_WINTER"], "prereqs": ["CS106B"]}})
+    body = client.post('/repair-user-schedule', json={"program": "CS", "profile": "S"}).get_json()
+    assert body["diff"]["kept"] == sorted(stored["schedule"]) and list(body["diff"]["added"]) == ["CS107"]
+    assert mongo_client["SchedulerDB"]["Schedules"].find_one({"profile": "S"})["program_version"] == 2
+
+    previous = {"CS106A": "FRESH_FALL", "CS106B": "FRESH_FALL"}
+    body = client.post('/repair-user-schedule', json={"program": "CS", "profile": "S", "previous": previous}).get_json()
+    assert body["diff"]["kept"] == ["CS106A"] and list(body["diff"]["moved"]) == ["CS106B"]
+    assert client.post('/repair-user-schedule', json={"program": "CS", "profile": "S", "previous": {"CS106A": "NOPE"}}).status_code == 400
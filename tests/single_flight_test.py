@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from controller import create_app
+from services.single_flight import MongoLeaseSingleFlight, SingleFlight, SingleFlightTimeout, solve_key
+
+
+def _run_concurrently(count, target):
+    results = [None] * count
+    def run(i):
+        results[i] = target()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_solve_key_ignores_mongo_id_and_key_order():
+    first = solve_key("CS", 3, {"_id": "a", "id": "S", "max_quarter_units": 20, "min_quarter_units": 12})
+    second = solve_key("CS", 3, {"min_quarter_units": 12, "id": "S", "max_quarter_units": 20, "_id": "b"})
+
+    assert first == second
+    assert first != solve_key("CS", 4, {"id": "S", "max_quarter_units": 20, "min_quarter_units": 12})
+
+def test_concurrent_duplicates_share_one_call():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return {"C1": "FRESH_FALL"}
+
+    threads, results = _run_concurrently(8, lambda: single_flight.do("key", slow))
+    while single_flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"C1": "FRESH_FALL"}] * 8
+    assert single_flight.in_flight() == 0
+
+def test_leader_exception_reaches_waiters():
+    single_flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    leader = threading.Thread(target=lambda: pytest.raises(ValueError, single_flight.do, "key", failing))
+    leader.start()
+    started.wait(5)
+
+    with pytest.raises(ValueError):
+        single_flight.do("key", lambda: "never runs")
+    leader.join()
+
+def test_waiter_times_out():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=single_flight.do, args=("key", lambda: release.wait(5)))
+    leader.start()
+    while single_flight.in_flight() == 0:
+        time.sleep(0.001)
+
+    with pytest.raises(SingleFlightTimeout):
+        single_flight.do("key", lambda: None, timeout=0.01)
+    release.set()
+    leader.join()
+
+
+def test_mongo_lease_coalesces_across_workers():
+    collection = mongomock.MongoClient().db.SolveLeases
+    worker_a = MongoLeaseSingleFlight(collection, poll_interval=0.005)
+    worker_b = MongoLeaseSingleFlight(collection, poll_interval=0.005)
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "schedule"
+
+    leader = threading.Thread(target=worker_a.do, args=("key", slow))
+    leader.start()
+    while collection.find_one({"_id": "key"}) is None:
+        time.sleep(0.001)
+    threads, results = _run_concurrently(3, lambda: worker_b.do("key", lambda: calls.append(1) or "duplicate"))
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["schedule"] * 3
+
+def test_mongo_lease_taken_over_after_expiry():
+    collection = mongomock.MongoClient().db.SolveLeases
+    collection.insert_one({"_id": "key", "owner": "dead-worker", "done": False, "expires_at": datetime.utcnow() - timedelta(seconds=1)})
+
+    result = MongoLeaseSingleFlight(collection).do("key", lambda: "fresh")
+
+    assert result == "fresh"
+    assert collection.find_one({"_id": "key"})["result"] == "fresh"
+
+def test_solve_endpoint_in_mongo_single_flight_mode():
+    mongo_client = mongomock.MongoClient()
+    app = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None, "SINGLE_FLIGHT": "mongo"})
+    client = app.test_client()
+    client.post('/post-program', json={"id": "CS", "required_courses": [{"code": "C1", "title": "T", "units": 5, "offered_quarters": ["FRESH_WINTER"]}]})
+    client.post('/post-profile', json={"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12})
+
+    first = client.get('/solve-user-schedule?program=CS&profile=STUDENT').get_json()
+    second = client.get('/solve-user-schedule?program=CS&profile=STUDENT').get_json()
+
+    assert first == second
+    assert first["schedule"]["FRESH_WINTER"] == ["C1: T"]
+    assert mongo_client["SchedulerDB"]["SolveLeases"].find_one()["result"] == {"C1": "FRESH_WINTER"}
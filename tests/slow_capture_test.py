@@ -0,0 +1,105 @@
+import json
+import os
+
+import mongomock
+
+import z3
+
+from benchmarks.replay import build_assertions, load_capture, replay_all
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+from services.slow_capture import SlowSolveCapture
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 5, "offered_quarters": ["FRESH_WINTER", "SOPH_FALL"], "prereqs": ["C1"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+
+
+def _checked_config():
+    config = SolverConfig(Program.from_dict(PROGRAM), Profile.from_dict(PROFILE))
+    config.set_timeout(5000)
+    config.check_solvable()
+    return config
+
+
+def test_capture_contains_smt2_inputs_params_and_statistics(tmp_path):
+    capture = SlowSolveCapture(str(tmp_path), threshold_ms=100)
+
+    assert capture.maybe_capture(_checked_config(), PROGRAM, PROFILE, 0.05) is None
+    path = capture.maybe_capture(_checked_config(), PROGRAM, dict(PROFILE, _id="mongo-id"), 0.2)
+
+    record = load_capture(path)
+    assert record["elapsed_ms"] == 200
+    assert record["result"] == "sat"
+    assert record["params"] == {"timeout": 5000}
+    assert "max memory" in record["statistics"]
+    assert record["program"] == PROGRAM and "_id" not in record["profile"]
+    # C1 has one possible quarter, so presolve leaves only C2 to the solver
+    assert "(declare-fun C2 () Int)" in record["smt2"] and "(declare-fun C1 () Int)" not in record["smt2"]
+
+
+def test_capture_directory_is_size_capped(tmp_path):
+    capture = SlowSolveCapture(str(tmp_path), threshold_ms=0, max_bytes=1)
+    config = _checked_config()
+
+    paths = [capture.capture(config, PROGRAM, PROFILE, 1.0) for _ in range(3)]
+
+    assert capture.captures() == [paths[-1]]
+    assert not SlowSolveCapture(str(tmp_path), None).should_capture(10)
+
+
+def test_endpoint_captures_slow_solves_and_replay_reproduces_them(tmp_path):
+    mongo_client = mongomock.MongoClient()
+    app = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "SLOW_SOLVE_MS": 0,
+        "SLOW_SOLVE_DIR": str(tmp_path)
+    })
+    client = app.test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+    assert client.get('/solve-user-schedule?program=CS&profile=STUDENT').status_code == 200
+
+    [path] = [os.path.join(tmp_path, name) for name in os.listdir(tmp_path)]
+    capture = load_capture(path)
+    assert capture["program"]["id"] == "CS" and capture["profile"]["id"] == "STUDENT"
+    assert capture["params"]["timeout"] > 0
+
+    results = replay_all(capture, ["smt2", "rebuild"], ["default", "qflia"], [None, 1])
+    assert len(results) == 8
+    assert all(entry["result"] == "sat" for entry in results)
+    assert json.dumps(results)
+
+
+def test_ger_capture_rebuilds_with_its_catalog(tmp_path):
+    mongo_client = mongomock.MongoClient()
+    client = create_app({
+        "MONGO_CLIENT_FACTORY": lambda _: mongo_client,
+        "MONGO_CONNECTION_STRING": None,
+        "SLOW_SOLVE_MS": 0,
+        "SLOW_SOLVE_DIR": str(tmp_path)
+    }).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json={**PROFILE, "ger_minimums": {"WAY_ER": 1}})
+    client.post('/post-catalog-course', json={"code": "PHIL1", "title": "Ethics", "units": 4, "offered_quarters": ["SOPH_WINTER"], "ug_reqs": ["WAY_ER"]})
+    client.post('/post-catalog-course', json={"code": "HIST1", "title": "History", "units": 4, "offered_quarters": ["SOPH_WINTER"], "ug_reqs": ["WAY_SI"]})
+    assert client.get('/solve-user-schedule?program=CS&profile=STUDENT').status_code == 200
+
+    [path] = [os.path.join(tmp_path, name) for name in os.listdir(tmp_path)]
+    capture = load_capture(path)
+    # Only the courses catalog_query selected for the profile's minimums
+    assert [course["code"] for course in capture["catalog"]] == ["PHIL1"]
+    ctx = z3.Context()
+    assert len(build_assertions(capture, "rebuild", ctx)) == len(build_assertions(capture, "smt2", ctx))
+    without_catalog = dict(capture, catalog=[])
+    assert len(build_assertions(without_catalog, "rebuild", z3.Context())) != len(build_assertions(capture, "smt2", ctx))
+    assert {entry["result"] for entry in replay_all(capture, ["smt2", "rebuild"], ["default"], [None])} == {"sat"}
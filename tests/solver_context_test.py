@@ -0,0 +1,153 @@
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from classes.solver_config import SolverConfig
+from classes.constrain.program import Program
+from classes.constrain.profile import Profile
+from classes.components.course import Course
+from classes.components.enums import Quarter
+from services.solver_pool import SolverPool, solve_schedule
+from z3 import Context, main_ctx, sat
+
+from benchmarks.generator import generate_profile, generate_program
+
+# Sequential solves of the quick memory check that runs with the suite
+MEMORY_SOLVES = 200
+# Concurrent solves of the soak, run with: pytest --runslow tests/solver_context_test.py
+# (about 25 ms per solve on one core; SOLVER_SOAK_SOLVES=20000 for a longer run)
+SOAK_SOLVES = int(os.environ.get("SOLVER_SOAK_SOLVES", "5000"))
+SOAK_MAX_GROWTH_KB = 16 * 1024
+
+
+def _chain_program(length: int, offset: int = 0) -> Program:
+    quarters = list(Quarter)
+    courses = [
+        Course(
+            code=f'C{i}',
+            units=5,
+            offered_quarters=[quarters[(i + offset) % len(quarters)], quarters[(i + offset + 1) % len(quarters)]],
+            prereqs=[f'C{i - 1}'] if i > 0 else []
+        )
+        for i in range(length)
+    ]
+    return Program(id="ID", required_courses=courses)
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def test_solver_config_owns_private_context():
+    scheduleSolver = SolverConfig(program=_chain_program(3), profile=Profile(id="ID"))
+
+    assert scheduleSolver.ctx is not main_ctx()
+    assert all(var.ctx is scheduleSolver.ctx for var in scheduleSolver.course_dict)
+    assert scheduleSolver.check_solvable() == sat
+
+def test_solver_config_accepts_context():
+    ctx = Context()
+    scheduleSolver = SolverConfig(program=_chain_program(3), profile=Profile(id="ID"), ctx=ctx)
+
+    schedule = scheduleSolver.solve()
+
+    assert scheduleSolver.ctx is ctx
+    assert schedule['C0'].value < schedule['C1'].value < schedule['C2'].value
+
+def test_close_releases_context():
+    with SolverConfig(program=_chain_program(3), profile=Profile(id="ID")) as scheduleSolver:
+        schedule = scheduleSolver.solve()
+
+    assert schedule is not None
+    assert scheduleSolver.ctx is None
+    assert scheduleSolver.course_dict == {}
+
+def test_concurrent_solves_in_thread_pool():
+    programs = [_chain_program(12, offset) for offset in range(4)] * 4
+    profile = Profile(id="ID", max_quarter_units=5)
+    expected = [solve_schedule(program, profile) for program in programs]
+
+    pool = SolverPool("thread", max_workers=8)
+    try:
+        results = [future.result() for future in [pool.submit(solve_schedule, program, profile) for program in programs]]
+    finally:
+        pool.shutdown()
+
+    assert results == expected
+    assert all(result is not None for result in results)
+
+def test_thread_pool_matches_inline_under_raw_threads():
+    profile = Profile(id="ID", max_quarter_units=5)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda offset: solve_schedule(_chain_program(10, offset % 4), profile), range(16)))
+
+    assert [len(result) for result in results] == [10] * 16
+
+def test_memory_stays_flat_over_many_solves():
+    program = _chain_program(8)
+    profile = Profile(id="ID")
+
+    # Let allocator arenas and z3 module state settle before taking the baseline
+    for _ in range(50):
+        solve_schedule(program, profile)
+    baseline = _rss_kb()
+
+    for _ in range(MEMORY_SOLVES):
+        solve_schedule(program, profile)
+
+    assert _rss_kb() - baseline < SOAK_MAX_GROWTH_KB
+
+def test_thread_pool_overlaps_solves():
+    program = generate_program(150, seed=0)
+    profile = generate_profile(program)
+    barrier = threading.Barrier(2)
+    spans = []
+
+    def solve():
+        # A pool that ran one solve at a time would never get both workers past the barrier
+        barrier.wait(timeout=10)
+        start = time.perf_counter()
+        schedule = solve_schedule(program, profile)
+        spans.append((start, time.perf_counter()))
+        return schedule
+
+    pool = SolverPool("thread", max_workers=2)
+    try:
+        results = [future.result() for future in [pool.submit(solve), pool.submit(solve)]]
+    finally:
+        pool.shutdown()
+
+    assert results[0] == results[1] is not None
+    # Each solve started before the other one finished
+    assert max(start for start, _ in spans) < min(end for _, end in spans)
+
+@pytest.mark.slow
+def test_soak_concurrent_solves_stay_isolated():
+    programs = [_chain_program(8, offset) for offset in range(4)]
+    profile = Profile(id="ID", max_quarter_units=5)
+    expected = [solve_schedule(program, profile) for program in programs]
+
+    def run(solves):
+        futures = [pool.submit(solve_schedule, programs[i % len(programs)], profile) for i in range(solves)]
+        # A context shared between threads shows up as a wrong or missing schedule (or a crash)
+        return [i for i, future in enumerate(futures) if future.result() != expected[i % len(programs)]]
+
+    pool = SolverPool("thread", max_workers=8)
+    try:
+        # Every worker thread gets its allocator arenas before the baseline is taken
+        assert run(400) == []
+        baseline = _rss_kb()
+        mismatches = run(SOAK_SOLVES)
+        growth = _rss_kb() - baseline
+    finally:
+        pool.shutdown()
+
+    assert mismatches == []
+    assert growth < SOAK_MAX_GROWTH_KB
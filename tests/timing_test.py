@@ -0,0 +1,81 @@
+import re
+
+import mongomock
+import pytest
+
+from controller import create_app
+from services.timing import RequestTimer
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 5, "offered_quarters": ["FRESH_WINTER"], "prereqs": ["C1"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+
+
+def _server_timing(response):
+    return {name: float(duration) for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"])}
+
+
+@pytest.fixture
+def client():
+    mongo_client = mongomock.MongoClient()
+    app = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None, "SINGLE_FLIGHT": "off"})
+    return app.test_client()
+
+
+def test_request_timer_accumulates_spans():
+    timer = RequestTimer()
+    with timer.span("mongo"):
+        pass
+    timer.record("mongo", 0.002)
+    timer.record("check", 0.010)
+
+    assert timer.spans["mongo"] >= 0.002
+    assert timer.header().startswith("mongo;dur=")
+    assert "check;dur=10.00" in timer.header()
+    assert timer.header().split(", ")[-1].startswith("total;dur=")
+
+
+def test_solve_reports_phases_in_server_timing(client):
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+
+    first = _server_timing(client.get('/solve-user-schedule?program=CS&profile=STUDENT'))
+    second = _server_timing(client.get('/solve-user-schedule?program=CS&profile=STUDENT'))
+
+    assert {"mongo", "from_dict", "queue", "encode", "check", "extract", "json", "total"} <= set(first)
+    assert first["total"] >= first["check"]
+    # The cached program skips the full fetch but the profile is still deserialized
+    assert "from_dict" in second
+
+
+def test_write_endpoints_report_server_timing(client):
+    response = client.post('/post-program', json=PROGRAM)
+    assert {"from_dict", "mongo", "total"} <= set(_server_timing(response))
+
+    response = client.post('/post-prereq-course', json={"id": "CS", "course": "C2", "prereq_course": "C0"})
+    assert "mongo" in _server_timing(response)
+
+
+def test_metrics_expose_solve_outcomes_and_z3_statistics(client):
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+    client.post('/post-profile', json={"id": "TIGHT", "max_quarter_units": 4, "min_quarter_units": 0})
+    client.get('/solve-user-schedule?program=CS&profile=STUDENT')
+    client.get('/solve-user-schedule?program=CS&profile=TIGHT')
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+
+    assert 'solver_solves_total{result="sat"} 1' in metrics
+    assert 'solver_solves_total{result="unsat"} 1' in metrics
+    assert 'solver_program_courses_bucket{le="5"} 2' in metrics
+    assert "solver_conflicts_count 2" in metrics
+    assert "solver_decisions_count 2" in metrics
+    assert "solver_memory_mb_count 2" in metrics
+    assert 'http_request_phase_seconds_count{endpoint="api.solve_user_schedule",phase="check"} 2' in metrics
+    assert 'http_request_duration_seconds_count{endpoint="api.post_program",method="POST",status="200"} 1' in metrics
@@ -247,11 +247,24 @@ def test_profile_to_dict():
     expected_dict = {
         "id": "ID",
         "max_quarter_units": 20,
-        "min_quarter_units": 12
+        "min_quarter_units": 12,
+        "completed_courses": [],
+        "current_quarter": None,
+        "ger_minimums": {},
+        "preferences": []
     }
     
     assert profile_dict == expected_dict
 
+def test_profile_with_transcript_to_dict():
+    
+    profile = Profile(id="ID", completed_courses=["CS106A"], current_quarter=Quarter.SOPH_FALL)
+    
+    profile_dict = profile.to_dict()
+    
+    assert profile_dict["completed_courses"] == ["CS106A"]
+    assert profile_dict["current_quarter"] == "SOPH_FALL"
+
 def test_course_pool_to_dict():
     
     course_pool = Pool(type="Course", objects=["C1", "C2", "C3"], num_required=2)
@@ -0,0 +1,78 @@
+import mongomock
+
+from benchmarks.generator import generate_profile, generate_program
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.constrain.program_index import ProgramIndex
+from classes.solver_config import SolverConfig
+from controller import create_app
+from services.whatif import WhatIfQuestion, WhatIfSession
+from z3 import sat
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER", "SOPH_WINTER"], "prereqs": ["CS106A"]},
+        {"code": "CS107", "title": "Computer Organization", "units": 5, "offered_quarters": ["FRESH_SPRING", "SOPH_SPRING"], "prereqs": ["CS106B"]},
+    ],
+    "pools": []
+}
+
+
+def test_for_transcript_drops_completed_courses_and_past_quarters():
+    program, index = ProgramIndex.for_transcript(Program.from_dict(PROGRAM), ["CS106A"], Quarter.SOPH_FALL)
+
+    assert [course.code for course in program.required_courses] == ["CS106B", "CS107"]
+    # The edge to the completed CS106A is gone, so CS106B only needs a quarter from SOPH_FALL on
+    assert "CS106B" not in index.prereq_graph
+    assert index.domain("CS106B") == [Quarter.SOPH_WINTER]
+    assert index.domain("CS107") == [Quarter.SOPH_SPRING]
+
+
+def test_transcript_shrinks_the_model():
+    program = Program.from_dict(PROGRAM)
+    fresh = SolverConfig(program, Profile(id="NEW"))
+    midway = SolverConfig(program, Profile(id="MID", completed_courses=["CS106A"], current_quarter=Quarter.SOPH_FALL))
+
+    assert len(midway.course_dict) == 2 < len(fresh.course_dict)
+    assert len(midway.get_assertions()) < len(fresh.get_assertions())
+    assert midway.solve() == {"CS106B": Quarter.SOPH_WINTER, "CS107": Quarter.SOPH_SPRING}
+
+
+def test_generated_mid_degree_student():
+    program = generate_program(60, seed=1)
+    completed = [course.code for course in program.required_courses[:30]]
+    base = generate_profile(program)
+    profile = Profile(id="MID", max_quarter_units=base.max_quarter_units, completed_courses=completed, current_quarter=Quarter.JUNIOR_FALL)
+
+    config = SolverConfig(program, profile)
+    assert len(config.course_dict) == 30
+    assert config.check_solvable() == sat
+    schedule = config.extract_schedule()
+    assert not set(schedule) & set(completed)
+    assert all(quarter.value >= Quarter.JUNIOR_FALL.value for quarter in schedule.values())
+
+
+def test_what_if_on_a_transcript_profile():
+    profile = Profile(id="MID", completed_courses=["CS106A"], current_quarter=Quarter.FRESH_WINTER)
+    session = WhatIfSession(Program.from_dict(PROGRAM), profile)
+
+    answer = session.ask(WhatIfQuestion(completed=["CS106A", "CS106B"]))
+    assert answer["feasible"] and list(answer["schedule"]) == ["CS107"]
+
+
+def test_endpoint_plans_from_the_current_quarter():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    response = client.post('/post-profile', json={"id": "MID", "max_quarter_units": 20, "min_quarter_units": 0, "completed_courses": ["CS106A"], "current_quarter": "SOPH_FALL"})
+    assert response.status_code == 200
+
+    schedule = client.get('/solve-user-schedule?program=CS&profile=MID').get_json()["schedule"]
+    assert schedule["SOPH_WINTER"] == ["CS106B: Programming Abstractions"]
+    assert schedule["SOPH_SPRING"] == ["CS107: Computer Organization"]
+    assert not any("CS106A" in entry for courses in schedule.values() for entry in courses)
+
+    assert client.post('/post-profile', json={"id": "BAD", "current_quarter": "SOMEDAY"}).status_code == 400
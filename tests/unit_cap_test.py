@@ -0,0 +1,63 @@
+import mongomock
+
+from benchmarks.generator import generate_program
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from classes.solver_config import SolverConfig
+from controller import create_app
+from z3 import sat, unsat
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "C1", "title": "Course 1", "units": 5, "offered_quarters": ["FRESH_FALL"]},
+        {"code": "C2", "title": "Course 2", "units": 4, "offered_quarters": ["FRESH_FALL", "FRESH_WINTER"]},
+        {"code": "C3", "title": "Course 3", "units": 3, "offered_quarters": ["FRESH_WINTER"], "prereqs": ["C2"]},
+    ],
+    "pools": []
+}
+
+
+def _uncapped(**transcript):
+    return Profile(id="S", max_quarter_units=None, **transcript)
+
+
+def test_minimum_cap_and_witness():
+    result = SolverConfig(Program.from_dict(PROGRAM), _uncapped()).minimum_unit_cap()
+
+    # C3 needs C2 first, so C2 shares FRESH_FALL with C1
+    assert result.cap == 9 and result.optimal
+    assert result.schedule == {"C1": Quarter.FRESH_FALL, "C2": Quarter.FRESH_FALL, "C3": Quarter.FRESH_WINTER}
+
+
+def test_minimum_cap_is_tight_on_generated_programs():
+    for seed in range(3):
+        program = generate_program(30, seed=seed)
+        result = SolverConfig(program, _uncapped()).minimum_unit_cap()
+        if result.cap is None:
+            assert SolverConfig(program, _uncapped()).check_solvable() == unsat
+            continue
+        assert SolverConfig(program, Profile(id="S", max_quarter_units=result.cap)).check_solvable() == sat
+        assert SolverConfig(program, Profile(id="S", max_quarter_units=result.cap - 1)).check_solvable() == unsat
+        assert result.checks <= 8
+
+
+def test_transcript_lowers_the_cap():
+    result = SolverConfig(Program.from_dict(PROGRAM), _uncapped(completed_courses=["C1"])).minimum_unit_cap()
+
+    assert result.cap == 4
+
+
+def test_min_quarter_units_endpoint():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json={"id": "MID", "max_quarter_units": 5, "completed_courses": ["C2"]})
+
+    body = client.get('/min-quarter-units?program=CS').get_json()
+    assert body["max_quarter_units"] == 9 and body["optimal"]
+    assert body["schedule"]["FRESH_FALL"] == ["C1: Course 1", "C2: Course 2"]
+
+    assert client.get('/min-quarter-units?program=CS&profile=MID').get_json()["max_quarter_units"] == 5
+    assert client.get('/min-quarter-units?program=NOPE').status_code == 404
@@ -0,0 +1,96 @@
+import mongomock
+import pytest
+
+from classes.components.enums import Quarter
+from classes.constrain.profile import Profile
+from classes.constrain.program import Program
+from controller import create_app
+from services.whatif import SessionClosed, WhatIfQuestion, WhatIfSession, WhatIfStore
+
+PROGRAM = {
+    "id": "CS",
+    "required_courses": [
+        {"code": "CS106A", "title": "Programming Methodology", "units": 5, "offered_quarters": ["FRESH_FALL", "FRESH_SUMMER"]},
+        {"code": "CS106B", "title": "Programming Abstractions", "units": 5, "offered_quarters": ["FRESH_WINTER", "SOPH_FALL"], "prereqs": ["CS106A"]},
+        {"code": "CS161", "title": "Algorithms", "units": 5, "offered_quarters": ["SOPH_WINTER", "JUNIOR_WINTER"], "prereqs": ["CS106B"]},
+    ],
+    "pools": []
+}
+PROFILE = {"id": "STUDENT", "max_quarter_units": 20, "min_quarter_units": 12}
+
+
+@pytest.fixture
+def session():
+    return WhatIfSession(Program.from_dict(PROGRAM), Profile.from_dict(PROFILE))
+
+
+def test_pin_and_exclusion(session):
+    pinned = session.ask(WhatIfQuestion(pins={"CS161": Quarter.JUNIOR_WINTER}))
+    assert pinned["feasible"] and pinned["schedule"]["CS161"] == Quarter.JUNIOR_WINTER
+
+    excluded = session.ask(WhatIfQuestion(exclusions={"CS106B": [Quarter.FRESH_WINTER]}))
+    assert excluded["schedule"]["CS106B"] == Quarter.SOPH_FALL
+
+    # Earlier assumptions do not leak into later questions
+    assert session.ask(WhatIfQuestion())["feasible"]
+
+
+def test_conflicting_question_reports_its_conflicts(session):
+    answer = session.ask(WhatIfQuestion(pins={"CS106B": Quarter.SOPH_FALL, "CS161": Quarter.SOPH_WINTER}, quarters_off=[Quarter.SOPH_WINTER]))
+
+    assert not answer["feasible"]
+    assert "SOPH_WINTER off" in answer["conflicts"]
+    assert "CS161 in SOPH_WINTER" in answer["conflicts"]
+
+
+def test_completed_courses_leave_the_schedule_and_satisfy_prereqs(session):
+    # CS106A is only offered before CS106B's first offering; once completed, summer off is no problem
+    answer = session.ask(WhatIfQuestion(completed=["CS106A"], quarters_off=[Quarter.FRESH_FALL, Quarter.FRESH_SUMMER]))
+
+    assert answer["feasible"]
+    assert "CS106A" not in answer["schedule"]
+    assert not session.ask(WhatIfQuestion(quarters_off=[Quarter.FRESH_FALL, Quarter.FRESH_SUMMER]))["feasible"]
+
+
+def test_unknown_course_is_rejected(session):
+    with pytest.raises(ValueError):
+        session.ask(WhatIfQuestion(pins={"NOPE": Quarter.FRESH_FALL}))
+
+
+def test_store_reuses_rebuilds_and_evicts_sessions():
+    store = WhatIfStore(max_sessions=1)
+    built = []
+    def factory():
+        built.append(WhatIfSession(Program.from_dict(PROGRAM), Profile.from_dict(PROFILE)))
+        return built[-1]
+
+    first = store.session("a", "v1", factory)
+    assert store.session("a", "v1", factory) is first
+    second = store.session("a", "v2", factory)
+    assert second is not first and len(built) == 2
+    with pytest.raises(SessionClosed):
+        first.ask(WhatIfQuestion())
+
+    store.session("b", "v1", factory)
+    assert "a" not in store and len(store) == 1
+
+
+def test_what_if_endpoint():
+    mongo_client = mongomock.MongoClient()
+    client = create_app({"MONGO_CLIENT_FACTORY": lambda _: mongo_client, "MONGO_CONNECTION_STRING": None}).test_client()
+    client.post('/post-program', json=PROGRAM)
+    client.post('/post-profile', json=PROFILE)
+
+    first = client.post('/what-if', json={"program": "CS", "profile": "STUDENT", "pin": {"CS161": "JUNIOR_WINTER"}})
+    body = first.get_json()
+    assert first.status_code == 200 and body["feasible"]
+    assert "CS161: Algorithms" in body["schedule"]["JUNIOR_WINTER"]
+    assert "encode" in first.headers["Server-Timing"]
+
+    follow_up = client.post('/what-if', json={"program": "CS", "profile": "STUDENT", "session": body["session"], "quarters_off": ["FRESH_FALL", "FRESH_SUMMER"]})
+    assert follow_up.get_json()["feasible"] is False
+    assert "encode" not in follow_up.headers["Server-Timing"]
+
+    assert client.post('/what-if', json={"program": "CS", "profile": "STUDENT", "pin": {"CS161": "NEVER"}}).status_code == 400
+    assert client.post('/what-if', json={"program": "CS", "profile": "STUDENT", "completed": ["NOPE"]}).status_code == 400
+    assert client.post('/what-if', json={"program": "NOPE", "profile": "STUDENT"}).status_code == 404